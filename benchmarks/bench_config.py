@@ -0,0 +1,57 @@
+"""
+Benchmark loading a large config directory cold and warm.
+
+Writes --files YAML files with --tasks-per-file tasks each, then times a load
+without the cache, a cold load that fills the cache and a warm load from it.
+
+Usage: python benchmarks/bench_config.py [--files 200] [--tasks-per-file 25]
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from task_processor.utils.config_loader import ConfigLoader
+
+
+def write_configs(config_dir: Path, files: int, tasks_per_file: int) -> None:
+    for f in range(files):
+        lines = ["tasks:"]
+        for t in range(tasks_per_file):
+            lines += [
+                f"  - name: task_{f}_{t}",
+                f"    command: echo {f} {t}",
+                "    schedule:",
+                "      type: recurring",
+                "      interval: 5m",
+                "    retry:",
+                "      max_attempts: 3",
+                "      delay: 60",
+            ]
+        (config_dir / f"tasks_{f:04d}.yaml").write_text("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--tasks-per-file", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = Path(tmp) / "config"
+        config_dir.mkdir()
+        write_configs(config_dir, args.files, args.tasks_per_file)
+        cache_path = os.path.join(tmp, "config_cache.pickle")
+
+        for label, loader in (
+            ("no cache", ConfigLoader(str(config_dir))),
+            ("cold", ConfigLoader(str(config_dir), cache_path=cache_path)),
+            ("warm", ConfigLoader(str(config_dir), cache_path=cache_path)),
+        ):
+            loader.load_configs()
+            print(f"{label}: {loader.stats}")
+
+
+if __name__ == "__main__":
+    main()
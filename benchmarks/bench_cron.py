@@ -0,0 +1,60 @@
+"""
+Benchmark cron next-fire calculation.
+
+Times --calls chained next_fire() calls and one next_fire_times() query for
+--calls fires, against checking every minute until the expression matches.
+
+Usage: python benchmarks/bench_cron.py [--calls 100000] [--expression "*/5 9-17 * * mon-fri"]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from task_processor.core.cron import CronSchedule
+
+
+def minute_scan(cron: CronSchedule, after: float) -> float:
+    minute = int(after // 60 * 60)
+    while True:
+        minute += 60
+        if cron.matches(datetime.fromtimestamp(minute, cron.tz)):
+            return float(minute)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--expression", type=str, default="*/5 9-17 * * mon-fri")
+    parser.add_argument("--timezone", type=str, default="America/New_York")
+    args = parser.parse_args()
+
+    cron = CronSchedule(args.expression, args.timezone)
+    start = time.time()
+
+    started = time.perf_counter()
+    fire = start
+    for _ in range(args.calls):
+        fire = cron.next_fire(fire)
+    chained = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bulk = cron.next_fire_times(start, args.calls)
+    vectorised = time.perf_counter() - started
+    assert bulk[-1] == fire
+
+    scan_calls = max(args.calls // 100, 1)
+    started = time.perf_counter()
+    fire = start
+    for _ in range(scan_calls):
+        fire = minute_scan(cron, fire)
+    scanned = (time.perf_counter() - started) * args.calls / scan_calls
+
+    print(f"{args.expression!r} in {args.timezone}, {args.calls:,} fires")
+    print(f"next_fire chained:  {chained * 1000:8.1f} ms ({args.calls / chained:,.0f}/s)")
+    print(f"next_fire_times:    {vectorised * 1000:8.1f} ms ({args.calls / vectorised:,.0f}/s)")
+    print(f"minute scan (est.): {scanned * 1000:8.1f} ms ({args.calls / scanned:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark run-history writes and the two hot queries at scale.
+
+Fills a history database with --rows runs spread over --tasks tasks, then
+times "last 100 runs of a task" and "failures in the last hour".
+
+Usage: python benchmarks/bench_history.py [--rows 1000000] [--tasks 5000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from task_processor.core.executor import RunResult
+from task_processor.core.history import RunHistory
+
+
+def fill(history: RunHistory, rows: int, tasks: int) -> float:
+    now = datetime.now()
+    span = timedelta(days=365).total_seconds()
+    started = time.perf_counter()
+    for i in range(rows):
+        start = now - timedelta(seconds=span * (rows - i) / rows)
+        history.record(
+            RunResult(
+                task_name=f"task_{random.randrange(tasks)}",
+                status="failed" if random.random() < 0.02 else "success",
+                started_at=start,
+                finished_at=start + timedelta(seconds=random.uniform(0.1, 30)),
+                exit_code=0,
+                output_size=random.randrange(10_000),
+            )
+        )
+    history.flush()
+    return time.perf_counter() - started
+
+
+def timed(fn, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tasks", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = RunHistory(os.path.join(tmp, "history.db"), batch_size=5_000)
+        elapsed = fill(history, args.rows, args.tasks)
+        print(f"insert: {args.rows} rows in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+        last_100 = timed(lambda: history.last_runs(f"task_{random.randrange(args.tasks)}"))
+        since = datetime.now() - timedelta(hours=1)
+        failures = timed(lambda: history.failures_since(since))
+        print(f"last 100 runs of a task: {last_100 * 1e3:.2f} ms")
+        print(f"failures in the last hour: {failures * 1e3:.2f} ms")
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark HTTP task throughput: a `curl` command per run versus the pooled client.
+
+Starts a keep-alive HTTP server on localhost, then runs --runs requests as
+`curl` command tasks from --threads worker threads, and as HTTP tasks through
+HttpPlugin on the async executor.
+
+Usage: python benchmarks/bench_http.py [--runs 2000] [--threads 8] 2>/dev/null
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from task_processor.core.executor import AsyncTaskExecutor, TaskExecutor
+from task_processor.core.models import Task
+from task_processor.plugins.http.plugin import HttpConfig, HttpPlugin
+from task_processor.utils.logging import LogConfig, LogManager
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def task(**target) -> Task:
+    return Task(
+        name="http",
+        schedule={"type": "recurring", "interval": "1m"},
+        retry={"max_attempts": 1, "delay": 1},
+        **target,
+    )
+
+
+def curl_rate(log_manager: LogManager, url: str, runs: int, threads: int) -> float:
+    executor = TaskExecutor(log_manager)
+    command = task(command=["curl", "-sf", url])
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: executor.execute_task(command), range(runs)))
+    assert all(result.succeeded for result in results)
+    return runs / (time.perf_counter() - started)
+
+
+def client_rate(log_manager: LogManager, url: str, runs: int) -> float:
+    client = HttpPlugin(HttpConfig(name="http"))
+    client.initialize()
+    executor = AsyncTaskExecutor(log_manager, http_client=client)
+
+    async def run_all():
+        return await asyncio.gather(
+            *(executor.execute_task(task(http={"url": url})) for _ in range(runs))
+        )
+
+    started = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - started
+    client.cleanup()
+    assert all(result.succeeded for result in results)
+    return runs / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_manager = LogManager(LogConfig(log_dir=log_dir))
+        if shutil.which("curl"):
+            rate = curl_rate(log_manager, url, args.runs, args.threads)
+            print(f"curl command: {rate:,.0f} runs/s")
+        rate = client_rate(log_manager, url, args.runs)
+        print(f"HTTP client:  {rate:,.0f} runs/s")
+        log_manager.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
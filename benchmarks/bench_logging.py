@@ -0,0 +1,48 @@
+"""
+Benchmark the per-record cost of task logging as the number of tasks grows.
+
+Every task gets a logger up front; records are then written from a fixed set
+of active tasks. With one routing sink the cost per record should stay flat
+from 10 to 10,000 registered tasks.
+
+Usage: python benchmarks/bench_logging.py [--records 20000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from task_processor.utils.logging import LogConfig, LogManager
+
+
+def bench(task_count: int, records: int, active: int = 10) -> float:
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_manager = LogManager(LogConfig(log_dir=log_dir))
+        loggers = [log_manager.get_logger(f"task_{i}") for i in range(task_count)]
+        writers = loggers[:active]
+
+        started = time.perf_counter()
+        for i in range(records):
+            writers[i % active].info("benchmark record")
+        elapsed = time.perf_counter() - started
+
+        log_manager.router.close()
+        return elapsed / records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20_000)
+    args = parser.parse_args()
+
+    # Keep the console sink out of the measurement
+    sys.stderr = open(os.devnull, "w")
+    for task_count in (10, 100, 1_000, 10_000):
+        per_record = bench(task_count, args.records)
+        print(f"tasks={task_count:>6}: {per_record * 1e6:7.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
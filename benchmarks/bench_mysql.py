@@ -0,0 +1,82 @@
+"""
+Benchmark MySQL bulk writes and large reads.
+
+Inserts --rows rows with chunked execute_many and with LOAD DATA LOCAL INFILE,
+then reads them back with execute_query and stream_query, reporting rows per
+second and the growth of peak resident memory. Needs a running server with
+local_infile enabled.
+
+Usage: python benchmarks/bench_mysql.py --url user:password@localhost:3306/database
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from task_processor.plugins.mysql.plugin import MySQLConfig, MySQLPlugin
+
+TABLE = "taskops_bench"
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rows(count: int):
+    for i in range(count):
+        yield i, f"event {i}", i * 0.5
+
+
+def timed(label: str, count: int, fn) -> None:
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    growth = peak_rss_mb() - before
+    print(f"{label:<22} {count / elapsed:>10,.0f} rows/s   peak RSS +{growth:,.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    parts = urlsplit(f"mysql://{args.url}")
+    plugin = MySQLPlugin(
+        MySQLConfig(
+            name="bench",
+            host=parts.hostname,
+            port=parts.port or 3306,
+            user=parts.username,
+            password=parts.password or "",
+            database=parts.path.lstrip("/"),
+            allow_local_infile=True,
+        )
+    )
+    plugin.initialize()
+    plugin.execute_command(f"DROP TABLE IF EXISTS {TABLE}")
+    plugin.execute_command(f"CREATE TABLE {TABLE} (id INT, name VARCHAR(64), value DOUBLE)")
+    insert = f"INSERT INTO {TABLE} (id, name, value) VALUES (%s, %s, %s)"
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+        f.writelines(f"{i},{name},{value}\n" for i, name, value in rows(args.rows))
+    try:
+        timed("execute_many", args.rows, lambda: plugin.execute_many(insert, rows(args.rows)))
+        plugin.execute_command(f"TRUNCATE TABLE {TABLE}")
+        timed("LOAD DATA", args.rows, lambda: plugin.load_file(TABLE, f.name))
+        # Stream first, so the peak RSS it reports is not hidden by the buffered read
+        query = f"SELECT * FROM {TABLE}"
+        timed("stream_query", args.rows, lambda: sum(1 for _ in plugin.stream_query(query)))
+        timed("execute_query", args.rows, lambda: len(plugin.execute_query(query)))
+        print(plugin.pool_stats())
+    finally:
+        os.unlink(f.name)
+        plugin.execute_command(f"DROP TABLE {TABLE}")
+        plugin.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark PostgreSQL bulk inserts and large reads.
+
+Inserts --rows rows with execute_many and with COPY, then reads them back with
+execute_query and with a server-side cursor, reporting rows per second and
+the growth of peak resident memory. Needs a running server.
+
+Usage: python benchmarks/bench_postgres.py --dsn "host=localhost user=postgres dbname=postgres"
+"""
+
+import argparse
+import resource
+import time
+
+from psycopg.conninfo import conninfo_to_dict
+
+from task_processor.plugins.postgres.plugin import PostgresConfig, PostgresPlugin
+
+TABLE = "taskops_bench"
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rows(count: int):
+    for i in range(count):
+        yield i, f"event {i}", i * 0.5
+
+
+def timed(label: str, count: int, fn) -> None:
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    growth = peak_rss_mb() - before
+    print(f"{label:<22} {count / elapsed:>10,.0f} rows/s   peak RSS +{growth:,.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", required=True)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    params = conninfo_to_dict(args.dsn)
+    plugin = PostgresPlugin(
+        PostgresConfig(
+            name="bench",
+            host=params.get("host", "localhost"),
+            port=int(params.get("port", 5432)),
+            user=params.get("user", "postgres"),
+            password=params.get("password", ""),
+            database=params.get("dbname", "postgres"),
+        )
+    )
+    plugin.initialize()
+    plugin.execute_command(f"DROP TABLE IF EXISTS {TABLE}")
+    plugin.execute_command(f"CREATE TABLE {TABLE} (id integer, name text, value float8)")
+    insert = f"INSERT INTO {TABLE} (id, name, value) VALUES (%s, %s, %s)"
+    try:
+        # Stream first, so the peak RSS it reports is not hidden by the buffered read
+        timed("COPY", args.rows, lambda: plugin.copy_rows(TABLE, rows(args.rows)))
+        query = f"SELECT * FROM {TABLE}"
+        timed("server-side cursor", args.rows, lambda: sum(1 for _ in plugin.stream_query(query)))
+        timed("execute_query", args.rows, lambda: len(plugin.execute_query(query)))
+        plugin.execute_command(f"TRUNCATE {TABLE}")
+        timed("execute_many", args.rows, lambda: plugin.execute_many(insert, rows(args.rows)))
+    finally:
+        plugin.execute_command(f"DROP TABLE {TABLE}")
+        plugin.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark Redis queue throughput in jobs per second at several worker counts.
+
+Enqueues --jobs runs in pipelined batches on the Redis server at --url, then
+drains them with 1, 4 and 16 consumer threads. Each job "runs" for --work-ms.
+Needs a running server.
+
+Usage: python benchmarks/bench_queue.py [--jobs 5000] [--work-ms 2] [--url redis://localhost:6379/0]
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from task_processor.core.executor import RunResult
+from task_processor.core.models import Task
+from task_processor.plugins.redis.plugin import RedisConfig, RedisQueuePlugin
+
+
+class SleepExecutor:
+    def __init__(self, work: float):
+        self.work = work
+
+    def execute_task(self, task: Task, attempt: int = 1) -> RunResult:
+        started_at = datetime.now()
+        time.sleep(self.work)
+        return RunResult(task.name, "success", started_at, datetime.now(), exit_code=0)
+
+
+def run(plugin: RedisQueuePlugin, jobs: int, workers: int, work: float) -> float:
+    task = Task(
+        name="bench",
+        command="true",
+        schedule={"type": "recurring", "interval": "1m"},
+        retry={"max_attempts": 1, "delay": 1},
+    )
+    plugin.enqueue_many(task for _ in range(jobs))
+    stop = threading.Event()
+    executor = SleepExecutor(work)
+    threads = [
+        threading.Thread(target=plugin.consume, args=(executor, stop)) for _ in range(workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while plugin.stats()["ready"] or plugin.stats()["processing"]:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--work-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--url", type=str, default="redis://localhost:6379/0")
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        plugin = RedisQueuePlugin(
+            RedisConfig(name="bench", url=args.url, queue=f"taskops-bench-{workers}")
+        )
+        plugin.initialize()
+        elapsed = run(plugin, args.jobs, workers, args.work_ms / 1000)
+        plugin.cleanup()
+        print(f"{workers:>2} worker(s): {args.jobs / elapsed:,.0f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
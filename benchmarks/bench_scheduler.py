@@ -0,0 +1,64 @@
+"""
+Benchmark the scheduler's timer heap against the `schedule` polling loop.
+
+Usage: python benchmarks/bench_scheduler.py [--tasks 100000]
+"""
+
+import argparse
+import random
+import time
+
+import schedule
+
+from task_processor.core.scheduler import TimerQueue
+
+
+def bench_timer_queue(count: int) -> None:
+    timers = TimerQueue(clock=lambda: 0.0)
+    fire_times = [random.uniform(0, 3600) for _ in range(count)]
+    noop = lambda: None  # noqa: E731
+
+    started = time.perf_counter()
+    for i, when in enumerate(fire_times):
+        timers.schedule(i, when, noop)
+    insert = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        timers.next_fire_time()
+    idle_tick = (time.perf_counter() - started) / 1000
+
+    started = time.perf_counter()
+    fired = len(timers.pop_due(now=3600))
+    fire = time.perf_counter() - started
+
+    print(
+        f"TimerQueue  n={count:>7}: insert {insert / count * 1e6:6.2f} us/op, "
+        f"fire {fire / fired * 1e6:6.2f} us/op, idle tick {idle_tick * 1e6:8.2f} us"
+    )
+
+
+def bench_schedule_library(count: int) -> None:
+    scheduler = schedule.Scheduler()
+    for _ in range(count):
+        scheduler.every(random.randint(1, 60)).minutes.do(lambda: None)
+
+    started = time.perf_counter()
+    for _ in range(10):
+        scheduler.run_pending()
+    idle_tick = (time.perf_counter() - started) / 10
+    print(f"schedule    n={count:>7}: idle tick {idle_tick * 1e6:8.2f} us (full scan per tick)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for count in (1_000, 10_000, args.tasks):
+        bench_timer_queue(count)
+    bench_schedule_library(args.tasks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark runs per second of a trivial command through the shell and without it.
+
+Runs --runs executions of "true" with TaskExecutor, once forced through
+/bin/sh -c and once exec'd directly, from --threads worker threads.
+
+Usage: python benchmarks/bench_spawn.py [--runs 2000] [--threads 4] 2>/dev/null
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from task_processor.core.executor import TaskExecutor
+from task_processor.core.models import Task
+from task_processor.utils.logging import LogConfig, LogManager
+
+
+def runs_per_second(executor: TaskExecutor, task: Task, runs: int, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: executor.execute_task(task), range(runs)))
+    elapsed = time.perf_counter() - started
+    assert all(result.succeeded for result in results)
+    return runs / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    base = {
+        "name": "spawn",
+        "command": "true",
+        "schedule": {"type": "recurring", "interval": "1m"},
+        "retry": {"max_attempts": 1, "delay": 1},
+    }
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_manager = LogManager(LogConfig(log_dir=log_dir, batch_writes=True))
+        executor = TaskExecutor(log_manager)
+        for label, shell in (("shell", True), ("direct", None)):
+            rate = runs_per_second(executor, Task(**base, shell=shell), args.runs, args.threads)
+            print(f"{label}: {rate:,.0f} runs/s")
+        log_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark interpreter startup for the package and the CLI.
+
+Times fresh interpreters running "import task_processor" and
+"python -m task_processor --help" against a bare interpreter, and exits
+non-zero if either takes longer than --budget-ms over the baseline.
+
+Usage: python benchmarks/bench_startup.py [--runs 20] [--budget-ms 100]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import task_processor": [sys.executable, "-c", "import task_processor"],
+    "taskops --help": [sys.executable, "-m", "task_processor", "--help"],
+}
+
+
+def best_of(command, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    timings = {label: best_of(command, args.runs) for label, command in COMMANDS.items()}
+    baseline = timings.pop("python")
+    print(f"python: {baseline * 1e3:.1f} ms")
+    over_budget = False
+    for label, elapsed in timings.items():
+        extra = (elapsed - baseline) * 1e3
+        over_budget |= extra > args.budget_ms
+        print(f"{label}: {elapsed * 1e3:.1f} ms (+{extra:.1f} ms)")
+    if over_budget:
+        sys.exit(f"startup exceeds the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,7 @@ setup(
         "schedule>=1.2.0",
         "loguru>=0.7.0",
         "pyyaml>=6.0",
+        'backports.zoneinfo>=0.2.1; python_version < "3.9"',
     ],
     extras_require={
         "dev": [
@@ -45,6 +46,10 @@ setup(
             "twine>=5.0.0",
         ],
         "mysql": ["mysql-connector-python>=8.0.0"],
+        "coordination": ["sqlalchemy>=1.4"],
+        "redis": ["redis>=4.2.0"],
+        "http": ["aiohttp>=3.8.0"],
+        "postgres": ["psycopg[binary]>=3.1.0", "psycopg-pool>=3.1.0"],
     },
     entry_points={
         "console_scripts": [
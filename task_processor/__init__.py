@@ -2,11 +2,11 @@
 Task Processor - A flexible and extensible task processing system
 """
 
-from task_processor.core.executor import TaskExecutor
-from task_processor.core.models import RetryConfig, Schedule, Task
-from task_processor.core.scheduler import TaskScheduler
-from task_processor.utils.config_loader import ConfigLoader
-from task_processor.utils.logging import LogConfig, LogManager
+import importlib
+
+# Not imported from typing: importing typing alone costs more than the rest of
+# the package import. Type checkers treat this name specially either way.
+TYPE_CHECKING = False
 
 __version__ = "0.1.7"
 __author__ = "Sharik Shaikh"
@@ -22,3 +22,37 @@ __all__ = [
     "LogManager",
     "LogConfig",
 ]
+
+# The public API is imported on first use so that importing the package (and
+# running short-lived CLI commands) does not pay for pydantic, loguru, yaml and
+# asyncio up front.
+_LAZY_ATTRIBUTES = {
+    "Task": "task_processor.core.models",
+    "Schedule": "task_processor.core.models",
+    "RetryConfig": "task_processor.core.models",
+    "TaskScheduler": "task_processor.core.scheduler",
+    "TaskExecutor": "task_processor.core.executor",
+    "ConfigLoader": "task_processor.utils.config_loader",
+    "LogManager": "task_processor.utils.logging",
+    "LogConfig": "task_processor.utils.logging",
+}
+
+if TYPE_CHECKING:
+    from task_processor.core.executor import TaskExecutor
+    from task_processor.core.models import RetryConfig, Schedule, Task
+    from task_processor.core.scheduler import TaskScheduler
+    from task_processor.utils.config_loader import ConfigLoader
+    from task_processor.utils.logging import LogConfig, LogManager
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,8 +1,7 @@
 import argparse
+import os
 import sys
-from pathlib import Path
-
-from task_processor import ConfigLoader, LogConfig, LogManager, TaskScheduler
+import threading
 
 
 def main():
@@ -15,6 +14,12 @@ def main():
         default="config",
         help="Directory containing task configuration files",
     )
+    parser.add_argument(
+        "--config-cache",
+        type=str,
+        default="~/.task_processor/config_cache.pickle",
+        help="File caching parsed task configurations between starts ('' to disable)",
+    )
     parser.add_argument(
         "--log-dir",
         type=str,
@@ -27,22 +32,336 @@ def main():
         default=10,
         help="Maximum number of log files to keep per task",
     )
+    parser.add_argument(
+        "--batch-logs",
+        action="store_true",
+        help="Write task logs from a background thread in batches",
+    )
+    parser.add_argument(
+        "--log-backpressure",
+        choices=["block", "drop_debug", "sample"],
+        default="block",
+        help="What batched logging does when its queue is full",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Reload changed task configuration files without restarting",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between checks for changed configuration files",
+    )
+    parser.add_argument(
+        "--history-db",
+        type=str,
+        default=None,
+        help="SQLite file to record the history of every task run in",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory of cached results replayed for tasks that set cache",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=10000,
+        help="Cached results kept before the least recently used are evicted",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=100,
+        help="Disk space cached results may take before the least recently used are evicted",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Seconds a cached result stays valid when its task sets no cache.ttl",
+    )
+    parser.add_argument(
+        "--history-retention-days",
+        type=int,
+        default=30,
+        help="Days of per-run history to keep before rolling it into daily aggregates",
+    )
+    parser.add_argument(
+        "--compact-interval",
+        type=int,
+        default=3600,
+        help="Seconds between history and log compaction passes",
+    )
+    parser.add_argument(
+        "--coordination-db",
+        type=str,
+        default=None,
+        help=(
+            "Database URL (or SQLite file) shared by runner replicas; each fire runs on one "
+            "replica (coordination extra)"
+        ),
+    )
+    parser.add_argument(
+        "--replica-id",
+        type=str,
+        default=None,
+        help="Name of this replica in the coordination database (default: host-pid-random)",
+    )
+    parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=30.0,
+        help="Seconds without a heartbeat after which another replica takes over a run",
+    )
+    parser.add_argument(
+        "--redis-url",
+        type=str,
+        default=None,
+        help="Enqueue due runs on this Redis instead of running them (needs the redis extra)",
+    )
+    parser.add_argument(
+        "--redis-queue",
+        type=str,
+        default="taskops",
+        help="Prefix of the Redis queue's keys",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run jobs from the --redis-url queue instead of scheduling tasks",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Maximum number of tasks to run concurrently (default: 8)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=10000,
+        help="Maximum runs waiting for a worker; when full, lower-priority runs are dropped",
+    )
+    parser.add_argument(
+        "--priority-aging",
+        type=float,
+        default=60.0,
+        help="Seconds a waiting run may be passed over by higher-priority runs",
+    )
+    parser.add_argument(
+        "--spread",
+        action="store_true",
+        help="Offset each recurring task by a stable, name-derived fraction of its interval",
+    )
+    parser.add_argument(
+        "--max-dispatch-rate",
+        type=float,
+        default=None,
+        help="Maximum task dispatches per second; extra runs are deferred, not dropped",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "async"],
+        default="thread",
+        help="Run tasks on worker threads or on a single asyncio event loop",
+    )
+    parser.add_argument(
+        "--output-buffer-size",
+        type=int,
+        default=None,
+        help="Bytes of task output buffered per stream in async mode (default: 65536)",
+    )
+
+    parser.add_argument(
+        "--python-workers",
+        type=int,
+        default=2,
+        help="Worker processes that run entrypoint tasks",
+    )
+    parser.add_argument(
+        "--python-preload",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="Module each Python worker imports when it starts (repeatable)",
+    )
+    parser.add_argument(
+        "--python-worker-max-runs",
+        type=int,
+        default=100,
+        help="Runs after which a Python worker is replaced",
+    )
+    parser.add_argument(
+        "--python-worker-max-memory",
+        type=float,
+        default=None,
+        help="Resident memory in MB above which a Python worker is replaced",
+    )
+    parser.add_argument(
+        "--http-max-connections",
+        type=int,
+        default=100,
+        help="Open connections the HTTP client keeps across all hosts",
+    )
+    parser.add_argument(
+        "--http-max-per-host",
+        type=int,
+        default=10,
+        help="Open connections the HTTP client keeps per host",
+    )
+    parser.add_argument(
+        "--http-max-in-flight",
+        type=int,
+        default=1000,
+        help="HTTP task requests in flight at once",
+    )
 
     args = parser.parse_args()
+    if args.worker and not args.redis_url:
+        parser.error("--worker requires --redis-url")
+
+    # Imported after argument parsing so --help and usage errors return immediately
+    from task_processor.core.cache import ResultCache
+    from task_processor.core.coordination import LeaseCoordinator
+    from task_processor.core.executor import DEFAULT_OUTPUT_BUFFER, TaskExecutor
+    from task_processor.core.history import RunHistory
+    from task_processor.core.pool import DEFAULT_MAX_WORKERS
+    from task_processor.core.retention import Compactor, RetentionPolicy
+    from task_processor.core.scheduler import TaskScheduler
+    from task_processor.core.workers import PythonWorkerPool
+    from task_processor.plugins.http.plugin import (
+        AIOHTTP_AVAILABLE,
+        HttpConfig,
+        HttpPlugin,
+    )
+    from task_processor.utils.config_loader import ConfigLoader, ConfigWatcher
+    from task_processor.utils.logging import LogConfig, LogManager
 
     try:
         # Initialize components
-        log_config = LogConfig(log_dir=args.log_dir)
+        log_config = LogConfig(
+            log_dir=args.log_dir,
+            max_files=args.max_log_files,
+            batch_writes=args.batch_logs,
+            backpressure=args.log_backpressure,
+        )
         log_manager = LogManager(log_config)
-        config_loader = ConfigLoader(config_dir=args.config_dir)
-        scheduler = TaskScheduler(log_manager)
+        config_loader = ConfigLoader(config_dir=args.config_dir, cache_path=args.config_cache)
+        history = RunHistory(os.path.expanduser(args.history_db)) if args.history_db else None
+        result_cache = None
+        if args.cache_dir:
+            result_cache = ResultCache(
+                os.path.expanduser(args.cache_dir),
+                max_entries=args.cache_max_entries,
+                max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                ttl=args.cache_ttl,
+            )
+        coordinator = None
+        if args.coordination_db:
+            coordinator = LeaseCoordinator(
+                os.path.expanduser(args.coordination_db),
+                replica_id=args.replica_id,
+                lease_ttl=args.lease_ttl,
+            )
+        http_client = None
+        if AIOHTTP_AVAILABLE:
+            http_client = HttpPlugin(
+                HttpConfig(
+                    name="http",
+                    max_connections=args.http_max_connections,
+                    max_connections_per_host=args.http_max_per_host,
+                    max_in_flight=args.http_max_in_flight,
+                )
+            )
+            http_client.initialize()
+        python_workers = PythonWorkerPool(
+            size=args.python_workers,
+            preload=args.python_preload,
+            max_runs=args.python_worker_max_runs,
+            max_memory=args.python_worker_max_memory,
+        )
+        # An explicit 0 is passed on, to be rejected, rather than read as "use the default"
+        max_workers = DEFAULT_MAX_WORKERS if args.max_workers is None else args.max_workers
+        output_buffer_size = (
+            DEFAULT_OUTPUT_BUFFER if args.output_buffer_size is None else args.output_buffer_size
+        )
+        queue = None
+        if args.redis_url:
+            from task_processor.plugins.redis.plugin import (
+                RedisConfig,
+                RedisQueuePlugin,
+            )
+
+            queue = RedisQueuePlugin(
+                RedisConfig(name="queue", url=args.redis_url, queue=args.redis_queue)
+            )
+            queue.initialize()
+
+        if args.worker:
+            executor = TaskExecutor(
+                log_manager,
+                python_workers=python_workers,
+                http_client=http_client,
+                result_cache=result_cache,
+            )
+            print(f"Task Processor is running jobs from {args.redis_queue}. Press Ctrl+C to stop.")
+            processed = _consume(queue, executor, max_workers, history)
+            print(f"\nShutting down gracefully after {processed} jobs...")
+            queue.cleanup()
+            python_workers.close()
+            if http_client is not None:
+                http_client.cleanup()
+            if history is not None:
+                history.close()
+            log_manager.close()
+            sys.exit(0)
+
+        scheduler = TaskScheduler(
+            log_manager,
+            max_workers=max_workers,
+            executor_mode=args.executor,
+            output_buffer_size=output_buffer_size,
+            history=history,
+            python_workers=python_workers,
+            coordinator=coordinator,
+            http_client=http_client,
+            spread=args.spread,
+            max_dispatch_rate=args.max_dispatch_rate,
+            max_queue=args.max_queue,
+            priority_aging=args.priority_aging,
+            result_cache=result_cache,
+        )
+
+        retention = RetentionPolicy(
+            history_days=args.history_retention_days, interval=args.compact_interval
+        )
+        compactor = Compactor(retention, history=history, log_manager=log_manager)
+        scheduler.add_maintenance(
+            "compaction", retention.interval, lambda: compactor.run_once(list(scheduler.tasks))
+        )
+
+        if queue is not None:
+            # Before the tasks are added, so ones the queue cannot run are refused
+            queue.attach(scheduler)
 
         # Load and schedule tasks
-        tasks = config_loader.load_configs()
-        for task in tasks:
-            scheduler.add_task(task)
+        if args.watch:
+            watcher = ConfigWatcher(config_loader)
+            tasks = watcher.load()
+            scheduler.add_maintenance(
+                "config-reload",
+                args.watch_interval,
+                lambda: scheduler.apply_config_diff(watcher.poll()),
+            )
+        else:
+            tasks = config_loader.load_configs()
+        scheduler.add_tasks(tasks)
 
-        print(f"Loaded {len(tasks)} tasks from {args.config_dir}")
+        print(f"Loaded {config_loader.stats} from {args.config_dir}")
         print("Task Processor is running. Press Ctrl+C to stop.")
 
         # Run the scheduler
@@ -50,12 +369,57 @@ def main():
 
     except KeyboardInterrupt:
         print("\nShutting down gracefully...")
+        stats = scheduler.dispatch_stats()
+        print(f"Dispatches per second (last hour): {stats['histogram']}, peak {stats['peak']}")
+        for priority, waits in stats["queue"].items():
+            print(
+                f"Queue wait ({priority}): {waits['served']} runs, "
+                f"p50 {waits['wait_p50']:.3f}s, p99 {waits['wait_p99']:.3f}s, "
+                f"max {waits['wait_max']:.3f}s, {waits['rejected']} dropped"
+            )
+        if result_cache is not None:
+            cache_stats = result_cache.stats()
+            print(
+                f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['evictions']} evictions, {cache_stats['entries']} stored"
+            )
         scheduler.stop()
+        if queue is not None:
+            queue.cleanup()
+        if history is not None:
+            history.close()
+        log_manager.close()
         sys.exit(0)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def _consume(queue, executor, workers: int, history) -> int:
+    """Run jobs from ``queue`` on ``workers`` threads until Ctrl+C. Returns the number run."""
+    if workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    stop = threading.Event()
+    counts = []
+    threads = [
+        threading.Thread(
+            target=lambda: counts.append(queue.consume(executor, stop, history=history)),
+            name=f"queue-worker-{i}",
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        # Each worker finishes the job it is running first
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return sum(counts)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from task_processor.core.models import Task
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# Bytes of a run's output kept with its cached result
+SUMMARY_BYTES = 4096
+
+
+@functools.lru_cache(maxsize=4096)
+def _content_digest(path: str, size: int, mtime_ns: int) -> str:
+    """SHA-256 of a file, computed once per version of it seen by stat."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprints(patterns: List[str], digest: str) -> List[list]:
+    fingerprints = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(os.path.expanduser(pattern), recursive=True))
+        if not paths:
+            # Creating a missing input must change the key too
+            fingerprints.append([pattern, None])
+        for path in paths:
+            st = os.stat(path)
+            if digest == "content":
+                fingerprints.append([path, _content_digest(path, st.st_size, st.st_mtime_ns)])
+            else:
+                fingerprints.append([path, st.st_size, st.st_mtime_ns])
+    return fingerprints
+
+
+def cache_key(task: Task) -> str:
+    """Content address of a task's result.
+
+    A SHA-256 over what the run does (command, entrypoint and kwargs, or HTTP
+    request), the values of the environment variables named in ``task.cache``
+    and a fingerprint of each of its input files. Tasks that do the same work
+    on the same inputs share a key whatever their names.
+    """
+    config = task.cache
+    material = {
+        "command": task.command,
+        "shell": task.shell,
+        "entrypoint": task.entrypoint,
+        "kwargs": task.kwargs,
+        "http": task.http.model_dump() if task.http is not None else None,
+        "env": {name: os.environ.get(name) for name in config.env},
+        "inputs": _fingerprints(config.inputs, config.digest),
+    }
+    encoded = json.dumps(material, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """Recorded outcome of a run, replayed in place of running it again."""
+
+    status: str
+    exit_code: Optional[int]
+    output_size: int
+    summary: str
+    stored_at: float
+    expires_at: Optional[float] = None
+
+
+class ResultCache:
+    """On-disk store of task results keyed by ``cache_key``.
+
+    Each result is a small JSON file named after its key. The least recently
+    used results are evicted once there are more than ``max_entries`` or they
+    take more than ``max_bytes`` on disk, and a result older than its TTL is
+    treated as a miss and deleted. Recency is kept in the files' mtimes, so
+    it survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: str = "data/cache",
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Open (and if needed create) the cache directory and index its results.
+
+        ``ttl`` is the lifetime of results whose task sets no ``cache.ttl``.
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".json") and entry.is_file():
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name[: -len(".json")], st.st_size))
+        with self._lock:
+            for _, key, size in sorted(entries):
+                self._sizes[key] = size
+                self._bytes += size
+            self._evict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sizes)
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """The live result stored under ``key``, counting a hit or a miss."""
+        with self._lock:
+            result = self._load(key) if key in self._sizes else None
+            if result is None:
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(key)
+            os.utime(self._path(key))
+            self.hits += 1
+            return result
+
+    def put(
+        self,
+        key: str,
+        status: str,
+        exit_code: Optional[int] = None,
+        output_size: int = 0,
+        summary: str = "",
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Store a run's outcome under ``key``, evicting old results to stay within the caps."""
+        now = self.clock()
+        ttl = self.ttl if ttl is None else ttl
+        result = CachedResult(
+            status=status,
+            exit_code=exit_code,
+            output_size=output_size,
+            summary=summary[-SUMMARY_BYTES:],
+            stored_at=now,
+            expires_at=now + ttl if ttl is not None else None,
+        )
+        data = json.dumps(asdict(result)).encode()
+        path = self._path(key)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+            self._bytes += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Hits, misses and evictions so far, and the results and bytes now stored."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._sizes),
+                "bytes": self._bytes,
+            }
+
+    def clear(self) -> None:
+        """Delete every stored result."""
+        with self._lock:
+            while self._sizes:
+                self._remove(next(iter(self._sizes)))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[CachedResult]:
+        try:
+            with open(self._path(key), "rb") as f:
+                result = CachedResult(**json.loads(f.read()))
+        except (OSError, ValueError, TypeError):
+            self._remove(key)
+            return None
+        if result.expires_at is not None and self.clock() >= result.expires_at:
+            self._remove(key)
+            return None
+        return result
+
+    def _evict(self) -> None:
+        while self._sizes and (len(self._sizes) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._sizes)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._sizes.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
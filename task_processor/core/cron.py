@@ -0,0 +1,209 @@
+import bisect
+import calendar
+import functools
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python 3.8
+    from backports.zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+MONTH_NAMES = {name.lower(): i for i, name in enumerate(calendar.month_abbr) if name}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+# Fire times precomputed per refill of a schedule's next-fire table
+TABLE_SIZE = 64
+# Longest length of each month, leap years included
+MONTH_LENGTHS = [0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+# A schedule with no fire for this many months in a row never fires (e.g. "0 0 30 2 *")
+MAX_SEARCH_MONTHS = 12 * 8
+
+
+def _parse_field(field: str, low: int, high: int, names: Dict[str, int]) -> int:
+    """Compile one cron field into a bitmask with bit ``n`` set for each value ``n``."""
+
+    def value(text: str) -> int:
+        return names[text.lower()] if text.lower() in names else int(text)
+
+    mask = 0
+    for part in field.split(","):
+        expr, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"step in {field!r} must be at least 1")
+        if expr == "*":
+            start, end = low, high
+        else:
+            start_text, _, end_text = expr.partition("-")
+            start = value(start_text)
+            # "5/15" means from 5 to the end of the range in steps of 15
+            end = value(end_text) if end_text else (high if step_text else start)
+        if not low <= start <= end <= high:
+            raise ValueError(f"{field!r} is outside {low}-{high}")
+        for n in range(start, end + 1, step):
+            mask |= 1 << n
+    return mask
+
+
+def _bits(mask: int) -> List[int]:
+    return [i for i in range(mask.bit_length()) if mask >> i & 1]
+
+
+class CronSchedule:
+    """A compiled five-field cron expression evaluated in a timezone.
+
+    Fields are ``minute hour day-of-month month day-of-week``, with ``*``,
+    ranges, steps, lists, month and weekday names and the ``@daily`` style
+    macros. As in Vixie cron, when both day fields are restricted a day
+    matches either of them.
+
+    Each field compiles once into a bitmask. The matching days of a month
+    come from a few mask operations, the fire times within a matching day
+    from one precomputed list of offsets, and upcoming fire times are kept in
+    a table that is refilled in bulk, so ``next_fire`` is a lookup in the
+    common case.
+
+    Wall-clock times skipped by a DST change do not fire; times repeated when
+    the clocks go back fire once.
+    """
+
+    def __init__(self, expression: str, timezone: str = "UTC"):
+        """Compile ``expression``. Raises ValueError if it is not valid cron syntax."""
+        self.expression = expression
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression {expression!r} must have five fields")
+        try:
+            self.minutes = _parse_field(fields[0], 0, 59, {})
+            self.hours = _parse_field(fields[1], 0, 23, {})
+            self.days = _parse_field(fields[2], 1, 31, {})
+            self.months = _parse_field(fields[3], 1, 12, MONTH_NAMES)
+            weekdays = _parse_field(fields[4], 0, 7, DAY_NAMES)
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Invalid cron expression {expression!r}: {e}") from None
+        # 7 is another name for Sunday
+        self.weekdays = (weekdays | weekdays >> 7) & 0x7F
+        self._day_or = not fields[2].startswith("*") and not fields[4].startswith("*")
+        if not self._day_or and not any(
+            self.days & ((1 << (MONTH_LENGTHS[month] + 1)) - 2) for month in _bits(self.months)
+        ):
+            raise ValueError(f"Cron expression {expression!r} never fires")
+
+        # Seconds after midnight of every fire on a matching day
+        self._offsets = [h * 3600 + m * 60 for h in _bits(self.hours) for m in _bits(self.minutes)]
+        # Day-of-month masks of the matching weekdays, by the weekday of the 1st
+        self._weekday_masks = [
+            sum(1 << day for day in range(1, 32) if self.weekdays >> ((first + day - 1) % 7) & 1)
+            for first in range(7)
+        ]
+        self._month_masks: Dict[Tuple[int, int], int] = {}
+        self._table: Tuple[float, List[float]] = (0.0, [])
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r}, {self.timezone!r})"
+
+    def matches(self, moment: datetime) -> bool:
+        """Whether the schedule fires at ``moment``'s minute (naive times are local)."""
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(self.tz)
+        return bool(
+            self.minutes >> moment.minute & 1
+            and self.hours >> moment.hour & 1
+            and self._month_mask(moment.year, moment.month) >> moment.day & 1
+        )
+
+    def next_fire(self, after: float) -> float:
+        """Epoch time of the first fire strictly after ``after``."""
+        start, table = self._table
+        if table and start <= after < table[-1]:
+            return table[bisect.bisect_right(table, after)]
+        table = self.next_fire_times(after, TABLE_SIZE)
+        self._table = (after, table)
+        return table[0]
+
+    def next_fire_times(self, after: float, count: int) -> List[float]:
+        """Epoch times of the next ``count`` fires strictly after ``after``."""
+        local = datetime.fromtimestamp(after, self.tz)
+        first_day = local.date()
+        elapsed = local.hour * 3600 + local.minute * 60 + local.second
+        fires: List[float] = []
+        for day in self._matching_days(first_day):
+            offsets = self._offsets
+            if day == first_day:
+                offsets = offsets[bisect.bisect_right(offsets, elapsed) :]
+            fires.extend(t for t in self._day_times(day, offsets) if t > after)
+            if len(fires) >= count:
+                return fires[:count]
+        return fires
+
+    def _month_mask(self, year: int, month: int) -> int:
+        """Days of a month (bit ``d`` for day ``d``) on which the schedule fires."""
+        key = (year, month)
+        mask = self._month_masks.get(key)
+        if mask is not None:
+            return mask
+        if not self.months >> month & 1:
+            mask = 0
+        else:
+            first_weekday, length = calendar.monthrange(year, month)
+            # Python counts weekdays from Monday, cron from Sunday
+            weekday_mask = self._weekday_masks[(first_weekday + 1) % 7]
+            if self._day_or:
+                mask = self.days | weekday_mask
+            else:
+                mask = self.days & weekday_mask
+            mask &= (1 << (length + 1)) - 2
+        with self._lock:
+            if len(self._month_masks) > 1024:
+                self._month_masks.clear()
+            self._month_masks[key] = mask
+        return mask
+
+    def _matching_days(self, start: date) -> Iterator[date]:
+        year, month, day = start.year, start.month, start.day
+        empty_months = 0
+        while empty_months < MAX_SEARCH_MONTHS:
+            mask = self._month_mask(year, month) >> day << day
+            empty_months = 0 if mask else empty_months + 1
+            while mask:
+                low = mask & -mask
+                yield date(year, month, low.bit_length() - 1)
+                mask ^= low
+            year, month, day = (year + 1, 1, 1) if month == 12 else (year, month + 1, 1)
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def _day_times(self, day: date, offsets: List[int]) -> List[float]:
+        midnight = datetime.combine(day, time(), self.tz)
+        next_midnight = datetime.combine(day + timedelta(days=1), time(), self.tz)
+        if midnight.utcoffset() == next_midnight.utcoffset():
+            # No DST change today: every fire is a fixed offset from midnight
+            base = midnight.timestamp()
+            return [base + offset for offset in offsets]
+        times = []
+        for offset in offsets:
+            wall = midnight + timedelta(seconds=offset)
+            timestamp = wall.timestamp()
+            if datetime.fromtimestamp(timestamp, self.tz).replace(tzinfo=None) == wall.replace(
+                tzinfo=None
+            ):
+                times.append(timestamp)
+        return times
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_cron(expression: str, timezone: str = "UTC") -> CronSchedule:
+    """Compiled schedule for an expression, shared by every task that uses it."""
+    return CronSchedule(expression, timezone)
@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+from task_processor.core.models import Task
+
+
+class DependencyCycleError(ValueError):
+    """Raised when task dependencies form a cycle."""
+
+
+class TaskGraph:
+    """Directed graph of task dependencies.
+
+    Edges point from a task to the tasks that depend on it, so everything
+    that becomes runnable when a task succeeds is one dict lookup away.
+    """
+
+    def __init__(self):
+        self.upstream: Dict[str, Set[str]] = {}
+        self.downstream: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task]) -> "TaskGraph":
+        """Build a graph from tasks, raising DependencyCycleError on a cycle."""
+        graph = cls()
+        for task in tasks:
+            graph.upstream[task.name] = set(task.dependencies)
+            graph.downstream.setdefault(task.name, set())
+            for dep in task.dependencies:
+                graph.downstream.setdefault(dep, set()).add(task.name)
+        graph.topological_order()
+        return graph
+
+    def add(self, name: str, dependencies: Iterable[str]) -> None:
+        """Add or replace a node, refusing changes that would create a cycle."""
+        dependencies = set(dependencies)
+        if name in dependencies or self._reaches(name, dependencies):
+            raise DependencyCycleError(f"Dependencies of {name} would create a cycle")
+        self.remove(name, keep_downstream=True)
+        self.upstream[name] = dependencies
+        self.downstream.setdefault(name, set())
+        for dep in dependencies:
+            self.downstream.setdefault(dep, set()).add(name)
+
+    def remove(self, name: str, keep_downstream: bool = False) -> None:
+        """Remove a node and its upstream edges."""
+        for dep in self.upstream.pop(name, ()):
+            self.downstream.get(dep, set()).discard(name)
+        if not keep_downstream and not self.downstream.get(name):
+            self.downstream.pop(name, None)
+
+    def missing(self) -> Set[str]:
+        """Dependencies that are not tasks in the graph."""
+        return {dep for deps in self.upstream.values() for dep in deps} - set(self.upstream)
+
+    def topological_order(self) -> List[str]:
+        """Task names with every task after its dependencies (Kahn's algorithm)."""
+        indegree = {
+            name: sum(1 for dep in deps if dep in self.upstream)
+            for name, deps in self.upstream.items()
+        }
+        ready = deque(sorted(name for name, degree in indegree.items() if degree == 0))
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for child in sorted(self.downstream.get(name, ())):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(indegree):
+            cycle = sorted(name for name, degree in indegree.items() if degree > 0)
+            raise DependencyCycleError(f"Task dependencies form a cycle: {', '.join(cycle)}")
+        return order
+
+    def _reaches(self, start: str, targets: Set[str]) -> bool:
+        """Whether any of ``targets`` is downstream of ``start``."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            for child in self.downstream.get(stack.pop(), ()):
+                if child in targets:
+                    return True
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return False
@@ -1,50 +1,543 @@
+import asyncio
+import functools
+import os
+import re
+import shlex
+import shutil
+import signal
 import subprocess
-import time
-from typing import Optional
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
+from task_processor.core.cache import SUMMARY_BYTES, ResultCache, cache_key
 from task_processor.core.models import Task
+from task_processor.core.workers import PythonWorkerPool
 from task_processor.utils.logging import LogConfig, LogManager
 
+DEFAULT_OUTPUT_BUFFER = 64 * 1024
+DEFAULT_KILL_GRACE = 5.0
+
+
+@dataclass
+class RunResult:
+    """Outcome of a single task run."""
+
+    task_name: str
+    status: str
+    started_at: datetime
+    finished_at: datetime
+    exit_code: Optional[int] = None
+    output_size: int = 0
+    attempt: int = 1
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == "success"
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+def _start_run(task: Task, attempt: Optional[int]) -> datetime:
+    """Record the start of a run on the task and return its start time."""
+    task.attempts = 0 if attempt is None else attempt - 1
+    task.last_run = datetime.now()
+    return task.last_run
+
+
+def _finish_run(
+    task: Task, status: str, started_at: datetime, exit_code: Optional[int], output_size: int
+) -> RunResult:
+    """Record the outcome of a run on the task."""
+    task.last_status = "success" if status == "success" else "failed"
+    return RunResult(
+        task_name=task.name,
+        status=status,
+        started_at=started_at,
+        finished_at=datetime.now(),
+        exit_code=exit_code,
+        output_size=output_size,
+        attempt=task.attempts + 1,
+    )
+
+
+# Characters that give a command string a meaning only a shell can provide:
+# pipes, lists, redirection, substitution, globbing, comments and escapes
+_SHELL_SYNTAX = set("|&;<>()$`\\*?[]{}~#!\n")
+# Quoted text in which none of those characters are special
+_QUOTED = re.compile(r"'[^']*'|\"[^\"$`\\]*\"")
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_command(command: str) -> Optional[Tuple[str, ...]]:
+    """Argv for a command string that uses no shell syntax, or None if it does."""
+    if _SHELL_SYNTAX & set(_QUOTED.sub("", command)):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    # Empty commands and environment assignments
+    if not argv or "=" in argv[0]:
+        return None
+    return tuple(argv)
+
+
+def _command_argv(task: Task) -> Optional[List[str]]:
+    """Argv to exec for a task, or None when it must run through the shell."""
+    if isinstance(task.command, list):
+        return task.command
+    if task.shell:
+        return None
+    if task.shell is False:
+        return shlex.split(task.command)
+    argv = _split_command(task.command)
+    if argv is None:
+        return None
+    # Looked up on every spawn, as PATH changes; builtins such as cd or exit
+    # are not found and go to the shell
+    executable = shutil.which(argv[0])
+    if executable is None:
+        return None
+    return [executable, *argv[1:]]
+
+
+def _ulimit_commands(task: Task) -> Optional[str]:
+    """Shell commands that apply the task's resource limits, if it has any.
+
+    The limits are set by a shell the run starts in rather than by a
+    ``preexec_fn``, which is not safe to run in a child forked from a
+    process with other threads.
+    """
+    limits = []
+    if task.cpu_time is not None:
+        # SIGXCPU at the soft limit, SIGKILL a second later. The soft limit
+        # goes first, since it may never be above the hard one.
+        limits.append(f"ulimit -S -t {task.cpu_time}")
+        limits.append(f"ulimit -H -t {task.cpu_time + 1}")
+    if task.max_memory is not None:
+        limits.append(f"ulimit -v {task.max_memory * 1024}")
+    if not limits:
+        return None
+    # A limit that cannot be set fails the run rather than lifting the limit
+    return " && ".join(limits) + " || exit 126"
+
+
+def _spawn_command(task: Task) -> Tuple[Union[str, List[str]], bool]:
+    """What to spawn for a command task, and whether it is a shell command string."""
+    argv = _command_argv(task)
+    limits = _ulimit_commands(task)
+    if limits is None:
+        return (task.command, True) if argv is None else (argv, False)
+    if argv is None:
+        return f"{limits}\n{task.command}", True
+    # The shell sets the limits and then becomes the program, keeping its pid
+    return ["/bin/sh", "-c", f'{limits}\nexec "$@"', "sh", *argv], False
+
+
+def _signal_group(pgid: int, sig: int) -> None:
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class _ProcessGroups:
+    """Process groups of the runs in flight, by task name.
+
+    Every run starts in a new session, so its process group holds the shell
+    and everything it started, and killing the group kills the whole tree.
+    """
+
+    def __init__(self, kill_grace: float):
+        self.kill_grace = kill_grace
+        self._lock = threading.Lock()
+        self._running: Dict[str, Set[int]] = {}
+        self._cancelled: Set[int] = set()
+        # Pending SIGKILLs of runs being killed, by process group id
+        self._kill_timers: Dict[int, threading.Timer] = {}
+
+    def add(self, task_name: str, pid: int) -> None:
+        with self._lock:
+            self._running.setdefault(task_name, set()).add(pid)
+
+    def remove(self, task_name: str, pid: int) -> bool:
+        """Forget a finished run. Returns whether it was cancelled.
+
+        Called once the run's process has been reaped. Processes of its group
+        that outlived SIGTERM still get the rest of the grace period before a
+        pending SIGKILL. If the group is already empty, its id may be reused,
+        so the SIGKILL is called off.
+        """
+        with self._lock:
+            pids = self._running.get(task_name, set())
+            pids.discard(pid)
+            if not pids:
+                self._running.pop(task_name, None)
+            timer = self._kill_timers.pop(pid, None)
+            cancelled = pid in self._cancelled
+            self._cancelled.discard(pid)
+        if timer is not None and not _group_alive(pid):
+            timer.cancel()
+        return cancelled
+
+    def cancel(self, task_name: str) -> int:
+        """Kill every run of a task. Returns the number of runs signalled."""
+        with self._lock:
+            pids = list(self._running.get(task_name, ()))
+            self._cancelled.update(pids)
+        for pid in pids:
+            self.kill(pid)
+        return len(pids)
+
+    def kill(self, pgid: int) -> None:
+        """SIGTERM a run's process group now and SIGKILL whatever is left after the grace period."""
+        timer = threading.Timer(self.kill_grace, _signal_group, (pgid, signal.SIGKILL))
+        timer.daemon = True
+        with self._lock:
+            if not any(pgid in pids for pids in self._running.values()):
+                # The run finished and was reaped in the meantime
+                return
+            previous = self._kill_timers.get(pgid)
+            self._kill_timers[pgid] = timer
+        if previous is not None:
+            previous.cancel()
+        _signal_group(pgid, signal.SIGTERM)
+        timer.start()
+
+
+def _run_entrypoint(
+    workers: PythonWorkerPool, groups: _ProcessGroups, task: Task, logger
+) -> Tuple[str, Optional[int], int, str]:
+    """Run an entrypoint task in a worker process.
+
+    Returns status, exit code, output size and standard output.
+    """
+    cancelled = []
+    try:
+        result = workers.run(
+            task.entrypoint,
+            task.kwargs,
+            timeout=task.timeout,
+            on_start=lambda pid: groups.add(task.name, pid),
+            on_finish=lambda pid: cancelled.append(groups.remove(task.name, pid)),
+        )
+    except TimeoutError:
+        logger.error(f"Task {task.name} timed out")
+        return "timeout", None, 0, ""
+    except Exception as e:
+        logger.error(f"Task {task.name} failed with error: {str(e)}")
+        return "failed", None, 0, ""
+
+    if result.stdout:
+        logger.debug(result.stdout)
+    if any(cancelled):
+        logger.warning(f"Task {task.name} was cancelled")
+        status = "cancelled"
+    elif result.exit_code == 0:
+        logger.info(f"Task {task.name} completed successfully")
+        status = "success"
+    else:
+        logger.error(f"Task {task.name} failed with exit code {result.exit_code}")
+        status = "failed"
+    if result.stderr:
+        logger.error(result.stderr)
+    return status, result.exit_code, len(result.stdout) + len(result.stderr), result.stdout
+
+
+def _no_http_client(task: Task, logger) -> str:
+    logger.error(f"Task {task.name} is an HTTP task but no HTTP client is configured")
+    return "failed"
+
+
+def _replay_cached(
+    cache: Optional[ResultCache], task: Task, started_at: datetime, logger
+) -> Tuple[Optional[str], Optional[RunResult]]:
+    """Cache key of a run, and the replayed result when the cache holds one."""
+    if cache is None or task.cache is None:
+        return None, None
+    try:
+        key = cache_key(task)
+    except OSError as e:
+        logger.warning(f"Task {task.name} runs uncached, its inputs cannot be read: {e}")
+        return None, None
+    cached = cache.get(key)
+    if cached is None:
+        return key, None
+    logger.info(f"Task {task.name} inputs are unchanged, replaying its cached result")
+    if cached.summary:
+        logger.debug(cached.summary)
+    return key, _finish_run(task, cached.status, started_at, cached.exit_code, cached.output_size)
+
+
+def _store_result(
+    cache: Optional[ResultCache], task: Task, key: Optional[str], result: RunResult, summary: str
+) -> RunResult:
+    """Record a successful run in the cache under the key computed before it ran."""
+    if key is not None and result.succeeded:
+        cache.put(key, result.status, result.exit_code, result.output_size, summary, task.cache.ttl)
+    return result
+
 
 class TaskExecutor:
-    def __init__(self, log_manager: Optional[LogManager] = None):
-        """Initialize the task executor."""
+    def __init__(
+        self,
+        log_manager: Optional[LogManager] = None,
+        kill_grace: float = DEFAULT_KILL_GRACE,
+        python_workers: Optional[PythonWorkerPool] = None,
+        http_client=None,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        """Initialize the task executor.
+
+        Runs that time out or are cancelled get SIGTERM, then SIGKILL after
+        ``kill_grace`` seconds. Entrypoint tasks run in ``python_workers`` and
+        HTTP tasks are sent through ``http_client`` (an initialized HttpPlugin).
+        Tasks that set ``cache`` replay results from ``result_cache`` while
+        their inputs are unchanged.
+        """
         self.log_manager = log_manager or LogManager(LogConfig())
+        self.python_workers = python_workers or PythonWorkerPool(kill_grace=kill_grace)
+        self.http_client = http_client
+        self.result_cache = result_cache
+        self._groups = _ProcessGroups(kill_grace)
+
+    def cancel(self, task_name: str) -> int:
+        """Kill the process trees of every run of a task. Returns the number of runs."""
+        return self._groups.cancel(task_name)
 
-    def execute_task(self, task: Task) -> None:
-        """Execute a task and handle its output."""
+    def execute_task(self, task: Task, attempt: Optional[int] = None) -> RunResult:
+        """Execute a task and handle its output.
+
+        ``attempt`` numbers this run within the current scheduled fire, from 1
+        for its first run (the default). Failed runs are not retried here; the
+        scheduler re-queues them.
+        """
         logger = self.log_manager.get_logger(task.name)
         logger.info(f"Starting task: {task.name}")
+        started_at = _start_run(task, attempt)
+        key, replayed = _replay_cached(self.result_cache, task, started_at, logger)
+        if replayed is not None:
+            return replayed
+        status, exit_code, output_size, summary = self._run(task, logger)
+        result = _finish_run(task, status, started_at, exit_code, output_size)
+        return _store_result(self.result_cache, task, key, result, summary)
+
+    def _run(self, task: Task, logger) -> Tuple[str, Optional[int], int, str]:
+        """Run a task. Returns status, exit code, output size and standard output."""
+        exit_code = None
+        output_size = 0
+        stdout = ""
+
+        if task.entrypoint is not None:
+            return _run_entrypoint(self.python_workers, self._groups, task, logger)
+
+        if task.http is not None:
+            if self.http_client is None:
+                return _no_http_client(task, logger), None, 0, ""
+            return (*self.http_client.run(task, logger), "")
 
         try:
-            result = subprocess.run(
-                task.command,
-                shell=True,
-                capture_output=True,
+            command, shell = _spawn_command(task)
+            process = subprocess.Popen(
+                command,
+                shell=shell,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=task.timeout if hasattr(task, "timeout") else None,
+                start_new_session=True,
             )
+            self._groups.add(task.name, process.pid)
+            try:
+                stdout, stderr = process.communicate(timeout=task.timeout)
+            except subprocess.TimeoutExpired:
+                self._groups.kill(process.pid)
+                process.communicate()
+                raise
+            finally:
+                cancelled = self._groups.remove(task.name, process.pid)
+            exit_code = process.returncode
+            output_size = len(stdout) + len(stderr)
 
-            if result.returncode == 0:
+            if cancelled:
+                logger.warning(f"Task {task.name} was cancelled")
+                status = "cancelled"
+            elif exit_code == 0:
                 logger.info(f"Task {task.name} completed successfully")
-                logger.debug(result.stdout)
+                logger.debug(stdout)
+                status = "success"
             else:
-                logger.error(f"Task {task.name} failed with exit code {result.returncode}")
-                logger.error(result.stderr)
-                self._handle_failure(task)
+                logger.error(f"Task {task.name} failed with exit code {exit_code}")
+                logger.error(stderr)
+                status = "failed"
 
         except subprocess.TimeoutExpired:
             logger.error(f"Task {task.name} timed out")
-            self._handle_failure(task)
+            status = "timeout"
+        except Exception as e:
+            logger.error(f"Task {task.name} failed with error: {str(e)}")
+            status = "failed"
+
+        return status, exit_code, output_size, stdout
+
+
+class AsyncTaskExecutor:
+    """Run task commands as asyncio subprocesses, streaming their output.
+
+    Output is forwarded to the task logger a line at a time. Lines longer
+    than ``buffer_size`` are forwarded in ``buffer_size`` chunks, so the
+    memory held per stream stays bounded however much a task prints.
+    """
+
+    def __init__(
+        self,
+        log_manager: Optional[LogManager] = None,
+        buffer_size: int = DEFAULT_OUTPUT_BUFFER,
+        kill_grace: float = DEFAULT_KILL_GRACE,
+        python_workers: Optional[PythonWorkerPool] = None,
+        http_client=None,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        """Initialize the executor."""
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        self.log_manager = log_manager or LogManager(LogConfig())
+        self.buffer_size = buffer_size
+        self.python_workers = python_workers or PythonWorkerPool(kill_grace=kill_grace)
+        self.http_client = http_client
+        self.result_cache = result_cache
+        self._groups = _ProcessGroups(kill_grace)
+
+    def cancel(self, task_name: str) -> int:
+        """Kill the process trees of every run of a task. Returns the number of runs.
+
+        Safe to call from any thread.
+        """
+        return self._groups.cancel(task_name)
+
+    async def execute_task(self, task: Task, attempt: Optional[int] = None) -> RunResult:
+        """Execute a task, streaming its output into the task log."""
+        logger = self.log_manager.get_logger(task.name)
+        logger.info(f"Starting task: {task.name}")
+        started_at = _start_run(task, attempt)
+        key = None
+        if self.result_cache is not None and task.cache is not None:
+            # Fingerprinting inputs reads files, so do it off the event loop
+            loop = asyncio.get_running_loop()
+            key, replayed = await loop.run_in_executor(
+                None, functools.partial(_replay_cached, self.result_cache, task, started_at, logger)
+            )
+            if replayed is not None:
+                return replayed
+        status, exit_code, output_size, summary = await self._run(task, logger)
+        result = _finish_run(task, status, started_at, exit_code, output_size)
+        if key is not None:
+            store = functools.partial(_store_result, self.result_cache, task, key, result, summary)
+            await loop.run_in_executor(None, store)
+        return result
+
+    async def _run(self, task: Task, logger) -> Tuple[str, Optional[int], int, str]:
+        """Run a task. Returns status, exit code, output size and the tail of its output."""
+        exit_code = None
+        output_size = 0
+        tail = bytearray()
+
+        if task.entrypoint is not None:
+            # The worker pool blocks, so wait for it off the event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(_run_entrypoint, self.python_workers, self._groups, task, logger),
+            )
+
+        if task.http is not None:
+            if self.http_client is None:
+                return _no_http_client(task, logger), None, 0, ""
+            # The request runs on the client's own loop; no thread is tied up waiting
+            outcome = await asyncio.wrap_future(self.http_client.submit(task, logger))
+            return (*outcome, "")
+
+        try:
+            command, shell = _spawn_command(task)
+            spawn_options = dict(
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=self.buffer_size,
+                start_new_session=True,
+            )
+            if shell:
+                process = await asyncio.create_subprocess_shell(command, **spawn_options)
+            else:
+                process = await asyncio.create_subprocess_exec(*command, **spawn_options)
+            self._groups.add(task.name, process.pid)
+            pumps = asyncio.gather(
+                self._pump(process.stdout, logger.debug, tail),
+                self._pump(process.stderr, logger.error),
+            )
+            try:
+                sizes = await asyncio.wait_for(pumps, timeout=task.timeout)
+                exit_code = await process.wait()
+            except asyncio.TimeoutError:
+                self._groups.kill(process.pid)
+                await process.wait()
+                raise
+            finally:
+                cancelled = self._groups.remove(task.name, process.pid)
+            output_size = sum(sizes)
+
+            if cancelled:
+                logger.warning(f"Task {task.name} was cancelled")
+                status = "cancelled"
+            elif exit_code == 0:
+                logger.info(f"Task {task.name} completed successfully")
+                status = "success"
+            else:
+                logger.error(f"Task {task.name} failed with exit code {exit_code}")
+                status = "failed"
+
+        except asyncio.TimeoutError:
+            logger.error(f"Task {task.name} timed out")
+            status = "timeout"
         except Exception as e:
             logger.error(f"Task {task.name} failed with error: {str(e)}")
-            self._handle_failure(task)
-
-    def _handle_failure(self, task: Task) -> None:
-        """Handle task failure and retry logic."""
-        if task.retry and task.retry.max_attempts > 0:
-            task.retry.max_attempts -= 1
-            logger = self.log_manager.get_logger(task.name)
-            logger.info(f"Retrying task {task.name} in {task.retry.delay} seconds")
-            time.sleep(task.retry.delay)
-            self.execute_task(task)
+            status = "failed"
+
+        return status, exit_code, output_size, tail.decode(errors="replace")
+
+    async def _pump(
+        self,
+        stream: asyncio.StreamReader,
+        log: Callable[[str], None],
+        tail: Optional[bytearray] = None,
+    ) -> int:
+        """Forward a stream to ``log`` line by line. Returns the number of bytes read.
+
+        The last ``SUMMARY_BYTES`` read are kept in ``tail`` when one is given.
+        """
+        total = 0
+        while True:
+            try:
+                chunk = await stream.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                chunk = e.partial
+            except asyncio.LimitOverrunError:
+                chunk = await stream.read(self.buffer_size)
+            if not chunk:
+                return total
+            total += len(chunk)
+            if tail is not None:
+                tail += chunk
+                del tail[:-SUMMARY_BYTES]
+            log(chunk.decode(errors="replace").rstrip("\r\n"))
@@ -0,0 +1,287 @@
+import math
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from task_processor.core.executor import RunResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_runs (
+    run_id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    exit_code INTEGER,
+    attempt INTEGER NOT NULL,
+    output_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_task_runs_task_started ON task_runs (task, started_at);
+CREATE INDEX IF NOT EXISTS ix_task_runs_failures ON task_runs (started_at)
+    WHERE status != 'success';
+CREATE TABLE IF NOT EXISTS task_runs_daily (
+    task TEXT NOT NULL,
+    day TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    total_duration REAL NOT NULL,
+    p50_duration REAL NOT NULL,
+    p95_duration REAL NOT NULL,
+    PRIMARY KEY (task, day)
+);
+"""
+
+_COLUMNS = (
+    "run_id",
+    "task",
+    "status",
+    "started_at",
+    "finished_at",
+    "duration",
+    "exit_code",
+    "attempt",
+    "output_size",
+)
+
+
+class RunHistory:
+    """Persistent record of task runs in SQLite.
+
+    Runs are buffered in memory and written in one transaction per batch,
+    either when ``batch_size`` runs are pending or every ``flush_interval``
+    seconds. The database runs in WAL mode so readers in other processes are
+    not blocked by writes.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/history.db",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        """Open (and if needed create) the history database."""
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="run-history", daemon=True)
+        self._flusher.start()
+
+    def record(self, run: RunResult) -> None:
+        """Queue a finished run for the next batch."""
+        row = (
+            run.run_id,
+            run.task_name,
+            run.status,
+            run.started_at.timestamp(),
+            run.finished_at.timestamp(),
+            run.duration,
+            run.exit_code,
+            run.attempt,
+            run.output_size,
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> int:
+        """Write pending runs now. Returns the number written."""
+        with self._lock:
+            return self._flush_locked()
+
+    def last_runs(self, task_name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent runs of a task, newest first."""
+        return self._query(
+            "SELECT * FROM task_runs WHERE task = ? ORDER BY started_at DESC LIMIT ?",
+            (task_name, limit),
+        )
+
+    def failures_since(self, since: datetime, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Failed runs of any task started at or after ``since``, newest first."""
+        sql = (
+            "SELECT * FROM task_runs WHERE status != 'success' AND started_at >= ? "
+            "ORDER BY started_at DESC"
+        )
+        params: tuple = (since.timestamp(),)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return self._query(sql, params)
+
+    def count(self, task_name: Optional[str] = None) -> int:
+        """Number of stored runs, optionally for one task."""
+        with self._lock:
+            if task_name is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM task_runs").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM task_runs WHERE task = ?", (task_name,)
+                ).fetchone()
+            return row[0]
+
+    def daily_stats(self, task_name: str, limit: int = 30) -> List[Dict[str, Any]]:
+        """Per-day aggregates of compacted runs of a task, newest first."""
+        rows = self._query(
+            "SELECT * FROM task_runs_daily WHERE task = ? ORDER BY day DESC LIMIT ?",
+            (task_name, limit),
+        )
+        for row in rows:
+            row["failure_rate"] = row["failures"] / row["runs"]
+        return rows
+
+    def compact(
+        self,
+        older_than: Optional[datetime] = None,
+        keep_runs: Optional[int] = None,
+        task_names: Optional[Iterable[str]] = None,
+        limit: int = 10000,
+    ) -> int:
+        """Roll old runs up into per-day aggregates and delete them.
+
+        Runs started before ``older_than`` and runs beyond the newest
+        ``keep_runs`` of each task are retired, at most ``limit`` per call so a
+        large backlog is worked off over several calls. Each day's count,
+        failures and p50/p95 duration go to ``task_runs_daily``. Percentiles
+        are exact when a day is retired in one call; when a day is retired
+        across calls they are combined as a count-weighted average.
+        Returns the number of runs retired.
+        """
+        with self._lock:
+            self._flush_locked()
+            retired: Dict[str, Tuple[str, str, str, float, float]] = {}
+            if older_than is not None:
+                for row in self._conn.execute(
+                    "SELECT run_id, task, status, started_at, duration FROM task_runs "
+                    "WHERE started_at < ? ORDER BY started_at LIMIT ?",
+                    (older_than.timestamp(), limit),
+                ):
+                    retired[row[0]] = tuple(row)
+            if keep_runs is not None and len(retired) < limit:
+                if task_names is None:
+                    task_names = [
+                        r[0] for r in self._conn.execute("SELECT DISTINCT task FROM task_runs")
+                    ]
+                for task_name in task_names:
+                    boundary = self._conn.execute(
+                        "SELECT started_at FROM task_runs WHERE task = ? "
+                        "ORDER BY started_at DESC LIMIT 1 OFFSET ?",
+                        (task_name, keep_runs),
+                    ).fetchone()
+                    if boundary is None:
+                        continue
+                    for row in self._conn.execute(
+                        "SELECT run_id, task, status, started_at, duration FROM task_runs "
+                        "WHERE task = ? AND started_at <= ? ORDER BY started_at LIMIT ?",
+                        (task_name, boundary[0], limit - len(retired)),
+                    ):
+                        retired[row[0]] = tuple(row)
+                    if len(retired) >= limit:
+                        break
+            if retired:
+                self._retire(list(retired.values()))
+            return len(retired)
+
+    def prune_daily(self, older_than: date) -> int:
+        """Delete per-day aggregates for days before ``older_than``."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM task_runs_daily WHERE day < ?", (older_than.isoformat(),)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Write pending runs and close the database."""
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._flush_locked()
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def _flush_locked(self) -> int:
+        if not self._pending:
+            return 0
+        rows, self._pending = self._pending, []
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO task_runs ({', '.join(_COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def _retire(self, rows: List[Tuple[str, str, str, float, float]]) -> None:
+        groups: Dict[Tuple[str, str], List[Tuple[str, float]]] = {}
+        for _, task_name, status, started_at, duration in rows:
+            day = date.fromtimestamp(started_at).isoformat()
+            groups.setdefault((task_name, day), []).append((status, duration))
+
+        self._conn.execute("BEGIN")
+        try:
+            for (task_name, day), runs in groups.items():
+                durations = sorted(duration for _, duration in runs)
+                count = len(runs)
+                failures = sum(1 for status, _ in runs if status != "success")
+                total = sum(durations)
+                p50, p95 = _percentile(durations, 50), _percentile(durations, 95)
+                existing = self._conn.execute(
+                    "SELECT runs, failures, total_duration, p50_duration, p95_duration "
+                    "FROM task_runs_daily WHERE task = ? AND day = ?",
+                    (task_name, day),
+                ).fetchone()
+                if existing is not None:
+                    old_count = existing[0]
+                    merged = old_count + count
+                    p50 = (existing[3] * old_count + p50 * count) / merged
+                    p95 = (existing[4] * old_count + p95 * count) / merged
+                    failures += existing[1]
+                    total += existing[2]
+                    count = merged
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO task_runs_daily "
+                    "(task, day, runs, failures, total_duration, p50_duration, p95_duration) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (task_name, day, count, failures, total, p50, p95),
+                )
+            self._conn.executemany(
+                "DELETE FROM task_runs WHERE run_id = ?", [(row[0],) for row in rows]
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
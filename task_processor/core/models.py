@@ -1,21 +1,45 @@
+import random
+import re
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from task_processor.core.cron import CronSchedule, ZoneInfoNotFoundError, compile_cron
+from task_processor.core.priority import DEFAULT_PRIORITY, PRIORITY_WEIGHTS
+
+ENTRYPOINT_PATTERN = re.compile(r"^[A-Za-z_][\w.]*:[A-Za-z_][\w.]*$")
+OVERLAP_PATTERN = re.compile(r"^(skip|queue-one|replace|allow-[1-9]\d*)$")
+INTERVAL_SECONDS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "y": 365 * 24 * 60 * 60}
 
 
 class Schedule(BaseModel):
-    type: str = Field(..., description="Schedule type: 'recurring' or 'one-time'")
+    type: str = Field(..., description="Schedule type: 'recurring', 'cron' or 'one-time'")
     interval: Optional[str] = Field(
         None, description="Interval for recurring tasks (e.g., '1m', '1h', '1d', '1y')"
     )
     start_time: Optional[datetime] = Field(None, description="Start time for one-time tasks")
+    cron: Optional[str] = Field(
+        None, description="Cron expression for cron tasks (e.g., '*/15 9-17 * * mon-fri')"
+    )
+    timezone: str = Field("UTC", description="IANA timezone the cron expression is evaluated in")
+    catch_up: bool = Field(
+        False,
+        description="After downtime, run once for all fires missed since the last recorded run",
+    )
+    spread: Optional[bool] = Field(
+        None,
+        description=(
+            "Offset recurring fires by a stable, name-derived fraction of the interval; "
+            "by default the scheduler's setting"
+        ),
+    )
 
     @field_validator("type")
     @classmethod
     def validate_type(cls, v):
-        if v not in ["recurring", "one-time"]:
-            raise ValueError("Schedule type must be 'recurring' or 'one-time'")
+        if v not in ["recurring", "cron", "one-time"]:
+            raise ValueError("Schedule type must be 'recurring', 'cron' or 'one-time'")
         return v
 
     @field_validator("interval")
@@ -36,25 +60,223 @@ class Schedule(BaseModel):
             raise ValueError("Start time is required for one-time tasks")
         return v
 
+    @model_validator(mode="after")
+    def validate_cron(self):
+        if self.type == "cron":
+            if not self.cron:
+                raise ValueError("A cron expression is required for cron tasks")
+            try:
+                self.cron_schedule
+            except ZoneInfoNotFoundError:
+                raise ValueError(f"Unknown timezone {self.timezone!r}")
+        return self
+
+    @property
+    def cron_schedule(self) -> Optional[CronSchedule]:
+        """Compiled cron expression, shared by every schedule that uses it."""
+        if not self.cron:
+            return None
+        return compile_cron(self.cron, self.timezone)
+
+    @property
+    def interval_seconds(self) -> Optional[int]:
+        """Length of the recurring interval in seconds."""
+        if not self.interval:
+            return None
+        return int(self.interval[:-1]) * INTERVAL_SECONDS[self.interval[-1]]
+
 
 class RetryConfig(BaseModel):
     max_attempts: int = Field(..., ge=1, description="Maximum number of retry attempts")
     delay: int = Field(..., ge=1, description="Delay between retries in seconds")
+    backoff: float = Field(
+        1.0, ge=1, description="Multiplier applied to the delay after each failed attempt"
+    )
+    max_delay: Optional[int] = Field(None, ge=1, description="Upper bound on the delay in seconds")
+    jitter: float = Field(
+        0.0, ge=0, le=1, description="Fraction of the delay to randomly shave off (0 to 1)"
+    )
+
+    def delay_for(self, attempt: int) -> float:
+        """Seconds to wait before retrying after failed attempt number ``attempt``."""
+        delay = self.delay * self.backoff ** max(attempt - 1, 0)
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+        if self.jitter:
+            delay *= 1 - random.uniform(0, self.jitter)
+        return delay
+
+
+class HttpRequest(BaseModel):
+    url: str = Field(..., description="URL to request")
+    method: str = Field("GET", description="HTTP method")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Request headers")
+    params: Dict[str, str] = Field(default_factory=dict, description="Query string parameters")
+    json_body: Optional[Any] = Field(None, alias="json", description="Body sent as JSON")
+    body: Optional[str] = Field(None, description="Raw request body")
+    expected_status: List[int] = Field(
+        default_factory=list, description="Status codes that count as success (default: any 2xx)"
+    )
+
+    model_config = {"populate_by_name": True}
+
+    @field_validator("url")
+    @classmethod
+    def validate_url(cls, v):
+        if not v.startswith(("http://", "https://")):
+            raise ValueError("URL must start with http:// or https://")
+        return v
+
+    @field_validator("method")
+    @classmethod
+    def validate_method(cls, v):
+        return v.upper()
+
+    @model_validator(mode="after")
+    def validate_body(self):
+        if self.json_body is not None and self.body is not None:
+            raise ValueError("An HTTP request takes json or body, not both")
+        return self
+
+    def is_success(self, status: int) -> bool:
+        """Whether a response status code counts as a successful run."""
+        if self.expected_status:
+            return status in self.expected_status
+        return 200 <= status < 300
+
+
+class CacheConfig(BaseModel):
+    inputs: List[str] = Field(
+        default_factory=list, description="Files or glob patterns the task reads"
+    )
+    env: List[str] = Field(
+        default_factory=list, description="Environment variables the task's result depends on"
+    )
+    digest: str = Field(
+        "stat", description="Fingerprint inputs by 'stat' (size and mtime) or 'content' (SHA-256)"
+    )
+    ttl: Optional[float] = Field(
+        None, gt=0, description="Seconds a cached result stays valid (default: the cache's)"
+    )
+
+    @field_validator("digest")
+    @classmethod
+    def validate_digest(cls, v):
+        if v not in ("stat", "content"):
+            raise ValueError("Digest must be 'stat' or 'content'")
+        return v
 
 
 class Task(BaseModel):
     name: str = Field(..., description="Unique name for the task")
-    command: str = Field(..., description="Command to execute")
+    command: Optional[Union[str, List[str]]] = Field(
+        None, description="Shell command string, or an argv list run without a shell"
+    )
+    entrypoint: Optional[str] = Field(
+        None, description="Python callable run in a warm worker process, as 'module:function'"
+    )
+    http: Optional[HttpRequest] = Field(
+        None, description="HTTP request sent through the shared HTTP client"
+    )
+    kwargs: Dict[str, Any] = Field(
+        default_factory=dict, description="Keyword arguments passed to the entrypoint"
+    )
+    shell: Optional[bool] = Field(
+        None,
+        description="Run the command through /bin/sh; by default only when it uses shell syntax",
+    )
     schedule: Schedule
     retry: RetryConfig
     dependencies: List[str] = Field(
         default_factory=list,
         description="Names of tasks that must complete before this task",
     )
+    max_concurrency: int = Field(
+        1, ge=1, description="Maximum number of runs of this task in flight at once"
+    )
+    priority: str = Field(
+        DEFAULT_PRIORITY,
+        description="Priority class ('high', 'normal' or 'low') when runs wait for a worker",
+    )
+    overlap: str = Field(
+        "skip",
+        description=(
+            "What a fire does while max_concurrency runs are in flight: 'skip' it, "
+            "'queue-one' (later fires coalesce into it), 'replace' the running runs, "
+            "or 'allow-N' to run up to N at once"
+        ),
+    )
+    cache: Optional[CacheConfig] = Field(
+        None, description="Replay the last successful result while the inputs are unchanged"
+    )
+    timeout: Optional[float] = Field(
+        None, gt=0, description="Seconds a run may take before its process tree is killed"
+    )
+    max_memory: Optional[int] = Field(
+        None, ge=1, description="Address space limit per process of a command, in megabytes"
+    )
+    cpu_time: Optional[int] = Field(
+        None, ge=1, description="CPU time limit per process of a command, in seconds"
+    )
     last_run: Optional[datetime] = None
     last_status: Optional[str] = None
+    # Retries made so far for the current fire
     attempts: int = 0
 
+    @field_validator("command")
+    @classmethod
+    def validate_command(cls, v):
+        if isinstance(v, list) and not v:
+            raise ValueError("Command argv list must not be empty")
+        return v
+
+    @field_validator("entrypoint")
+    @classmethod
+    def validate_entrypoint(cls, v):
+        if v is not None and not ENTRYPOINT_PATTERN.match(v):
+            raise ValueError("Entrypoint must look like 'package.module:function'")
+        return v
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        targets = (self.command, self.entrypoint, self.http)
+        if sum(target is not None for target in targets) != 1:
+            raise ValueError("A task needs exactly one of command, entrypoint or http")
+        if self.command is None and (self.max_memory is not None or self.cpu_time is not None):
+            # Entrypoints run in shared worker processes and HTTP requests in this one
+            raise ValueError("max_memory and cpu_time only apply to command tasks")
+        return self
+
+    @field_validator("priority")
+    @classmethod
+    def validate_priority(cls, v):
+        if v not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Priority must be one of {', '.join(PRIORITY_WEIGHTS)}")
+        return v
+
+    @field_validator("overlap")
+    @classmethod
+    def validate_overlap(cls, v):
+        if not OVERLAP_PATTERN.match(v):
+            raise ValueError("Overlap must be 'skip', 'queue-one', 'replace' or 'allow-N'")
+        return v
+
+    @model_validator(mode="after")
+    def apply_overlap_limit(self):
+        if self.overlap.startswith("allow-"):
+            limit = int(self.overlap[len("allow-") :])
+            if "max_concurrency" in self.model_fields_set and self.max_concurrency != limit:
+                raise ValueError(f"overlap {self.overlap!r} conflicts with max_concurrency")
+            self.max_concurrency = limit
+        return self
+
+    @field_validator("shell")
+    @classmethod
+    def validate_shell(cls, v, info):
+        if v and isinstance(info.data.get("command"), list):
+            raise ValueError("An argv list command cannot be run through a shell")
+        return v
+
     def should_retry(self) -> bool:
         if not self.last_status == "failed":
             return False
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from task_processor.core.models import Task
+from task_processor.core.priority import DEFAULT_AGING, DEFAULT_MAX_QUEUE, ReadyQueue
+
+DEFAULT_MAX_WORKERS = 8
+
+_Run = Tuple[Future, Callable[..., Any], Task, Tuple[Any, ...]]
+
+
+class WorkerPool:
+    """Bounded pool that runs due tasks off the scheduler thread.
+
+    Plain callables run on a thread pool. Coroutine functions run on a single
+    event loop owned by the pool, started on first use. Both count against
+    the same ``max_workers`` limit; runs beyond it wait in a bounded
+    ReadyQueue that serves them weighted-fair by the task's priority class.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        priority_weights: Optional[Dict[str, int]] = None,
+        aging: float = DEFAULT_AGING,
+    ):
+        """Initialize the pool with a global concurrency limit.
+
+        At most ``max_queue`` runs wait for a worker; ``priority_weights`` and
+        ``aging`` configure how the ReadyQueue serves them.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.ready: ReadyQueue[_Run] = ReadyQueue(max_queue, priority_weights, aging)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="task-worker"
+        )
+        self._running: Dict[str, int] = {}
+        self._in_flight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    def submit(self, task: Task, fn: Callable[..., Any], *args: Any) -> Optional[Future]:
+        """Hand a task to the pool, calling ``fn(task, *args)`` on a worker.
+
+        Returns None without queueing anything when the task already has
+        ``task.max_concurrency`` runs queued or in flight. A run turned away
+        by a full ready queue has its future cancelled.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot schedule new runs after shutdown")
+            running = self._running.get(task.name, 0)
+            if running >= task.max_concurrency:
+                return None
+            self._running[task.name] = running + 1
+
+        future: Future = Future()
+        future.add_done_callback(lambda _: self._release(task.name))
+        turned_away = self.ready.put((future, fn, task, args), task.priority)
+        if turned_away is not None:
+            logger.warning(f"Ready queue is full, dropping queued run of {turned_away[2].name}")
+            turned_away[0].cancel()
+        self._start_ready()
+        return future
+
+    def running(self, task_name: str) -> int:
+        """Number of queued or in-flight runs for a task."""
+        with self._lock:
+            return self._running.get(task_name, 0)
+
+    @property
+    def active(self) -> int:
+        """Total number of queued or in-flight runs."""
+        with self._lock:
+            return sum(self._running.values())
+
+    def wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per priority class: runs queued, served and dropped, and queue-wait percentiles."""
+        return self.ready.stats()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, cancel queued runs and optionally wait for running ones."""
+        with self._lock:
+            self._closed = True
+        for future, _, _, _ in self.ready.drain():
+            future.cancel()
+        self._executor.shutdown(wait=wait)
+        with self._lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if wait:
+                thread.join()
+
+    def _start_ready(self) -> None:
+        """Start queued runs while there are free workers."""
+        while True:
+            with self._lock:
+                if self._closed or self._in_flight >= self.max_workers:
+                    return
+                run = self.ready.pop()
+                if run is None:
+                    return
+                self._in_flight += 1
+            future, fn, task, args = run
+            with self._lock:
+                # shutdown() sets _closed under this lock, so a run is never
+                # handed to an executor or event loop it has already closed
+                started = not self._closed
+                if started:
+                    try:
+                        if asyncio.iscoroutinefunction(fn):
+                            call = self._call_async(future, fn, task, args)
+                            asyncio.run_coroutine_threadsafe(call, self._event_loop_locked())
+                        else:
+                            self._executor.submit(self._call, future, fn, task, args)
+                    except RuntimeError:
+                        # The interpreter is shutting down
+                        started = False
+                if not started:
+                    self._in_flight -= 1
+            if not started:
+                future.cancel()
+                return
+
+    def _call(self, future: Future, fn: Callable[..., Any], task: Task, args: Tuple) -> None:
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(task, *args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        finally:
+            self._finished()
+
+    async def _call_async(
+        self, future: Future, fn: Callable[..., Any], task: Task, args: Tuple
+    ) -> None:
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = await fn(task, *args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        finally:
+            self._finished()
+
+    def _finished(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._start_ready()
+
+    def _event_loop_locked(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._serve, args=(loop,), name="task-event-loop", daemon=True
+            )
+            self._loop_thread.start()
+            self._loop = loop
+        return self._loop
+
+    def _serve(self, loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        loop.close()
+
+    def _release(self, task_name: str) -> None:
+        with self._lock:
+            remaining = self._running.get(task_name, 0) - 1
+            if remaining > 0:
+                self._running[task_name] = remaining
+            else:
+                self._running.pop(task_name, None)
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
+
+# Share of worker slots each priority class gets while every class has runs waiting
+PRIORITY_WEIGHTS = {"high": 8, "normal": 4, "low": 1}
+DEFAULT_PRIORITY = "normal"
+DEFAULT_MAX_QUEUE = 10000
+# Seconds a run may wait before it is served ahead of the weighted order
+DEFAULT_AGING = 60.0
+# Queue waits kept per class for the latency percentiles
+WAIT_SAMPLES = 1024
+
+T = TypeVar("T")
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ReadyQueue(Generic[T]):
+    """Bounded queue of runs waiting for a worker, served weighted-fair by priority class.
+
+    Classes take turns as in weighted fair queueing: each has a virtual clock
+    that advances by ``1 / weight`` per run served, and the waiting class
+    whose next run would finish first in virtual time goes next. With every
+    class backlogged ``high`` gets 8 of every 13 slots, ``normal`` 4 and
+    ``low`` 1. A class that was idle rejoins at the current virtual time
+    instead of spending credit saved up while it had nothing to run. A run
+    that has waited ``aging`` seconds or more is served first, oldest first,
+    so low-priority work is delayed but never starved.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_QUEUE,
+        weights: Optional[Dict[str, int]] = None,
+        aging: float = DEFAULT_AGING,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize an empty queue holding at most ``max_size`` runs."""
+        weights = dict(PRIORITY_WEIGHTS if weights is None else weights)
+        if set(weights) != set(PRIORITY_WEIGHTS) or min(weights.values()) <= 0:
+            raise ValueError(f"weights must give a positive weight to each of {PRIORITY_WEIGHTS}")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.weights = weights
+        self.aging = aging
+        self.clock = clock
+        self._queues: Dict[str, Deque[Tuple[float, T]]] = {name: deque() for name in weights}
+        self._pass = dict.fromkeys(weights, 0.0)
+        self._vtime = 0.0
+        self._size = 0
+        self._waits: Dict[str, Deque[float]] = {
+            name: deque(maxlen=WAIT_SAMPLES) for name in weights
+        }
+        self._served: Counter = Counter()
+        self._rejected: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._size
+
+    def put(self, item: T, priority: str = DEFAULT_PRIORITY) -> Optional[T]:
+        """Queue ``item`` in its priority class.
+
+        When the queue is full, the newest run of the lowest class below
+        ``priority`` is displaced to make room, or ``item`` itself is turned
+        away if there is none. Returns the run that did not make it in.
+        """
+        with self._lock:
+            turned_away = None
+            if self._size >= self.max_size:
+                turned_away = self._displace(priority)
+                if turned_away is None:
+                    self._rejected[priority] += 1
+                    return item
+            queue = self._queues[priority]
+            if not queue:
+                self._pass[priority] = max(self._pass[priority], self._vtime)
+            queue.append((self.clock(), item))
+            self._size += 1
+            return turned_away
+
+    def pop(self) -> Optional[T]:
+        """Remove and return the next run to serve, or None if the queue is empty."""
+        with self._lock:
+            waiting = [name for name, queue in self._queues.items() if queue]
+            if not waiting:
+                return None
+            now = self.clock()
+            # Among equally old runs the lowest class is the one being starved
+            oldest = min(waiting, key=lambda name: (self._queues[name][0][0], self.weights[name]))
+            if now - self._queues[oldest][0][0] >= self.aging:
+                chosen = oldest
+            else:
+                chosen = min(waiting, key=self._finish)
+            enqueued, item = self._queues[chosen].popleft()
+            self._size -= 1
+            self._vtime = max(self._vtime, self._pass[chosen])
+            self._pass[chosen] += 1.0 / self.weights[chosen]
+            self._served[chosen] += 1
+            self._waits[chosen].append(now - enqueued)
+            return item
+
+    def drain(self) -> List[T]:
+        """Remove and return every queued run."""
+        with self._lock:
+            items = [item for queue in self._queues.values() for _, item in queue]
+            for queue in self._queues.values():
+                queue.clear()
+            self._size = 0
+            return items
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per class: runs queued, served and turned away, and queue-wait percentiles.
+
+        Waits are in seconds over the last ``WAIT_SAMPLES`` runs served.
+        """
+        with self._lock:
+            stats = {}
+            for name in self.weights:
+                ordered = sorted(self._waits[name])
+                stats[name] = {
+                    "queued": len(self._queues[name]),
+                    "served": self._served[name],
+                    "rejected": self._rejected[name],
+                    "wait_p50": _percentile(ordered, 0.50),
+                    "wait_p95": _percentile(ordered, 0.95),
+                    "wait_p99": _percentile(ordered, 0.99),
+                    "wait_max": ordered[-1] if ordered else 0.0,
+                }
+            return stats
+
+    def _finish(self, name: str) -> float:
+        """Virtual time at which serving the next run of a class would finish."""
+        return self._pass[name] + 1.0 / self.weights[name]
+
+    def _displace(self, priority: str) -> Optional[T]:
+        for name in sorted(self.weights, key=self.weights.get):
+            if self.weights[name] >= self.weights[priority]:
+                return None
+            if self._queues[name]:
+                self._size -= 1
+                self._rejected[name] += 1
+                return self._queues[name].pop()[1]
+        return None
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from task_processor.core.history import RunHistory
+from task_processor.utils.logging import LogManager, parse_rotation
+
+
+class RetentionPolicy(BaseModel):
+    """How much run history and how many task logs to keep."""
+
+    history_days: Optional[int] = Field(30, ge=1, description="Days of raw runs to keep")
+    max_runs_per_task: Optional[int] = Field(
+        None, ge=1, description="Raw runs to keep per task, newest first"
+    )
+    aggregate_days: Optional[int] = Field(
+        None, ge=1, description="Days of per-day aggregates to keep"
+    )
+    batch_size: int = Field(10000, ge=1, description="Runs retired per compaction pass")
+    log_batch_size: int = Field(100, ge=1, description="Log files compressed per pass")
+    interval: int = Field(3600, ge=1, description="Seconds between compaction passes")
+
+
+class Compactor:
+    """Background job that enforces a RetentionPolicy.
+
+    Each pass does a bounded amount of work: at most ``batch_size`` runs are
+    rolled up into per-day aggregates and at most ``log_batch_size`` log files
+    are compressed, so a large backlog is worked off over several passes.
+    """
+
+    def __init__(
+        self,
+        policy: RetentionPolicy,
+        history: Optional[RunHistory] = None,
+        log_manager: Optional[LogManager] = None,
+    ):
+        self.policy = policy
+        self.history = history
+        self.log_manager = log_manager
+
+    def run_once(self, task_names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Run one compaction pass and return what it did."""
+        stats = {
+            "runs_compacted": 0,
+            "aggregates_pruned": 0,
+            "logs_removed": 0,
+            "logs_compressed": 0,
+        }
+        policy = self.policy
+
+        if self.history is not None:
+            older_than = None
+            if policy.history_days is not None:
+                older_than = datetime.now() - timedelta(days=policy.history_days)
+            stats["runs_compacted"] = self.history.compact(
+                older_than=older_than,
+                keep_runs=policy.max_runs_per_task,
+                task_names=task_names,
+                limit=policy.batch_size,
+            )
+            if policy.aggregate_days is not None:
+                stats["aggregates_pruned"] = self.history.prune_daily(
+                    date.today() - timedelta(days=policy.aggregate_days)
+                )
+
+        if self.log_manager is not None:
+            _, max_age = parse_rotation(self.log_manager.config.retention)
+            stats["logs_removed"] = self.log_manager.cleanup_all_logs(max_age)
+            stats["logs_compressed"] = self.log_manager.rotate_all_logs(policy.log_batch_size)
+        return stats
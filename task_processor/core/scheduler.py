@@ -1,60 +1,699 @@
+import heapq
+import itertools
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
 
-import schedule
+from loguru import logger
 
-from task_processor.core.executor import TaskExecutor
+from task_processor.core.cache import ResultCache
+from task_processor.core.coordination import LeaseCoordinator, aligned_fire_time
+from task_processor.core.dag import TaskGraph
+from task_processor.core.executor import (
+    DEFAULT_KILL_GRACE,
+    DEFAULT_OUTPUT_BUFFER,
+    AsyncTaskExecutor,
+    RunResult,
+    TaskExecutor,
+)
+from task_processor.core.history import RunHistory
 from task_processor.core.models import Task
+from task_processor.core.pool import DEFAULT_MAX_WORKERS, WorkerPool
+from task_processor.core.priority import DEFAULT_AGING, DEFAULT_MAX_QUEUE
+from task_processor.core.smoothing import (
+    DispatchHistogram,
+    DispatchThrottle,
+    spread_offset,
+)
+from task_processor.core.workers import PythonWorkerPool
+from task_processor.utils.config_loader import ConfigDiff
 from task_processor.utils.logging import LogConfig, LogManager
 
+_Entry = Tuple[float, int, Hashable, Callable[[], None]]
+
+
+class TimerQueue:
+    """Min-heap of callbacks keyed by their next fire time.
+
+    Scheduling and firing are O(log n). Cancelled or rescheduled entries are
+    left in the heap and skipped when they surface; the heap is rebuilt once
+    stale entries outnumber live ones.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._heap: List[_Entry] = []
+        self._live: Dict[Hashable, _Entry] = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._live)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._cond:
+            return key in self._live
+
+    def schedule(self, key: Hashable, when: float, callback: Callable[[], None]) -> None:
+        """Fire ``callback`` at ``when``, replacing any pending entry for ``key``."""
+        with self._cond:
+            entry = (when, next(self._counter), key, callback)
+            self._live[key] = entry
+            heapq.heappush(self._heap, entry)
+            self._maybe_compact()
+            if self._heap[0] is entry:
+                self._cond.notify_all()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the pending entry for ``key``. Returns False if there was none."""
+        with self._cond:
+            if self._live.pop(key, None) is None:
+                return False
+            self._maybe_compact()
+            self._cond.notify_all()
+            return True
+
+    def fire_time(self, key: Hashable) -> Optional[float]:
+        """Fire time of the pending entry for ``key``."""
+        with self._cond:
+            entry = self._live.get(key)
+            return entry[0] if entry else None
+
+    def next_fire_time(self) -> Optional[float]:
+        """Fire time of the earliest pending entry."""
+        with self._cond:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Tuple[Hashable, Callable[[], None]]]:
+        """Remove and return every entry due at or before ``now``, earliest first."""
+        now = self.clock() if now is None else now
+        due = []
+        with self._cond:
+            while self._heap:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, key, callback = heapq.heappop(self._heap)
+                del self._live[key]
+                due.append((key, callback))
+        return due
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Sleep until the next entry is due, the queue changes or ``close`` is called."""
+        with self._cond:
+            if self._closed:
+                return
+            self._discard_stale()
+            if self._heap:
+                delay = max(0.0, self._heap[0][0] - self.clock())
+                timeout = delay if timeout is None else min(delay, timeout)
+            self._cond.wait(timeout)
+
+    def close(self) -> None:
+        """Wake any waiter and make further waits return immediately."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def open(self) -> None:
+        """Allow waiting again after ``close``."""
+        with self._cond:
+            self._closed = False
+
+    def clear(self) -> None:
+        """Drop every pending entry."""
+        with self._cond:
+            self._heap.clear()
+            self._live.clear()
+            self._cond.notify_all()
+
+    def _discard_stale(self) -> None:
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) <= 2 * len(self._live) + 64:
+            return
+        self._heap = [entry for entry in self._heap if self._live.get(entry[2]) is entry]
+        heapq.heapify(self._heap)
+
 
 class TaskScheduler:
-    def __init__(self, log_manager: Optional[LogManager] = None):
+    def __init__(
+        self,
+        log_manager: Optional[LogManager] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        executor_mode: str = "thread",
+        output_buffer_size: int = DEFAULT_OUTPUT_BUFFER,
+        history: Optional[RunHistory] = None,
+        kill_grace: float = DEFAULT_KILL_GRACE,
+        python_workers: Optional[PythonWorkerPool] = None,
+        coordinator: Optional[LeaseCoordinator] = None,
+        http_client=None,
+        spread: bool = False,
+        max_dispatch_rate: Optional[float] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        priority_aging: float = DEFAULT_AGING,
+        result_cache: Optional[ResultCache] = None,
+    ):
         """Initialize the task scheduler."""
         if log_manager is None:
             config = LogConfig()
             self.log_manager = LogManager(config=config)
         else:
             self.log_manager = log_manager
-        self.executor = TaskExecutor(log_manager=self.log_manager)
+        # "thread" runs each task on a worker thread, "async" runs all of them
+        # on one event loop with streamed output
+        if executor_mode == "thread":
+            self.executor = TaskExecutor(
+                log_manager=self.log_manager,
+                kill_grace=kill_grace,
+                python_workers=python_workers,
+                http_client=http_client,
+                result_cache=result_cache,
+            )
+        elif executor_mode == "async":
+            self.executor = AsyncTaskExecutor(
+                log_manager=self.log_manager,
+                buffer_size=output_buffer_size,
+                kill_grace=kill_grace,
+                python_workers=python_workers,
+                http_client=http_client,
+                result_cache=result_cache,
+            )
+        else:
+            raise ValueError("executor_mode must be 'thread' or 'async'")
+        # Runs beyond max_workers wait in a ready queue served weighted-fair by
+        # priority, where a run waiting priority_aging seconds goes first
+        self.pool = WorkerPool(max_workers=max_workers, max_queue=max_queue, aging=priority_aging)
+        # Records every finished run when set
+        self.history = history
+        # When set, fire times are aligned to the epoch and each fire is
+        # dispatched only by the replica that claims it
+        self.coordinator = coordinator
+        # When set, due runs are handed to this callable (for example a queue
+        # producer) instead of the worker pool
+        self.dispatcher: Optional[Callable[[Task, int], None]] = None
         self.tasks: Dict[str, Task] = {}
-        self.schedule = schedule.default_scheduler
+        self.timers = TimerQueue()
+        # Recurring tasks that do not set schedule.spread fire at a stable
+        # offset into their interval, derived from the task name
+        self.spread = spread
+        # Dispatches beyond max_dispatch_rate per second wait for the next free slot
+        self.throttle = (
+            DispatchThrottle(max_dispatch_rate, clock=lambda: self.timers.clock())
+            if max_dispatch_rate is not None
+            else None
+        )
+        self.dispatch_histogram = DispatchHistogram(clock=lambda: self.timers.clock())
+        self._deferred = itertools.count()
+        self.graph = TaskGraph()
+        # Upstream tasks that succeeded since each task last started, and
+        # tasks that are due but still waiting on some of them (with the fire
+        # time they are waiting to run for)
+        self._satisfied: Dict[str, Set[str]] = {}
+        self._waiting: Dict[str, Optional[float]] = {}
+        # Runs held back by a queue-one or replace overlap policy until the
+        # task's running run finishes, as (attempt, fire time)
+        self._queued: Dict[str, Tuple[int, Optional[float]]] = {}
+        # Fires whose next run waits on a retry or rate-cap timer, by timer
+        # key, as (task name, fire time)
+        self._held: Dict[Hashable, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        # One single-thread executor per maintenance job, by job name
+        self._maintenance: Dict[str, ThreadPoolExecutor] = {}
+        self._running = False
+        if coordinator is not None:
+            self.add_maintenance(
+                "leases", max(coordinator.lease_ttl / 3, 0.1), self._maintain_leases
+            )
 
     def add_task(self, task: Task) -> None:
-        """Add a task to the scheduler."""
+        """Add a task to the scheduler.
+
+        Raises DependencyCycleError if its dependencies would form a cycle, and
+        ValueError if it has dependencies while a dispatcher is set.
+        """
+        self._check_dispatchable(task)
+        with self._lock:
+            self.graph.add(task.name, task.dependencies)
+            self._satisfied[task.name] = set()
         self.tasks[task.name] = task
-        if task.schedule.type == "recurring":
-            interval = task.schedule.interval
-            if interval.endswith("m"):
-                minutes = int(interval[:-1])
-                self.schedule.every(minutes).minutes.do(self.executor.execute_task, task)
-            elif interval.endswith("h"):
-                hours = int(interval[:-1])
-                self.schedule.every(hours).hours.do(self.executor.execute_task, task)
-            elif interval.endswith("d"):
-                days = int(interval[:-1])
-                self.schedule.every(days).days.do(self.executor.execute_task, task)
-            elif interval.endswith("y"):
-                years = int(interval[:-1])
-                self.schedule.every(years * 365).days.do(self.executor.execute_task, task)
+        now = self.timers.clock()
+        if task.schedule.type in ("recurring", "cron"):
+            when = self._missed_fire(task, now) if task.schedule.catch_up else None
+            if when is not None:
+                logger = self.log_manager.get_logger(task.name)
+                logger.info(f"Task {task.name} missed fires while down, catching up once")
+            else:
+                when = self._next_fire_time(task, now)
+            self._schedule_fire(task.name, when)
         elif task.schedule.type == "one-time" and task.schedule.start_time:
-            self.schedule.every().day.at(task.schedule.start_time.strftime("%H:%M")).do(
-                self.executor.execute_task, task
-            )
+            start = task.schedule.start_time.timestamp()
+            if start < now:
+                logger = self.log_manager.get_logger(task.name)
+                logger.info(f"One-time task {task.name} start time is in the past, skipping")
+                self.remove_task(task.name)
+                return
+            self._schedule_fire(task.name, start)
 
     def add_tasks(self, tasks: List[Task]) -> None:
-        """Add multiple tasks to the scheduler."""
-        for task in tasks:
+        """Add multiple tasks to the scheduler, upstream tasks first."""
+        by_name = {task.name: task for task in tasks}
+        for name in TaskGraph.from_tasks(tasks).topological_order():
+            self.add_task(by_name[name])
+        for dep in sorted(self.graph.missing()):
+            logger = self.log_manager.get_logger(dep)
+            logger.error(f"Task {dep} is listed as a dependency but is not scheduled")
+
+    def update_task(self, task: Task) -> None:
+        """Replace a task's definition in place.
+
+        Runtime state carries over, and the pending fire time is kept unless
+        the schedule changed. Unknown tasks are added.
+        """
+        old = self.tasks.get(task.name)
+        if old is None:
+            self.add_task(task)
+            return
+        task.last_run, task.last_status, task.attempts = old.last_run, old.last_status, old.attempts
+        if task.schedule != old.schedule or task.name not in self.timers:
             self.add_task(task)
+            return
+        self._check_dispatchable(task)
+        with self._lock:
+            self.graph.add(task.name, task.dependencies)
+        self.tasks[task.name] = task
+
+    def apply_config_diff(self, diff: ConfigDiff) -> None:
+        """Apply a reload diff, leaving tasks it does not mention untouched."""
+        for task_name in diff.removed:
+            self.remove_task(task_name)
+        for task in diff.added + diff.updated:
+            try:
+                self.update_task(task)
+            except ValueError as e:
+                logger.error(f"Not reloading task {task.name}: {e}")
+
+    def remove_task(self, task_name: str) -> Optional[Task]:
+        """Unschedule a task. Runs already in flight are left to finish."""
+        self.timers.cancel(task_name)
+        self._drop_held((task_name, "retry"))
+        with self._lock:
+            self.graph.remove(task_name)
+            self._satisfied.pop(task_name, None)
+            parked = self._waiting.pop(task_name, None)
+            queued = self._queued.pop(task_name, None)
+        self._release_lease(task_name, parked)
+        if queued is not None:
+            self._release_lease(task_name, queued[1])
+        return self.tasks.pop(task_name, None)
+
+    def cancel(self, task_name: str) -> int:
+        """Kill the running process trees of a task and drop its pending retry.
+
+        The task stays scheduled. Returns the number of runs cancelled.
+        """
+        self._drop_held((task_name, "retry"))
+        return self.executor.cancel(task_name)
+
+    def add_maintenance(self, name: str, interval: float, fn: Callable[[], Any]) -> None:
+        """Run ``fn`` every ``interval`` seconds on a background maintenance thread.
+
+        Each job has a thread of its own, so a slow compaction cannot hold up
+        lease heartbeats, and a tick that comes round while the job's previous
+        run is still going is skipped instead of queued behind it.
+        """
+        key = ("maintenance", name)
+        previous: List[Future] = []
+
+        def fire() -> None:
+            self.timers.schedule(key, self.timers.clock() + interval, fire)
+            if previous and not previous[0].done():
+                logger.debug(f"Maintenance job {name} is still running; skipping this tick")
+                return
+            executor = self._maintenance.get(name)
+            if executor is None:
+                executor = self._maintenance[name] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"maintenance-{name}"
+                )
+            previous[:] = [executor.submit(run)]
+
+        def run() -> None:
+            try:
+                fn()
+            except Exception as e:
+                logger.error(f"Maintenance job {name} failed: {e}")
+
+        self.timers.schedule(key, self.timers.clock() + interval, fire)
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """Dispatch rate, rate-cap deferrals and ready-queue waits.
+
+        ``histogram`` and ``peak`` cover dispatches per second over the last
+        hour, ``deferred`` counts runs deferred by the rate cap and ``queue``
+        holds ready-queue waits per priority class.
+        """
+        return {
+            "histogram": self.dispatch_histogram.histogram(),
+            "peak": self.dispatch_histogram.peak(),
+            "deferred": self.throttle.deferred if self.throttle is not None else 0,
+            "queue": self.pool.wait_stats(),
+        }
+
+    def next_run(self, task_name: str) -> Optional[float]:
+        """Epoch time of the next scheduled fire of a task, if any."""
+        return self.timers.fire_time(task_name)
+
+    def _schedule_fire(self, task_name: str, when: float) -> None:
+        self.timers.schedule(task_name, when, lambda: self._fire(task_name, when))
+
+    def _fire(self, task_name: str, when: float) -> None:
+        task = self.tasks.get(task_name)
+        if task is None:
+            return
+        if task.schedule.type != "one-time":
+            next_when = self._next_fire_time(task, when)
+            now = self.timers.clock()
+            if next_when <= now:
+                next_when = self._next_fire_time(task, now)
+            self._schedule_fire(task_name, next_when)
+        if self.coordinator is not None and not self.coordinator.claim(task_name, when):
+            # Another replica owns this fire
+            return
+        # A fresh fire supersedes any retry still waiting from the previous one
+        self._drop_held((task_name, "retry"))
+        self._dispatch_when_ready(task, when)
+
+    def _next_fire_time(self, task: Task, now: float) -> float:
+        """First fire of a recurring or cron task after ``now``."""
+        if task.schedule.type == "cron":
+            # Calendar times are the same on every replica, so need no aligning
+            return task.schedule.cron_schedule.next_fire(now)
+        interval = task.schedule.interval_seconds
+        spread = self.spread if task.schedule.spread is None else task.schedule.spread
+        if spread:
+            return aligned_fire_time(interval, now, spread_offset(task.name, interval))
+        if self.coordinator is not None:
+            return aligned_fire_time(interval, now)
+        return now + interval
+
+    def _missed_fire(self, task: Task, now: float) -> Optional[float]:
+        """First fire missed since the task's last recorded run, if any.
+
+        Firing it once re-arms from ``now``, so however long the scheduler
+        was down every missed fire is coalesced into that one run.
+        """
+        if self.history is None:
+            return None
+        runs = self.history.last_runs(task.name, 1)
+        if not runs:
+            return None
+        missed = self._next_fire_time(task, runs[0]["started_at"])
+        return missed if missed <= now else None
+
+    def _dispatch_when_ready(self, task: Task, fire: Optional[float] = None) -> None:
+        """Dispatch a due task, or park it until its upstream tasks have succeeded."""
+        with self._lock:
+            pending = self.graph.upstream.get(task.name, set()) - self._satisfied[task.name]
+            superseded = self._waiting.pop(task.name, None)
+            if pending:
+                self._waiting[task.name] = fire
+            else:
+                self._satisfied[task.name] = set()
+        self._release_lease(task.name, superseded)
+        if pending:
+            logger = self.log_manager.get_logger(task.name)
+            logger.info(f"Task {task.name} is waiting on {', '.join(sorted(pending))}")
+            return
+        self._dispatch(task, fire=fire)
+
+    def _release_downstream(self, task_name: str) -> None:
+        """Record a success and dispatch every waiting task it unblocks."""
+        ready = []
+        with self._lock:
+            for child in self.graph.downstream.get(task_name, ()):
+                satisfied = self._satisfied.get(child)
+                if satisfied is None:
+                    continue
+                satisfied.add(task_name)
+                if child in self._waiting and satisfied >= self.graph.upstream[child]:
+                    self._satisfied[child] = set()
+                    ready.append((child, self._waiting.pop(child)))
+        for child, fire in ready:
+            task = self.tasks.get(child)
+            if task is not None:
+                self._dispatch(task, fire=fire)
+            else:
+                self._release_lease(child, fire)
+
+    def _dispatch(self, task: Task, attempt: int = 1, fire: Optional[float] = None) -> None:
+        """Hand a due task to the worker pool without waiting for it to finish.
+
+        ``fire`` is the scheduled fire this run belongs to, whose lease is
+        released once the fire is finished. Over ``max_dispatch_rate`` the run
+        is deferred to the throttle's next free slot.
+        """
+        if self.throttle is not None:
+            delay = self.throttle.reserve()
+            if delay > 0:
+                self._hold(
+                    ("deferred", next(self._deferred)),
+                    task.name,
+                    fire,
+                    self.timers.clock() + delay,
+                    lambda: self._dispatch_deferred(task.name, attempt, fire),
+                )
+                return
+        self._submit(task, attempt, fire)
+
+    def _dispatch_deferred(self, task_name: str, attempt: int, fire: Optional[float]) -> None:
+        # The task may have been removed or redefined while it waited for a slot
+        task = self.tasks.get(task_name)
+        if task is None:
+            self._release_lease(task_name, fire)
+            return
+        self._submit(task, attempt, fire)
+
+    def _submit(self, task: Task, attempt: int, fire: Optional[float]) -> None:
+        if self.dispatcher is not None:
+            # Whoever receives the run also owns its retries
+            self.dispatcher(task, attempt)
+            self.dispatch_histogram.record()
+            self._release_lease(task.name, fire)
+            self._retire_if_done(task)
+            return
+        future = self.pool.submit(task, self.executor.execute_task, attempt)
+        if future is None:
+            self._handle_overlap(task, attempt, fire)
+            return
+        self.dispatch_histogram.record()
+        future.add_done_callback(lambda f: self._on_complete(task, f, fire))
+        # Added after the pool's own callback, so the finished run's slot is free
+        future.add_done_callback(lambda f: self._start_queued(task.name))
+
+    def _handle_overlap(self, task: Task, attempt: int, fire: Optional[float]) -> None:
+        """Apply a task's overlap policy to a run that found all its slots taken.
+
+        ``skip`` and ``allow-N`` drop the run. ``queue-one`` holds it until a
+        running run finishes, and a newer fire replaces the one already held,
+        so a stalled task never has more than one run waiting. ``replace``
+        also cancels the running runs.
+        """
+        logger = self.log_manager.get_logger(task.name)
+        if task.overlap not in ("queue-one", "replace"):
+            logger.info(
+                f"Skipping run of {task.name}: {task.max_concurrency} run(s) already in flight"
+            )
+            self._release_lease(task.name, fire)
+            return
+        with self._lock:
+            superseded = self._queued.get(task.name)
+            self._queued[task.name] = (attempt, fire)
+        if superseded is not None:
+            logger.info(f"Coalescing queued run of {task.name} into the newer fire")
+            self._release_lease(task.name, superseded[1])
+        else:
+            logger.info(f"Queueing run of {task.name} until the running one finishes")
+        if task.overlap == "replace":
+            cancelled = self.executor.cancel(task.name)
+            logger.info(f"Replacing {cancelled} running run(s) of {task.name}")
+        if self.pool.running(task.name) < task.max_concurrency:
+            # The running run finished before the queued one was stored
+            self._start_queued(task.name)
+
+    def _start_queued(self, task_name: str) -> None:
+        """Dispatch the run held back by the overlap policy, if any."""
+        with self._lock:
+            queued = self._queued.pop(task_name, None)
+        if queued is None:
+            return
+        attempt, fire = queued
+        task = self.tasks.get(task_name)
+        if task is None:
+            self._release_lease(task_name, fire)
+            return
+        # The queued fire supersedes a retry of the run that just finished
+        self._drop_held((task_name, "retry"))
+        self._dispatch(task, attempt, fire)
+
+    def _on_complete(self, task: Task, future: Future, fire: Optional[float] = None) -> None:
+        """Release dependent tasks on success, or re-queue a failed run as a timed retry."""
+        if future.cancelled():
+            self._release_lease(task.name, fire)
+            return
+        error = future.exception()
+        result = None if error is not None else future.result()
+        if self.history is not None:
+            if error is not None:
+                # A run that raised has no result of its own; record it as failed
+                finished = datetime.now()
+                started = task.last_run or finished
+                self.history.record(
+                    RunResult(task.name, "failed", started, finished, attempt=task.attempts + 1)
+                )
+            elif result is not None:
+                self.history.record(result)
+        # The task may have been removed or redefined while this run was in flight
+        current = self.tasks.get(task.name)
+        if current is None:
+            self._release_lease(task.name, fire)
+            return
+        if result is not None and result.succeeded:
+            self._release_lease(task.name, fire)
+            self._release_downstream(task.name)
+            self._retire_if_done(current)
+            return
+        if error is not None:
+            task.last_status = "failed"
+        if (result is not None and result.status == "cancelled") or not task.should_retry():
+            self._release_lease(task.name, fire)
+            self._retire_if_done(current)
+            return
+
+        # The run that failed was number task.attempts + 1 of this fire
+        attempt = task.attempts + 2
+        delay = current.retry.delay_for(attempt - 1)
+        logger = self.log_manager.get_logger(task.name)
+        logger.info(
+            f"Retrying task {task.name} in {delay:.1f} seconds "
+            f"(retry {attempt - 1}/{current.retry.max_attempts})"
+        )
+        self._hold(
+            (task.name, "retry"),
+            task.name,
+            fire,
+            self.timers.clock() + delay,
+            lambda: self._dispatch(current, attempt, fire),
+        )
+
+    def _hold(
+        self,
+        key: Hashable,
+        task_name: str,
+        fire: Optional[float],
+        when: float,
+        callback: Callable[[], None],
+    ) -> None:
+        """Call ``callback`` at ``when`` on behalf of ``fire``, tracking the fire's lease.
+
+        If the timer is dropped instead, ``_drop_held`` or ``stop`` releases it.
+        """
+        with self._lock:
+            superseded = self._held.get(key)
+            self._held[key] = (task_name, fire)
+
+        def run() -> None:
+            with self._lock:
+                self._held.pop(key, None)
+            callback()
+
+        self.timers.schedule(key, when, run)
+        if superseded is not None and superseded[1] != fire:
+            self._release_lease(*superseded)
+
+    def _drop_held(self, key: Hashable) -> None:
+        """Cancel a timer set with ``_hold`` and release the lease of its fire."""
+        self.timers.cancel(key)
+        with self._lock:
+            held = self._held.pop(key, None)
+        if held is not None:
+            self._release_lease(*held)
+
+    def _check_dispatchable(self, task: Task) -> None:
+        # Runs handed to a dispatcher finish elsewhere, so their successes
+        # never reach _release_downstream and dependent tasks would wait forever
+        if self.dispatcher is not None and task.dependencies:
+            raise ValueError(
+                f"Task {task.name} has dependencies, which runs handed to a dispatcher "
+                "cannot satisfy"
+            )
+
+    def _retire_if_done(self, task: Task) -> None:
+        """Unregister a one-time task once its only fire has finished."""
+        if task.schedule.type == "one-time" and task.name not in self.timers:
+            self.remove_task(task.name)
+
+    def _release_lease(self, task_name: str, fire: Optional[float]) -> None:
+        if self.coordinator is not None and fire is not None:
+            self.coordinator.release(task_name, fire)
+
+    def _maintain_leases(self) -> None:
+        """Keep this replica's leases alive and take over fires abandoned by others."""
+        self.coordinator.heartbeat()
+        for task_name, fire in self.coordinator.reclaim_expired():
+            task = self.tasks.get(task_name)
+            if task is None:
+                self.coordinator.release(task_name, fire)
+                continue
+            logger = self.log_manager.get_logger(task_name)
+            logger.info(f"Reclaimed expired lease on {task_name}; running it here")
+            self._dispatch_when_ready(task, fire)
+        self.coordinator.prune()
+
+    def run_pending(self) -> int:
+        """Fire every task that is due now. Returns the number of timers fired."""
+        due = self.timers.pop_due()
+        for _, callback in due:
+            callback()
+        return len(due)
 
     def run(self) -> None:
-        """Run the scheduler."""
-        while True:
-            self.schedule.run_pending()
-            time.sleep(1)
+        """Run the scheduler until ``stop`` is called."""
+        self._running = True
+        self.timers.open()
+        while self._running:
+            self.run_pending()
+            self.timers.wait()
 
     def stop(self) -> None:
         """Stop all scheduled tasks"""
-        schedule.clear()
+        self._running = False
+        self.timers.clear()
+        self.timers.close()
         self.tasks.clear()
+        with self._lock:
+            self.graph = TaskGraph()
+            self._satisfied.clear()
+            # Fires that will now never run; runs in flight release their own
+            dropped = list(self._waiting.items())
+            dropped += [(name, fire) for name, (_, fire) in self._queued.items()]
+            dropped += list(self._held.values())
+            self._waiting.clear()
+            self._queued.clear()
+            self._held.clear()
+        for task_name, fire in dropped:
+            self._release_lease(task_name, fire)
+        self.pool.shutdown(wait=False)
+        self.executor.python_workers.close()
+        if self.executor.http_client is not None:
+            self.executor.http_client.cleanup()
+        for executor in self._maintenance.values():
+            executor.shutdown(wait=False)
+        self._maintenance.clear()
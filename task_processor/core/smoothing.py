@@ -0,0 +1,90 @@
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, List, Optional
+
+# Seconds of dispatch counts kept for the histogram
+DEFAULT_HISTOGRAM_WINDOW = 3600
+
+
+def spread_offset(task_name: str, interval: float) -> float:
+    """Stable offset in ``[0, interval)`` derived from a task's name.
+
+    CRC32 rather than ``hash()``, which is salted per process, so the offset
+    is the same on every replica and after every restart.
+    """
+    return zlib.crc32(task_name.encode()) / 2**32 * interval
+
+
+class DispatchThrottle:
+    """Cap dispatches per second by spacing them at least ``1 / rate`` apart.
+
+    ``reserve`` books the next free slot and returns how long the caller has
+    to wait for it, so a burst is deferred into an even stream instead of
+    being dropped.
+    """
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.time):
+        """Initialize the throttle. ``rate`` is the maximum dispatches per second."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.clock = clock
+        self._spacing = 1.0 / rate
+        self._next_free = 0.0
+        self._lock = threading.Lock()
+        self.deferred = 0
+
+    def reserve(self) -> float:
+        """Book a dispatch slot. Returns the seconds until it starts (0 if now)."""
+        now = self.clock()
+        with self._lock:
+            slot = max(now, self._next_free)
+            self._next_free = slot + self._spacing
+            if slot > now:
+                self.deferred += 1
+            return slot - now
+
+
+class DispatchHistogram:
+    """Dispatches per second over a sliding window, as a distribution.
+
+    ``histogram()`` maps a number of dispatches to how many seconds in the
+    window saw exactly that many; seconds with no dispatch are left out.
+    """
+
+    def __init__(
+        self, window: int = DEFAULT_HISTOGRAM_WINDOW, clock: Callable[[], float] = time.time
+    ):
+        """Initialize an empty histogram covering the last ``window`` seconds."""
+        self.window = window
+        self.clock = clock
+        self._seconds: Deque[List[int]] = deque()
+        self._lock = threading.Lock()
+
+    def record(self, when: Optional[float] = None) -> None:
+        """Count one dispatch at ``when`` (default: now)."""
+        second = int(self.clock() if when is None else when)
+        with self._lock:
+            if self._seconds and self._seconds[-1][0] == second:
+                self._seconds[-1][1] += 1
+            else:
+                self._seconds.append([second, 1])
+            self._expire(second)
+
+    def histogram(self) -> Dict[int, int]:
+        """Number of seconds in the window, keyed by the dispatches made in them."""
+        with self._lock:
+            self._expire(int(self.clock()))
+            return dict(sorted(Counter(count for _, count in self._seconds).items()))
+
+    def peak(self) -> int:
+        """Most dispatches made in any one second of the window."""
+        with self._lock:
+            self._expire(int(self.clock()))
+            return max((count for _, count in self._seconds), default=0)
+
+    def _expire(self, now: int) -> None:
+        while self._seconds and self._seconds[0][0] <= now - self.window:
+            self._seconds.popleft()
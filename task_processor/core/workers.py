@@ -0,0 +1,228 @@
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PYTHON_WORKERS = 2
+DEFAULT_WORKER_MAX_RUNS = 100
+
+
+@dataclass
+class WorkerResult:
+    """Outcome of one entry point call in a worker process."""
+
+    exit_code: int
+    stdout: str = ""
+    stderr: str = ""
+
+
+def load_entrypoint(entrypoint: str) -> Callable[..., Any]:
+    """Resolve ``"package.module:function"`` to the callable it names."""
+    module_name, _, attribute = entrypoint.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def _rss_mb() -> float:
+    """Resident set size of the current process in megabytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _call(entrypoint: str, kwargs: Dict[str, Any]) -> Tuple[int, str, str]:
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            load_entrypoint(entrypoint)(**kwargs)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def _worker_main(conn, preload: List[str]) -> None:
+    """Serve entry point calls until told to stop."""
+    # Own process group, so a run is killed together with anything it started
+    os.setsid()
+    for module_name in preload:
+        importlib.import_module(module_name)
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        entrypoint, kwargs = request
+        exit_code, stdout, stderr = _call(entrypoint, kwargs)
+        conn.send((exit_code, stdout, stderr, _rss_mb()))
+
+
+class _Worker:
+    def __init__(self, context, preload: List[str]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, preload), name="taskops-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+
+class PythonWorkerPool:
+    """Long-lived worker processes that run ``module:function`` entry points.
+
+    Workers are started on demand, up to ``size``, and import the ``preload``
+    modules once when they start, so a run pays only for the call itself. A
+    worker is replaced after ``max_runs`` runs, or once its resident memory
+    exceeds ``max_memory`` megabytes.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_PYTHON_WORKERS,
+        preload: Iterable[str] = (),
+        max_runs: int = DEFAULT_WORKER_MAX_RUNS,
+        max_memory: Optional[float] = None,
+        kill_grace: float = 5.0,
+    ):
+        """Initialize the pool. No process is started until the first run."""
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.preload = list(preload)
+        self.max_runs = max_runs
+        self.max_memory = max_memory
+        self.kill_grace = kill_grace
+        # Workers are started with spawn: forking a process that runs threads
+        # can leave locks held in the child
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._busy: Dict[int, _Worker] = {}
+        self.recycled = 0
+
+    def run(
+        self,
+        entrypoint: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        on_start: Optional[Callable[[int], None]] = None,
+        on_finish: Optional[Callable[[int], None]] = None,
+    ) -> WorkerResult:
+        """Call an entry point in a worker and wait for it to return.
+
+        ``on_start`` receives the worker's pid, which is also its process
+        group id, before the call is sent, and ``on_finish`` receives it once
+        the call is over and before the worker serves anything else. Raises
+        TimeoutError after killing the worker if the call takes longer than
+        ``timeout`` seconds.
+        """
+        with self._slots:
+            worker = self._checkout()
+            if on_start is not None:
+                on_start(worker.pid)
+            try:
+                worker.conn.send((entrypoint, kwargs or {}))
+                reply = worker.conn.recv() if worker.conn.poll(timeout) else None
+            except (EOFError, OSError):
+                reply = False
+            finally:
+                if on_finish is not None:
+                    on_finish(worker.pid)
+            if reply is False:
+                # Killed (for example by a cancel) or crashed mid-run
+                worker.process.join()
+                self._discard(worker)
+                return WorkerResult(
+                    exit_code=worker.process.exitcode or -signal.SIGKILL,
+                    stderr=f"Worker process {worker.pid} exited during the run",
+                )
+            if reply is None:
+                self._kill(worker)
+                raise TimeoutError(f"{entrypoint} did not return within {timeout} seconds")
+            exit_code, stdout, stderr, rss = reply
+            worker.runs += 1
+            if worker.runs >= self.max_runs or (
+                self.max_memory is not None and rss > self.max_memory
+            ):
+                self.recycled += 1
+                self._retire(worker)
+            else:
+                self._checkin(worker)
+            return WorkerResult(exit_code=exit_code, stdout=stdout, stderr=stderr)
+
+    def workers(self) -> List[int]:
+        """Pids of the live worker processes."""
+        with self._lock:
+            return [w.pid for w in self._idle] + list(self._busy)
+
+    def close(self) -> None:
+        """Stop idle workers and kill busy ones. Later runs start new workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            busy = list(self._busy.values())
+        for worker in idle:
+            self._retire(worker)
+        for worker in busy:
+            self._kill(worker)
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is not None and not worker.process.is_alive():
+            worker.conn.close()
+            worker = None
+        if worker is None:
+            worker = _Worker(self._context, self.preload)
+        with self._lock:
+            self._busy[worker.pid] = worker
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        with self._lock:
+            self._busy.pop(worker.pid, None)
+            self._idle.append(worker)
+
+    def _discard(self, worker: _Worker) -> None:
+        with self._lock:
+            self._busy.pop(worker.pid, None)
+        worker.conn.close()
+
+    def _retire(self, worker: _Worker) -> None:
+        with contextlib.suppress(OSError):
+            worker.conn.send(None)
+        self._discard(worker)
+        worker.process.join(self.kill_grace)
+        if worker.process.is_alive():
+            self._kill(worker)
+
+    def _kill(self, worker: _Worker) -> None:
+        """SIGTERM the worker's process group, then SIGKILL it after the grace period."""
+        self._discard(worker)
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(worker.pid, sig)
+            worker.process.join(self.kill_grace)
+            if not worker.process.is_alive():
+                return
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Type
 
 from pydantic import BaseModel
 
@@ -53,7 +53,7 @@ class PluginManager:
         self._configs: Dict[str, PluginConfig] = {}
 
     def register_plugin(
-        self, name: str, plugin_class: type[BasePlugin], config: PluginConfig
+        self, name: str, plugin_class: Type[BasePlugin], config: PluginConfig
     ) -> None:
         """Register a new plugin"""
         if name in self._plugins:
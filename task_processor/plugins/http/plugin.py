@@ -0,0 +1,160 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Dict, Optional, Tuple
+
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from pydantic import Field
+
+from task_processor.core.models import Task
+
+from ..base import BasePlugin, PluginConfig
+
+
+class HttpConfig(PluginConfig):
+    """HTTP plugin configuration"""
+
+    max_connections: int = Field(100, ge=1, description="Open connections across all hosts")
+    max_connections_per_host: int = Field(10, ge=1, description="Open connections per host")
+    max_in_flight: int = Field(
+        1000, ge=1, description="Requests in flight at once, including those waiting to connect"
+    )
+    keepalive_timeout: float = Field(
+        30.0, gt=0, description="Seconds an idle connection is kept open for reuse"
+    )
+    timeout: float = Field(
+        30.0, gt=0, description="Seconds a request may take when its task sets no timeout"
+    )
+    dns_cache_ttl: int = Field(300, ge=0, description="Seconds resolved addresses are cached")
+    max_logged_body: int = Field(
+        4096, ge=0, description="Bytes of each response body written to the task log"
+    )
+
+
+class HttpPlugin(BasePlugin):
+    """Run HTTP tasks on one pooled, keep-alive client.
+
+    Requests share an aiohttp session on a dedicated event loop thread, so
+    connections (and TLS sessions) are reused across runs instead of paying
+    for a process and a handshake per run. Connections are limited in total
+    and per host, and at most ``max_in_flight`` requests run at once.
+
+    A response whose status is not expected fails the run with the status
+    code as its exit code; the scheduler then retries it according to the
+    task's ``RetryConfig`` like any other failed run.
+    """
+
+    def __init__(self, config: HttpConfig):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError(
+                "aiohttp package is required for HTTP support. "
+                "Install it with 'pip install \"taskops[http]\"'"
+            )
+        super().__init__(config)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.requests = 0
+
+    def initialize(self) -> None:
+        """Start the client's event loop thread and open the session"""
+        if self._initialized:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="taskops-http", daemon=True
+        )
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+        self._initialized = True
+
+    def cleanup(self) -> None:
+        """Close pooled connections and stop the event loop thread"""
+        if not self._initialized:
+            return
+        self._initialized = False
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._session = None
+        self._loop = None
+
+    def submit(self, task: Task, logger=None) -> concurrent.futures.Future:
+        """Start a task's request. The future resolves to status, exit code and body size."""
+        if not self._initialized:
+            raise RuntimeError("HTTP plugin not initialized")
+        return asyncio.run_coroutine_threadsafe(self._run(task, logger), self._loop)
+
+    def run(self, task: Task, logger=None) -> Tuple[str, Optional[int], int]:
+        """Send a task's request and wait for the outcome."""
+        return self.submit(task, logger).result()
+
+    def stats(self) -> Dict[str, int]:
+        """Requests sent so far and requests in flight."""
+        with self._lock:
+            return {"requests": self.requests, "in_flight": self._in_flight}
+
+    async def _open(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self.config.max_connections,
+            limit_per_host=self.config.max_connections_per_host,
+            keepalive_timeout=self.config.keepalive_timeout,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._slots = asyncio.Semaphore(self.config.max_in_flight)
+
+    async def _run(self, task: Task, logger) -> Tuple[str, Optional[int], int]:
+        request = task.http
+        timeout = aiohttp.ClientTimeout(total=task.timeout or self.config.timeout)
+        async with self._slots:
+            with self._lock:
+                self._in_flight += 1
+                self.requests += 1
+            try:
+                async with self._session.request(
+                    request.method,
+                    request.url,
+                    headers=request.headers,
+                    params=request.params,
+                    json=request.json_body,
+                    data=request.body,
+                    timeout=timeout,
+                ) as response:
+                    # Reading the whole body returns the connection to the pool
+                    body = await response.read()
+                    status_code = response.status
+            except asyncio.TimeoutError:
+                if logger is not None:
+                    logger.error(f"Task {task.name} timed out")
+                return "timeout", None, 0
+            except aiohttp.ClientError as e:
+                if logger is not None:
+                    logger.error(f"Task {task.name} failed with error: {str(e)}")
+                return "failed", None, 0
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+        if logger is not None:
+            text = body[: self.config.max_logged_body].decode(errors="replace")
+            if request.is_success(status_code):
+                logger.info(f"Task {task.name} completed with HTTP {status_code}")
+                if text:
+                    logger.debug(text)
+            else:
+                logger.error(f"Task {task.name} failed with HTTP {status_code}")
+                if text:
+                    logger.error(text)
+        status = "success" if request.is_success(status_code) else "failed"
+        return status, status_code, len(body)
@@ -1,8 +1,13 @@
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 try:
     import mysql.connector
+    import mysql.connector.pooling
     from mysql.connector import Error
+    from mysql.connector.errors import PoolError
 
     MYSQL_AVAILABLE = True
 except ImportError:
@@ -23,6 +28,19 @@ class MySQLConfig(PluginConfig):
     database: str = Field(..., description="MySQL database name")
     pool_size: int = Field(5, description="Connection pool size")
     pool_name: str = Field("task_processor_pool", description="Connection pool name")
+    pool_timeout: float = Field(
+        30.0, ge=0, description="Seconds to wait for a free connection when the pool is exhausted"
+    )
+    fetch_size: int = Field(1000, ge=1, description="Rows fetched per round trip by stream_query")
+    chunk_size: int = Field(1000, ge=1, description="Rows per committed batch in execute_many")
+    allow_local_infile: bool = Field(
+        False, description="Allow LOAD DATA LOCAL INFILE, needed by load_file"
+    )
+
+
+def _quote_identifier(name: str) -> str:
+    """Backtick-quote a possibly database-qualified table or column name."""
+    return ".".join("`" + part.replace("`", "``") + "`" for part in name.split("."))
 
 
 class MySQLPlugin(BasePlugin):
@@ -32,11 +50,16 @@ class MySQLPlugin(BasePlugin):
         if not MYSQL_AVAILABLE:
             raise ImportError(
                 "mysql-connector-python package is required for MySQL support. "
-                "Install it with 'pip install task-runner[mysql]'"
+                "Install it with 'pip install \"taskops[mysql]\"'"
             )
         super().__init__(config)
         self._connection = None
         self._pool = None
+        self._stats_lock = threading.Lock()
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
 
     def initialize(self) -> None:
         """Initialize MySQL connection pool"""
@@ -49,6 +72,7 @@ class MySQLPlugin(BasePlugin):
                 user=self.config.user,
                 password=self.config.password,
                 database=self.config.database,
+                allow_local_infile=self.config.allow_local_infile,
             )
             self._initialized = True
         except Error as e:
@@ -62,10 +86,51 @@ class MySQLPlugin(BasePlugin):
         self._initialized = False
 
     def get_connection(self):
-        """Get a connection from the pool"""
+        """Get a connection from the pool, waiting up to ``pool_timeout`` for a free one"""
         if not self._initialized:
             raise RuntimeError("MySQL plugin not initialized")
-        return self._pool.get_connection()
+        started = time.perf_counter()
+        delay = 0.001
+        while True:
+            try:
+                conn = self._pool.get_connection()
+                break
+            except PoolError:
+                # The connector's pool does not block when exhausted, so poll it
+                waited = time.perf_counter() - started
+                if waited >= self.config.pool_timeout:
+                    with self._stats_lock:
+                        self._timeouts += 1
+                    raise
+                time.sleep(min(delay, self.config.pool_timeout - waited))
+                delay = min(delay * 2, 0.05)
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def pool_stats(self) -> Dict[str, float]:
+        """Pool usage and the time callers waited to acquire a connection.
+
+        ``in_use`` and ``idle`` count connections now; ``acquired``,
+        ``timeouts`` and the wait times (in seconds) cover the plugin's life.
+        """
+        if not self._initialized:
+            raise RuntimeError("MySQL plugin not initialized")
+        idle = self._pool._cnx_queue.qsize()
+        with self._stats_lock:
+            return {
+                "size": self._pool.pool_size,
+                "in_use": self._pool.pool_size - idle,
+                "idle": idle,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "wait_total": self._wait_total,
+                "wait_max": self._wait_max,
+                "wait_avg": self._wait_total / self._acquired if self._acquired else 0.0,
+            }
 
     def execute_query(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
         """Execute a SELECT query and return results"""
@@ -74,6 +139,32 @@ class MySQLPlugin(BasePlugin):
                 cursor.execute(query, params or ())
                 return cursor.fetchall()
 
+    def stream_query(
+        self,
+        query: str,
+        params: Optional[List[Any]] = None,
+        fetch_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a SELECT query without loading the whole result.
+
+        Uses an unbuffered cursor that reads ``fetch_size`` rows from the
+        server at a time. The pooled connection is held until the iterator is
+        exhausted or closed.
+        """
+        size = fetch_size or self.config.fetch_size
+        with self.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            try:
+                cursor.execute(query, params or ())
+                while rows := cursor.fetchmany(size):
+                    yield from rows
+            finally:
+                if conn.unread_result:
+                    # Closed early: the rest of the result must be read off the
+                    # wire before the connection can be used again
+                    conn.consume_results()
+                cursor.close()
+
     def execute_command(self, query: str, params: Optional[List[Any]] = None) -> int:
         """Execute an INSERT/UPDATE/DELETE query and return affected rows"""
         with self.get_connection() as conn:
@@ -82,10 +173,54 @@ class MySQLPlugin(BasePlugin):
                 conn.commit()
                 return cursor.rowcount
 
-    def execute_many(self, query: str, params: List[List[Any]]) -> int:
-        """Execute multiple commands in a single transaction"""
+    def execute_many(
+        self, query: str, params: Iterable[Sequence[Any]], chunk_size: Optional[int] = None
+    ) -> int:
+        """Execute a command for each parameter set, committing every ``chunk_size`` rows.
+
+        ``params`` may be a generator; only one chunk is held in memory. If a
+        chunk fails, earlier chunks stay committed. Returns the affected rows.
+        """
+        size = chunk_size or self.config.chunk_size
+        rows = iter(params)
+        total = 0
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                while chunk := list(islice(rows, size)):
+                    cursor.executemany(query, chunk)
+                    conn.commit()
+                    total += cursor.rowcount
+        return total
+
+    def load_file(
+        self,
+        table: str,
+        path: str,
+        columns: Optional[Sequence[str]] = None,
+        fields_terminated_by: str = ",",
+        enclosed_by: str = '"',
+        lines_terminated_by: str = "\n",
+        ignore_lines: int = 0,
+    ) -> int:
+        """Bulk load a delimited file with ``LOAD DATA LOCAL INFILE``. Returns the rows loaded.
+
+        The client streams the file to the server, which parses and inserts
+        it in one statement. Needs ``allow_local_infile`` in the config and
+        ``local_infile`` enabled on the server.
+        """
+        if not self.config.allow_local_infile:
+            raise RuntimeError("load_file needs allow_local_infile=True in the MySQL config")
+        statement = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {_quote_identifier(table)} "
+            "FIELDS TERMINATED BY %s OPTIONALLY ENCLOSED BY %s LINES TERMINATED BY %s "
+            f"IGNORE {int(ignore_lines)} LINES"
+        )
+        if columns:
+            statement += f" ({', '.join(map(_quote_identifier, columns))})"
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.executemany(query, params)
+                cursor.execute(
+                    statement, (path, fields_terminated_by, enclosed_by, lines_terminated_by)
+                )
                 conn.commit()
                 return cursor.rowcount
@@ -0,0 +1,244 @@
+import re
+import uuid
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import psycopg
+    from psycopg import sql
+    from psycopg.rows import dict_row
+    from psycopg_pool import ConnectionPool, PoolTimeout
+
+    POSTGRES_AVAILABLE = True
+except ImportError:
+    POSTGRES_AVAILABLE = False
+
+from pydantic import Field
+
+from ..base import BasePlugin, PluginConfig
+
+COPY_FORMATS = {"csv": "CSV", "text": "TEXT", "binary": "BINARY"}
+# A copy_to source starting with one of these keywords is a query, not a table name
+_QUERY = re.compile(r"\s*(select|with|values)\b", re.IGNORECASE)
+
+
+class PostgresConfig(PluginConfig):
+    """PostgreSQL plugin configuration"""
+
+    host: str = Field(..., description="PostgreSQL host")
+    port: int = Field(5432, description="PostgreSQL port")
+    user: str = Field(..., description="PostgreSQL user")
+    password: str = Field(..., description="PostgreSQL password")
+    database: str = Field(..., description="PostgreSQL database name")
+    min_pool_size: int = Field(1, ge=0, description="Connections kept open when idle")
+    pool_size: int = Field(5, ge=1, description="Maximum connections in the pool")
+    pool_timeout: float = Field(30.0, gt=0, description="Seconds to wait for a free connection")
+    fetch_size: int = Field(
+        2000, ge=1, description="Rows fetched per round trip by server-side cursors"
+    )
+    copy_chunk_size: int = Field(
+        64 * 1024, ge=1, description="Bytes read from a file per COPY write"
+    )
+
+
+def _table(name: str) -> "sql.Composable":
+    """Quote a possibly schema-qualified table name."""
+    return sql.Identifier(*name.split("."))
+
+
+def _copy_statement(
+    direction: str, target: "sql.Composable", columns: Optional[Sequence[str]], options: str
+) -> "sql.Composed":
+    column_list = sql.SQL("")
+    if columns:
+        column_list = sql.SQL(" ({})").format(sql.SQL(", ").join(map(sql.Identifier, columns)))
+    return sql.SQL("COPY {}{} {} WITH ({})").format(
+        target, column_list, sql.SQL(direction), sql.SQL(options)
+    )
+
+
+def _copy_options(format: str, header: bool) -> str:
+    if format not in COPY_FORMATS:
+        raise ValueError(f"COPY format must be one of {', '.join(COPY_FORMATS)}")
+    options = f"FORMAT {COPY_FORMATS[format]}"
+    if header and format == "csv":
+        options += ", HEADER"
+    return options
+
+
+class PostgresPlugin(BasePlugin):
+    """PostgreSQL plugin for database operations.
+
+    Bulk loads and exports stream through ``COPY``, and large result sets are
+    read through named (server-side) cursors ``fetch_size`` rows at a time, so
+    memory use does not grow with the number of rows.
+    """
+
+    def __init__(self, config: PostgresConfig):
+        if not POSTGRES_AVAILABLE:
+            raise ImportError(
+                "psycopg and psycopg_pool packages are required for PostgreSQL support. "
+                "Install them with 'pip install \"taskops[postgres]\"'"
+            )
+        super().__init__(config)
+        self._pool = None
+
+    def initialize(self) -> None:
+        """Open the connection pool"""
+        try:
+            self._pool = ConnectionPool(
+                conninfo=psycopg.conninfo.make_conninfo(
+                    host=self.config.host,
+                    port=self.config.port,
+                    user=self.config.user,
+                    password=self.config.password,
+                    dbname=self.config.database,
+                ),
+                min_size=self.config.min_pool_size,
+                max_size=self.config.pool_size,
+                timeout=self.config.pool_timeout,
+                name=self.config.name,
+                open=False,
+            )
+            self._pool.open(wait=self.config.min_pool_size > 0, timeout=self.config.pool_timeout)
+            self._initialized = True
+        except (psycopg.Error, PoolTimeout) as e:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+            raise RuntimeError(f"Failed to initialize PostgreSQL connection pool: {e}")
+
+    def cleanup(self) -> None:
+        """Close the connection pool"""
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+        self._initialized = False
+
+    @contextmanager
+    def get_connection(self) -> Iterator["psycopg.Connection"]:
+        """Borrow a connection from the pool.
+
+        The block runs in a transaction that is committed when it exits
+        normally and rolled back if it raises.
+        """
+        if not self._initialized:
+            raise RuntimeError("PostgreSQL plugin not initialized")
+        with self._pool.connection() as conn:
+            yield conn
+
+    def execute_query(
+        self, query: str, params: Optional[Sequence[Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute a SELECT query and return results"""
+        with self.get_connection() as conn:
+            with conn.cursor(row_factory=dict_row) as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+    def execute_command(self, query: str, params: Optional[Sequence[Any]] = None) -> int:
+        """Execute an INSERT/UPDATE/DELETE query and return affected rows"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.rowcount
+
+    def execute_many(self, query: str, params: Iterable[Sequence[Any]]) -> int:
+        """Execute multiple commands in a single transaction.
+
+        Statements are pipelined; for large inserts prefer :meth:`copy_rows`.
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.executemany(query, params)
+                return cursor.rowcount
+
+    def stream_query(
+        self,
+        query: str,
+        params: Optional[Sequence[Any]] = None,
+        fetch_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a query from a server-side cursor.
+
+        Rows are fetched ``fetch_size`` at a time, so only one batch is held
+        in memory however large the result. The pooled connection is held
+        until the iterator is exhausted or closed.
+        """
+        with self.get_connection() as conn:
+            name = f"taskops_{uuid.uuid4().hex}"
+            with conn.cursor(name, row_factory=dict_row) as cursor:
+                cursor.itersize = fetch_size or self.config.fetch_size
+                cursor.execute(query, params)
+                yield from cursor
+
+    def copy_rows(
+        self, table: str, rows: Iterable[Sequence[Any]], columns: Optional[Sequence[str]] = None
+    ) -> int:
+        """Bulk insert rows with ``COPY ... FROM STDIN``. Returns the number of rows.
+
+        Rows are streamed to the server as they are produced, so ``rows`` can
+        be a generator over more data than fits in memory.
+        """
+        statement = _copy_statement("FROM STDIN", _table(table), columns, "FORMAT TEXT")
+        count = 0
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                with cursor.copy(statement) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                        count += 1
+        return count
+
+    def copy_from(
+        self,
+        table: str,
+        source: IO[bytes],
+        columns: Optional[Sequence[str]] = None,
+        format: str = "csv",
+        header: bool = False,
+    ) -> int:
+        """Bulk load a file object with ``COPY ... FROM STDIN``. Returns the number of rows."""
+        statement = _copy_statement(
+            "FROM STDIN", _table(table), columns, _copy_options(format, header)
+        )
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                with cursor.copy(statement) as copy:
+                    while chunk := source.read(self.config.copy_chunk_size):
+                        copy.write(chunk)
+                return cursor.rowcount
+
+    def copy_to(
+        self,
+        source: str,
+        destination: IO[bytes],
+        columns: Optional[Sequence[str]] = None,
+        format: str = "csv",
+        header: bool = False,
+    ) -> int:
+        """Export a table, or the rows of a SELECT query, with ``COPY ... TO STDOUT``.
+
+        Data is written to ``destination`` as the server sends it. Returns
+        the number of bytes written.
+        """
+        if _QUERY.match(source):
+            target = sql.SQL("({})").format(sql.SQL(source))
+            columns = None
+        else:
+            target = _table(source)
+        statement = _copy_statement("TO STDOUT", target, columns, _copy_options(format, header))
+        written = 0
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                with cursor.copy(statement) as copy:
+                    for data in copy:
+                        destination.write(data)
+                        written += len(data)
+        return written
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Pool size, idle connections and requests waiting for a connection."""
+        if not self._initialized:
+            raise RuntimeError("PostgreSQL plugin not initialized")
+        return self._pool.get_stats()
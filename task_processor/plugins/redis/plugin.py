@@ -0,0 +1,332 @@
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from pydantic import Field
+
+from task_processor.core.models import Task
+
+from ..base import BasePlugin, PluginConfig
+
+# Runtime state is not part of what a queued run needs
+_RUNTIME_FIELDS = {"last_run", "last_status", "attempts"}
+
+
+class RedisConfig(PluginConfig):
+    """Redis queue plugin configuration"""
+
+    url: str = Field("redis://localhost:6379/0", description="Redis connection URL")
+    queue: str = Field("taskops", description="Prefix of the queue's Redis keys")
+    visibility_timeout: int = Field(
+        300, ge=1, description="Seconds a popped job may go unextended before it is redelivered"
+    )
+    block_timeout: int = Field(1, ge=1, description="Seconds a worker blocks waiting for a job")
+    batch_size: int = Field(100, ge=1, description="Jobs sent to Redis per pipelined enqueue")
+    flush_interval: float = Field(
+        0.05, gt=0, description="Seconds buffered jobs wait before they are sent"
+    )
+    maintenance_interval: float = Field(
+        1.0, gt=0, description="Seconds between sweeps for expired and delayed jobs"
+    )
+
+
+@dataclass
+class QueuedJob:
+    """A run of a task taken from the queue."""
+
+    id: str
+    task: Task
+    attempt: int
+    raw: str
+
+
+class RedisQueuePlugin(BasePlugin):
+    """Distribute task runs over worker processes through Redis.
+
+    The scheduler side enqueues runs instead of executing them, buffering
+    them into pipelined batches. Workers move jobs from the ready list to a
+    processing list with a blocking pop and record a visibility deadline; a
+    job whose worker does not acknowledge it in time is redelivered. Failed
+    runs are retried after the task's retry delay, and runs that exhaust
+    their attempts go to a dead-letter list.
+
+    Keys, under the ``queue`` prefix: ``:ready`` and ``:processing`` (lists),
+    ``:deadlines`` and ``:delayed`` (sorted sets) and ``:dead`` (list).
+    """
+
+    def __init__(self, config: RedisConfig, client=None):
+        if client is None and not REDIS_AVAILABLE:
+            raise ImportError(
+                "redis package is required for Redis support. "
+                "Install it with 'pip install \"taskops[redis]\"'"
+            )
+        super().__init__(config)
+        self._client = client
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._last_maintenance = 0.0
+        prefix = config.queue
+        self.ready_key = f"{prefix}:ready"
+        self.processing_key = f"{prefix}:processing"
+        self.deadlines_key = f"{prefix}:deadlines"
+        self.delayed_key = f"{prefix}:delayed"
+        self.dead_key = f"{prefix}:dead"
+
+    def initialize(self) -> None:
+        """Connect to Redis"""
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.config.url, decode_responses=True)
+        try:
+            self._client.ping()
+        except Exception as e:
+            raise RuntimeError(f"Failed to connect to Redis: {e}")
+        self._initialized = True
+
+    def cleanup(self) -> None:
+        """Send buffered jobs and close the connection"""
+        if self._initialized:
+            self.flush()
+            self._client.close()
+        self._initialized = False
+
+    @property
+    def client(self):
+        if not self._initialized:
+            raise RuntimeError("Redis plugin not initialized")
+        return self._client
+
+    # Producer side
+
+    def attach(self, scheduler) -> None:
+        """Make a scheduler enqueue its due runs here instead of running them.
+
+        Runs finish on the workers, out of the scheduler's sight, so tasks
+        with dependencies are refused (ValueError), and ``max_concurrency``
+        and overlap policies are not enforced across workers. Pass a
+        ``history`` to ``consume`` to record the runs.
+        """
+        dependent = sorted(name for name, task in scheduler.tasks.items() if task.dependencies)
+        if dependent:
+            raise ValueError(
+                f"Tasks with dependencies cannot be run from a queue: {', '.join(dependent)}"
+            )
+        scheduler.dispatcher = self.enqueue
+        scheduler.add_maintenance("redis-flush", self.config.flush_interval, self.flush)
+
+    def enqueue(self, task: Task, attempt: int = 1) -> None:
+        """Buffer a run; the buffer is sent once it holds ``batch_size`` jobs or on flush."""
+        with self._lock:
+            self._buffer.append(self._encode(task, attempt))
+            if len(self._buffer) < self.config.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._push(batch)
+
+    def enqueue_many(self, tasks: Iterable[Task]) -> int:
+        """Enqueue one run of each task right away. Returns the number enqueued."""
+        jobs = [self._encode(task, 1) for task in tasks]
+        for start in range(0, len(jobs), self.config.batch_size):
+            self._push(jobs[start : start + self.config.batch_size])
+        return len(jobs)
+
+    def flush(self) -> int:
+        """Send buffered jobs now. Returns the number sent."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._push(batch)
+        return len(batch)
+
+    # Worker side
+
+    def pop(self, timeout: Optional[int] = None) -> Optional[QueuedJob]:
+        """Block until a job is ready and take it. Returns None on timeout."""
+        raw = self.client.blmove(
+            self.ready_key,
+            self.processing_key,
+            self.config.block_timeout if timeout is None else timeout,
+            src="RIGHT",
+            dest="LEFT",
+        )
+        if raw is None:
+            return None
+        self.client.zadd(self.deadlines_key, {raw: time.time() + self.config.visibility_timeout})
+        payload = json.loads(raw)
+        return QueuedJob(
+            id=payload["id"], task=Task(**payload["task"]), attempt=payload["attempt"], raw=raw
+        )
+
+    def extend(self, job: QueuedJob) -> bool:
+        """Push a running job's visibility deadline ``visibility_timeout`` seconds out.
+
+        Returns False if the job is no longer in flight, for example because
+        it was already redelivered.
+        """
+        deadline = time.time() + self.config.visibility_timeout
+        return bool(self.client.zadd(self.deadlines_key, {job.raw: deadline}, xx=True, ch=True))
+
+    def ack(self, job: QueuedJob) -> None:
+        """Remove a finished job from the processing list."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrem(self.processing_key, 1, job.raw)
+        pipe.zrem(self.deadlines_key, job.raw)
+        pipe.execute()
+
+    def fail(self, job: QueuedJob, status: str = "failed") -> None:
+        """Retry a failed job after its delay, or dead-letter it once attempts run out."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrem(self.processing_key, 1, job.raw)
+        pipe.zrem(self.deadlines_key, job.raw)
+        removed = pipe.execute()[0]
+        if removed:
+            # Not already redelivered by a visibility timeout sweep
+            self._retry_or_bury(job.raw, status)
+
+    def consume(
+        self,
+        executor,
+        stop: Optional[threading.Event] = None,
+        max_jobs: Optional[int] = None,
+        history=None,
+    ) -> int:
+        """Run queued jobs with ``executor`` until ``stop`` is set. Returns the number run.
+
+        While a job runs its visibility deadline is extended every third of
+        ``visibility_timeout``, so long runs are not redelivered. Each finished
+        run is recorded in ``history`` (a RunHistory) when one is given.
+        """
+        stop = stop or threading.Event()
+        processed = 0
+        while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+            now = time.time()
+            if now - self._last_maintenance >= self.config.maintenance_interval:
+                self._last_maintenance = now
+                self.requeue_expired()
+                self.promote_delayed()
+            job = self.pop()
+            if job is None:
+                continue
+            done = threading.Event()
+            keeper = threading.Thread(
+                target=self._keep_visible, args=(job, done), name="redis-visibility", daemon=True
+            )
+            keeper.start()
+            try:
+                result = executor.execute_task(job.task, job.attempt)
+            finally:
+                done.set()
+                keeper.join()
+            if history is not None:
+                history.record(result)
+            if result.succeeded:
+                self.ack(job)
+            else:
+                self.fail(job, result.status)
+            processed += 1
+        return processed
+
+    def _keep_visible(self, job: QueuedJob, done: threading.Event) -> None:
+        interval = self.config.visibility_timeout / 3
+        while not done.wait(interval):
+            try:
+                if not self.extend(job):
+                    return
+            except Exception:
+                # A missed extension only risks a redelivery; try again next time
+                continue
+
+    # Maintenance
+
+    def requeue_expired(self) -> int:
+        """Redeliver jobs whose worker missed its visibility deadline."""
+        processing = self.client.lrange(self.processing_key, 0, -1)
+        if not processing:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        for raw in processing:
+            pipe.zscore(self.deadlines_key, raw)
+        deadlines = pipe.execute()
+        now = time.time()
+        requeued = 0
+        for raw, deadline in zip(processing, deadlines):
+            if deadline is None:
+                # Popped by a worker that has not recorded (or died before recording)
+                # its deadline; give it one, so the next sweep redelivers it if needed
+                deadline_at = now + self.config.visibility_timeout
+                self.client.zadd(self.deadlines_key, {raw: deadline_at}, nx=True)
+                continue
+            if deadline > now:
+                continue
+            pipe = self.client.pipeline(transaction=True)
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.zrem(self.deadlines_key, raw)
+            if pipe.execute()[0]:
+                self._retry_or_bury(raw, "timeout", delay=0)
+                requeued += 1
+        return requeued
+
+    def promote_delayed(self) -> int:
+        """Move retries whose delay has passed back to the ready list."""
+        due = self.client.zrangebyscore(
+            self.delayed_key, "-inf", time.time(), start=0, num=self.config.batch_size
+        )
+        promoted = 0
+        for raw in due:
+            # Only the worker whose ZREM succeeds promotes the job
+            if self.client.zrem(self.delayed_key, raw):
+                self.client.lpush(self.ready_key, raw)
+                promoted += 1
+        return promoted
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs in each state."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.llen(self.ready_key)
+        pipe.llen(self.processing_key)
+        pipe.zcard(self.delayed_key)
+        pipe.llen(self.dead_key)
+        ready, processing, delayed, dead = pipe.execute()
+        return {"ready": ready, "processing": processing, "delayed": delayed, "dead": dead}
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead-lettered jobs, newest first."""
+        return [json.loads(raw) for raw in self.client.lrange(self.dead_key, 0, limit - 1)]
+
+    def _push(self, batch: List[str]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpush(self.ready_key, *batch)
+        pipe.execute()
+
+    def _encode(self, task: Task, attempt: int) -> str:
+        return json.dumps(
+            {
+                "id": uuid.uuid4().hex,
+                "task": task.model_dump(mode="json", exclude=_RUNTIME_FIELDS),
+                "attempt": attempt,
+                "enqueued_at": time.time(),
+            }
+        )
+
+    def _retry_or_bury(self, raw: str, status: str, delay: Optional[float] = None) -> None:
+        payload = json.loads(raw)
+        task = Task(**payload["task"])
+        attempt = payload["attempt"]
+        # attempt numbers runs from 1, and max_attempts counts the retries after the first
+        if attempt > task.retry.max_attempts:
+            payload.update(status=status, failed_at=time.time())
+            self.client.lpush(self.dead_key, json.dumps(payload))
+            return
+        payload.update(id=uuid.uuid4().hex, attempt=attempt + 1, enqueued_at=time.time())
+        if delay is None:
+            delay = task.retry.delay_for(attempt)
+        self.client.zadd(self.delayed_key, {json.dumps(payload): time.time() + delay})
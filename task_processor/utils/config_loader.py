@@ -1,30 +1,279 @@
+import hashlib
+import json
+import multiprocessing
 import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import yaml
+from loguru import logger
 
+from task_processor.core.dag import TaskGraph
 from task_processor.core.models import Task
 
+# Fields that describe what a task is, as opposed to the state of its runs
+_RUNTIME_FIELDS = {"last_run", "last_status", "attempts"}
+
+# The libyaml-backed loader is several times faster when PyYAML was built with it
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Cold loads with at least this many files to parse are spread over processes
+PARALLEL_PARSE_THRESHOLD = 16
+
+
+@dataclass
+class LoadStats:
+    """What the last load did and how long it took."""
+
+    files: int = 0
+    cached: int = 0
+    parsed: int = 0
+    tasks: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.tasks} tasks from {self.files} files in {self.elapsed * 1000:.0f} ms "
+            f"({self.cached} cached, {self.parsed} parsed)"
+        )
+
+
+def _file_digest(config_file: Path) -> str:
+    return hashlib.sha256(config_file.read_bytes()).hexdigest()
+
+
+def _parse_yaml(config_file: Path) -> Tuple[Any, str]:
+    """Parse a YAML file, returning its data and a digest of its content."""
+    content = config_file.read_bytes()
+    return yaml.load(content, Loader=SafeLoader), hashlib.sha256(content).hexdigest()
+
 
 class ConfigLoader:
-    """Load task configurations from YAML files."""
+    """Load task configurations from YAML files.
+
+    With a ``cache_path`` the validated tasks of every file are kept in a
+    pickle snapshot keyed by path, mtime, size and content hash. On a warm
+    start unchanged files skip YAML parsing and validation entirely, and
+    files touched without being changed are re-hashed but not re-parsed.
+    Entries of files deleted from the directory are dropped.
+    """
 
-    def __init__(self, config_dir: str):
+    def __init__(self, config_dir: str, cache_path: Optional[str] = None):
         """Initialize the config loader."""
         self.config_dir = Path(config_dir)
+        self.cache_path = Path(cache_path).expanduser() if cache_path else None
+        self.stats = LoadStats()
 
-    def load_configs(self) -> List[Task]:
-        """Load all task configurations from YAML files in the config directory."""
-        tasks = []
+    def config_files(self) -> List[Path]:
+        """YAML files in the config directory."""
         if not self.config_dir.exists():
             raise FileNotFoundError(f"Config directory not found: {self.config_dir}")
+        return sorted(self.config_dir.glob("*.yaml"))
+
+    def load_file(self, config_file: Path) -> List[Task]:
+        """Load the tasks defined in one YAML file."""
+        config_data, _ = _parse_yaml(config_file)
+        return _build_tasks(config_data)
+
+    def load_files(self, config_files: Sequence[Path]) -> Dict[Path, List[Task]]:
+        """Load several files, using and refreshing the cache when one is set."""
+        started = time.perf_counter()
+        cache = self._read_cache()
+        entries: Dict[str, Any] = cache.get("files", {})
+        loaded: Dict[Path, List[Task]] = {}
+        stale: Dict[Path, os.stat_result] = {}
+
+        touched = False
+        for config_file in config_files:
+            stat = os.stat(config_file)
+            entry = entries.get(str(config_file))
+            if entry and entry["size"] == stat.st_size:
+                if entry["mtime_ns"] != stat.st_mtime_ns:
+                    if entry["sha256"] != _file_digest(config_file):
+                        stale[config_file] = stat
+                        continue
+                    # Touched but not changed
+                    entry["mtime_ns"] = stat.st_mtime_ns
+                    touched = True
+                loaded[config_file] = entry["tasks"]
+            else:
+                stale[config_file] = stat
+
+        for config_file, (config_data, digest) in zip(stale, self._parse_all(list(stale))):
+            tasks = _build_tasks(config_data)
+            stat = stale[config_file]
+            entries[str(config_file)] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "tasks": tasks,
+            }
+            loaded[config_file] = tasks
+
+        listed = {str(config_file) for config_file in config_files}
+        deleted = [
+            path for path in entries if path not in listed and Path(path).parent == self.config_dir
+        ]
+        for path in deleted:
+            del entries[path]
+
+        if stale or touched or deleted:
+            self._write_cache(entries)
+        parsed = len(stale)
+        self.stats = LoadStats(
+            files=len(config_files),
+            cached=len(config_files) - parsed,
+            parsed=parsed,
+            tasks=sum(len(tasks) for tasks in loaded.values()),
+            elapsed=time.perf_counter() - started,
+        )
+        return {config_file: loaded[config_file] for config_file in config_files}
+
+    def load_configs(self) -> List[Task]:
+        """Load all task configurations from YAML files in the config directory.
+
+        Raises DependencyCycleError if task dependencies form a cycle.
+        """
+        tasks = []
+        for file_tasks in self.load_files(self.config_files()).values():
+            tasks.extend(file_tasks)
 
-        for config_file in self.config_dir.glob("*.yaml"):
-            with open(config_file, "r") as f:
-                config_data = yaml.safe_load(f)
-                if config_data and "tasks" in config_data:
-                    for task_data in config_data["tasks"]:
-                        tasks.append(Task(**task_data))
+        TaskGraph.from_tasks(tasks)
+        return tasks
+
+    def _parse_all(self, config_files: List[Path]) -> List[Tuple[Any, str]]:
+        if len(config_files) < PARALLEL_PARSE_THRESHOLD:
+            return [_parse_yaml(config_file) for config_file in config_files]
+        workers = min(os.cpu_count() or 1, len(config_files) // 4)
+        if workers < 2:
+            return [_parse_yaml(config_file) for config_file in config_files]
+        # Spawned rather than forked: by now the CLI runs logging, history and
+        # HTTP threads whose locks a forked child could inherit held
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return list(pool.map(_parse_yaml, config_files, chunksize=4))
+
+    def _read_cache(self) -> Dict[str, Any]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "rb") as f:
+                cache = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable config cache {self.cache_path}: {e}")
+            return {}
+        if not isinstance(cache, dict) or cache.get("schema") != _schema_digest():
+            return {}
+        return cache
+
+    def _write_cache(self, entries: Dict[str, Any]) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"schema": _schema_digest(), "files": entries}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+
+@dataclass
+class ConfigDiff:
+    """Changes between two loads of a config directory."""
+
+    added: List[Task] = field(default_factory=list)
+    updated: List[Task] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class ConfigWatcher:
+    """Detect changed config files and turn them into a task diff.
+
+    Each poll stats the files in the directory and re-parses only those whose
+    mtime, inode or size changed, so the cost of a reload follows the number
+    of changed files rather than the size of the directory.
+    """
+
+    def __init__(self, loader: ConfigLoader):
+        self.loader = loader
+        self._stamps: Dict[Path, Tuple[int, int, int]] = {}
+        self._tasks: Dict[Path, Dict[str, Task]] = {}
 
+    def load(self) -> List[Task]:
+        """Load every file and remember its state. Use this for the initial load."""
+        config_files = self.loader.config_files()
+        stamps = {config_file: _stamp(config_file) for config_file in config_files}
+        tasks = []
+        for config_file, file_tasks in self.loader.load_files(config_files).items():
+            self._stamps[config_file] = stamps[config_file]
+            self._tasks[config_file] = {task.name: task for task in file_tasks}
+            tasks.extend(file_tasks)
+        TaskGraph.from_tasks(tasks)
         return tasks
+
+    def poll(self) -> ConfigDiff:
+        """Re-parse files changed since the last call and return the task diff."""
+        diff = ConfigDiff()
+        seen = set()
+        for config_file in self.loader.config_files():
+            seen.add(config_file)
+            try:
+                stamp = _stamp(config_file)
+            except FileNotFoundError:
+                continue
+            if self._stamps.get(config_file) == stamp:
+                continue
+            try:
+                new_tasks = {task.name: task for task in self.loader.load_file(config_file)}
+            except Exception as e:
+                # Keep running the last good definitions until the file is fixed
+                logger.error(f"Failed to reload {config_file}: {e}")
+                continue
+            self._stamps[config_file] = stamp
+            self._diff_file(self._tasks.get(config_file, {}), new_tasks, diff)
+            self._tasks[config_file] = new_tasks
+
+        for config_file in set(self._stamps) - seen:
+            self._diff_file(self._tasks.pop(config_file), {}, diff)
+            del self._stamps[config_file]
+        return diff
+
+    @staticmethod
+    def _diff_file(old: Dict[str, Task], new: Dict[str, Task], diff: ConfigDiff) -> None:
+        for name, task in new.items():
+            if name not in old:
+                diff.added.append(task)
+            elif task.model_dump(exclude=_RUNTIME_FIELDS) != old[name].model_dump(
+                exclude=_RUNTIME_FIELDS
+            ):
+                diff.updated.append(task)
+        diff.removed.extend(name for name in old if name not in new)
+
+
+def _build_tasks(config_data: Any) -> List[Task]:
+    if not config_data or "tasks" not in config_data:
+        return []
+    return [Task(**task_data) for task_data in config_data["tasks"]]
+
+
+_SCHEMA_DIGEST: Optional[str] = None
+
+
+def _schema_digest() -> str:
+    """Digest of the Task schema, so cached tasks are dropped when the model changes."""
+    global _SCHEMA_DIGEST
+    if _SCHEMA_DIGEST is None:
+        schema = json.dumps(Task.model_json_schema(), sort_keys=True)
+        _SCHEMA_DIGEST = hashlib.sha256(schema.encode()).hexdigest()
+    return _SCHEMA_DIGEST
+
+
+def _stamp(path: Path) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
@@ -1,13 +1,23 @@
+import gzip
+import itertools
 import os
+import queue
+import re
+import shutil
 import sys
+import threading
 import time
+import zipfile
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, TextIO, Tuple
 
 from loguru import logger
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+BACKPRESSURE_POLICIES = ("block", "drop_debug", "sample")
 
 
 class LogConfig(BaseModel):
@@ -18,29 +28,286 @@ class LogConfig(BaseModel):
     rotation: str = Field(default="1 day")
     retention: str = Field(default="1 week")
     compression: str = Field(default="zip")
+    max_open_files: int = Field(default=128, ge=1)
+    batch_writes: bool = Field(default=False)
+    queue_size: int = Field(default=10000, ge=1)
+    batch_size: int = Field(default=256, ge=1)
+    flush_interval: float = Field(default=0.5, gt=0)
+    backpressure: str = Field(default="block")
+    sample_rate: float = Field(default=0.1, gt=0, le=1)
     format: str = Field(
         default="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
     )
 
+    @field_validator("backpressure")
+    @classmethod
+    def validate_backpressure(cls, v):
+        if v not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {', '.join(BACKPRESSURE_POLICIES)}")
+        return v
+
+
+TASK_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+
+_SIZE_UNITS = {"b": 1, "kb": 1000, "mb": 1000**2, "gb": 1000**3}
+_TIME_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+
+
+def parse_rotation(rotation: str) -> Tuple[Optional[int], Optional[float]]:
+    """Parse a rotation or retention spec such as ``"1 day"`` or ``"500 MB"``.
+
+    Returns ``(max_bytes, max_seconds)``; unrecognised specs disable rotation.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]+?)s?\s*", rotation or "")
+    if not match:
+        return None, None
+    value, unit = float(match.group(1)), match.group(2).lower()
+    if unit in _SIZE_UNITS:
+        return int(value * _SIZE_UNITS[unit]), None
+    if unit in _TIME_UNITS:
+        return None, value * _TIME_UNITS[unit]
+    return None, None
+
+
+def _compress(path: Path, compression: str) -> Path:
+    """Compress a log file next to itself and remove the original."""
+    if compression == "gz":
+        target = path.with_name(path.name + ".gz")
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        target = path.with_name(path.name + ".zip")
+        with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(path, arcname=path.name)
+    path.unlink()
+    return target
+
+
+def _session_log_file(log_dir: Path, task_name: str) -> Path:
+    return log_dir / f"{task_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.log"
+
+
+class TaskLogRouter:
+    """Single loguru sink that writes each record to its task's log file.
+
+    Records carry the task name in ``extra["task_name"]``; the destination is
+    found with a dict lookup, so the cost per record does not depend on how
+    many tasks are registered. At most ``max_open_files`` handles are kept
+    open, least recently used first out.
+    """
+
+    def __init__(self, max_open_files: int = 128, rotation: str = ""):
+        self.max_open_files = max_open_files
+        self.max_bytes, self.max_age = parse_rotation(rotation)
+        self._dirs: Dict[str, Path] = {}
+        self._paths: Dict[str, Path] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._written: Dict[str, int] = {}
+        self._handles: "OrderedDict[str, TextIO]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, task_name: str, log_dir: Path) -> Path:
+        """Start a new log file for a task in ``log_dir`` and return its path."""
+        with self._lock:
+            self._close(task_name)
+            self._dirs[task_name] = log_dir
+            self._paths[task_name] = path = _session_log_file(log_dir, task_name)
+            path.touch()
+            self._opened_at[task_name] = time.time()
+            self._written[task_name] = 0
+            return path
+
+    def path(self, task_name: str) -> Optional[Path]:
+        """Current log file of a task."""
+        return self._paths.get(task_name)
+
+    def write(self, message) -> None:
+        """Loguru sink entry point."""
+        task_name = message.record["extra"].get("task_name")
+        with self._lock:
+            if task_name in self._paths:
+                self._append(task_name, message).flush()
+
+    def write_batch(self, records: List[Tuple[str, str]]) -> None:
+        """Write ``(task_name, text)`` records, with one write and flush per file."""
+        grouped: Dict[str, List[str]] = {}
+        for task_name, text in records:
+            grouped.setdefault(task_name, []).append(text)
+        with self._lock:
+            for task_name, texts in grouped.items():
+                if task_name in self._paths:
+                    self._append(task_name, "".join(texts)).flush()
+
+    def close(self) -> None:
+        """Close every open file handle."""
+        with self._lock:
+            for task_name in list(self._handles):
+                self._close(task_name)
+
+    @property
+    def open_files(self) -> int:
+        return len(self._handles)
+
+    def _append(self, task_name: str, text: str) -> TextIO:
+        if self._should_rotate(task_name):
+            self._close(task_name)
+            self._paths[task_name] = _session_log_file(self._dirs[task_name], task_name)
+            self._opened_at[task_name] = time.time()
+            self._written[task_name] = 0
+        handle = self._handle(task_name)
+        handle.write(text)
+        self._written[task_name] += len(text)
+        return handle
+
+    def _should_rotate(self, task_name: str) -> bool:
+        if self.max_bytes is not None and self._written[task_name] >= self.max_bytes:
+            return True
+        if self.max_age is not None:
+            return time.time() - self._opened_at[task_name] >= self.max_age
+        return False
+
+    def _handle(self, task_name: str) -> TextIO:
+        handle = self._handles.get(task_name)
+        if handle is not None:
+            self._handles.move_to_end(task_name)
+            return handle
+        while len(self._handles) >= self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        handle = open(self._paths[task_name], "a", encoding="utf-8")
+        self._handles[task_name] = handle
+        return handle
+
+    def _close(self, task_name: str) -> None:
+        handle = self._handles.pop(task_name, None)
+        if handle is not None:
+            handle.close()
+
+
+class BatchingLogWriter:
+    """Background stage between loguru and the router that writes in batches.
+
+    Records are queued by the logging thread and written by a writer thread,
+    ``batch_size`` at a time or every ``flush_interval`` seconds, whichever
+    comes first. When the bounded queue is full the ``policy`` decides:
+
+    - ``block``: the logging thread waits for room.
+    - ``drop_debug``: DEBUG and TRACE records are dropped, others wait.
+    - ``sample``: only a ``sample_rate`` fraction of records is kept (and waits).
+    """
+
+    def __init__(
+        self,
+        router: TaskLogRouter,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        policy: str = "block",
+        sample_rate: float = 0.1,
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(BACKPRESSURE_POLICIES)}")
+        self.router = router
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.sample_every = max(1, round(1 / sample_rate))
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=queue_size)
+        self._overflow = itertools.count()
+        self._thread = threading.Thread(target=self._run, name="task-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message) -> None:
+        """Loguru sink entry point."""
+        record = message.record
+        item = (record["extra"].get("task_name"), str(message))
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        if self.policy == "drop_debug" and record["level"].no < 20:
+            self.dropped += 1
+            return
+        if self.policy == "sample" and next(self._overflow) % self.sample_every:
+            self.dropped += 1
+            return
+        self._queue.put(item)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring the writer."""
+        return {
+            "queue_depth": self.queue_depth,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+        }
+
+    def flush(self) -> None:
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Tuple[str, str]] = []
+            deadline = None
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch:
+                try:
+                    self.router.write_batch(batch)
+                finally:
+                    self.written += len(batch)
+                    self.batches += 1
+                    for _ in batch:
+                        self._queue.task_done()
+            if stopping:
+                return
+
 
 class TaskLogger:
     """Manages logging for a specific task"""
 
-    def __init__(self, task_name: str, log_dir: Path, config: LogConfig):
+    def __init__(self, task_name: str, log_dir: Path, config: LogConfig, router: TaskLogRouter):
         self.task_name = task_name
         self.log_dir = log_dir / task_name
         self.config = config
+        self.router = router
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
-        # Configure task-specific logger
-        self.logger = logger.bind(task=task_name)
-        log_file = self.log_dir / f"{task_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        self.logger.add(
-            str(log_file),
-            rotation=config.rotation,
-            retention=config.retention,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-        )
+        # Records are routed to the task's file by the manager's shared sink
+        self.logger = logger.bind(task_name=task_name)
+        router.register(task_name, self.log_dir)
+
+    @property
+    def log_file(self) -> Path:
+        """File this task is currently logging to."""
+        return self.router.path(self.task_name)
 
     def info(self, message: str):
         """Log an info message."""
@@ -50,6 +317,10 @@ class TaskLogger:
         """Log a debug message."""
         self.logger.debug(message)
 
+    def warning(self, message: str):
+        """Log a warning message."""
+        self.logger.warning(message)
+
     def error(self, message: str):
         """Log an error message."""
         self.logger.error(message)
@@ -63,11 +334,43 @@ class TaskLogger:
     def log_error(self, error: str):
         self.logger.error(f"Task failed: {error}")
 
-    def cleanup_old_logs(self):
-        """Remove old log files if we exceed max_files"""
-        log_files = sorted(self.log_dir.glob("*.log"), key=os.path.getctime, reverse=True)
-        for log_file in log_files[self.config.max_files :]:
-            log_file.unlink()
+    def archived_logs(self) -> List[Path]:
+        """This task's log files other than the current one, newest first.
+
+        File names embed their creation time, so sorting by name orders them
+        by age without a stat call per file.
+        """
+        current = self.log_file
+        files = [path for path in self.log_dir.iterdir() if path != current]
+        files.sort(key=lambda path: path.name, reverse=True)
+        return files
+
+    def cleanup_old_logs(self, max_age: Optional[float] = None) -> int:
+        """Remove log files beyond max_files, and those older than ``max_age`` seconds"""
+        cutoff = None if max_age is None else time.time() - max_age
+        removed = 0
+        # The current file counts towards max_files
+        for index, log_file in enumerate(self.archived_logs(), start=1):
+            if index >= self.config.max_files or (
+                cutoff is not None and log_file.stat().st_mtime < cutoff
+            ):
+                log_file.unlink()
+                removed += 1
+        return removed
+
+    def compress_old_logs(self, limit: Optional[int] = None) -> int:
+        """Compress up to ``limit`` archived log files using the configured compression."""
+        if self.config.compression not in ("gz", "zip"):
+            return 0
+        compressed = 0
+        for log_file in self.archived_logs():
+            if limit is not None and compressed >= limit:
+                break
+            if log_file.suffix != ".log":
+                continue
+            _compress(log_file, self.config.compression)
+            compressed += 1
+        return compressed
 
 
 class LogManager:
@@ -78,6 +381,17 @@ class LogManager:
         self.log_dir = Path(config.log_dir).expanduser()
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.task_loggers: Dict[str, TaskLogger] = {}
+        self.router = TaskLogRouter(config.max_open_files, config.rotation)
+        self.writer: Optional[BatchingLogWriter] = None
+        if config.batch_writes:
+            self.writer = BatchingLogWriter(
+                self.router,
+                queue_size=config.queue_size,
+                batch_size=config.batch_size,
+                flush_interval=config.flush_interval,
+                policy=config.backpressure,
+                sample_rate=config.sample_rate,
+            )
         self._setup_logging()
 
     def _setup_logging(self):
@@ -99,45 +413,54 @@ class LogManager:
             compression=self.config.compression,
         )
 
+        # One sink routes every task's records to that task's file
+        logger.add(
+            self.writer.write if self.writer else self.router.write,
+            format=TASK_LOG_FORMAT,
+            level="DEBUG",
+            filter=lambda record: "task_name" in record["extra"],
+        )
+
     def get_log_file(self, task_name: str) -> Path:
         """Get the log file path for a specific task."""
-        return self.log_dir / f"{task_name}.log"
+        return self.get_logger(task_name).log_file
 
     def setup_task_logging(self, task_name: str):
         """Set up logging for a specific task."""
-        log_file = self.get_log_file(task_name)
-        logger.add(
-            str(log_file),
-            format=self.config.format,
-            level="DEBUG",
-            rotation=self.config.rotation,
-            retention=self.config.retention,
-            compression=self.config.compression,
-            filter=lambda record: record["extra"].get("task_name") == task_name,
-        )
+        self.get_logger(task_name)
 
     def get_logger(self, task_name: str) -> TaskLogger:
         """Get or create a logger for a task"""
-        if task_name not in self.task_loggers:
-            log_file = self.get_log_file(task_name)
-            logger.add(
-                str(log_file),
-                format=self.config.format,
-                level="DEBUG",
-                rotation=self.config.rotation,
-                retention=self.config.retention,
-                compression=self.config.compression,
-                filter=lambda record: record["extra"].get("task_name") == task_name,
-            )
-            self.task_loggers[task_name] = TaskLogger(task_name, self.log_dir, self.config)
-        return self.task_loggers[task_name]
+        task_logger = self.task_loggers.get(task_name)
+        if task_logger is None:
+            task_logger = TaskLogger(task_name, self.log_dir, self.config, self.router)
+            self.task_loggers[task_name] = task_logger
+        return task_logger
 
-    def cleanup_all_logs(self):
+    def flush(self):
+        """Write out any task log records still queued."""
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """Flush queued records and close task log files."""
+        if self.writer:
+            self.writer.close()
+        self.router.close()
+
+    def cleanup_all_logs(self, max_age: Optional[float] = None) -> int:
         """Cleanup logs for all tasks"""
-        for logger in self.task_loggers.values():
-            logger.cleanup_old_logs()
+        return sum(
+            task_logger.cleanup_old_logs(max_age)
+            for task_logger in list(self.task_loggers.values())
+        )
 
-    def rotate_all_logs(self):
-        """Rotate logs for all tasks"""
-        for logger in self.task_loggers.values():
-            logger.log_dir.glob("*.log")
+    def rotate_all_logs(self, limit: Optional[int] = None) -> int:
+        """Compress archived logs for all tasks, at most ``limit`` files in total"""
+        compressed = 0
+        for task_logger in list(self.task_loggers.values()):
+            remaining = None if limit is None else limit - compressed
+            if remaining is not None and remaining <= 0:
+                break
+            compressed += task_logger.compress_old_logs(remaining)
+        return compressed
@@ -0,0 +1,147 @@
+"""
+In-memory stand-ins for external services used by plugin tests and benchmarks
+"""
+
+import threading
+import time
+from typing import Dict, List
+
+
+class FakeRedis:
+    """Thread-safe in-memory subset of the redis-py client (decode_responses=True).
+
+    Implements the list and sorted-set commands the queue plugin uses, with
+    blocking moves and MULTI-style pipelines.
+    """
+
+    def __init__(self):
+        self._lists: Dict[str, List[str]] = {}
+        self._zsets: Dict[str, Dict[str, float]] = {}
+        self._changed = threading.Condition()
+        self.commands = 0
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def lpush(self, name: str, *values: str) -> int:
+        with self._changed:
+            self.commands += 1
+            items = self._lists.setdefault(name, [])
+            items[:0] = reversed(values)
+            self._changed.notify_all()
+            return len(items)
+
+    def blmove(self, first_list, second_list, timeout, src="LEFT", dest="RIGHT"):
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            self.commands += 1
+            while not self._lists.get(first_list):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+            source = self._lists[first_list]
+            value = source.pop() if src == "RIGHT" else source.pop(0)
+            target = self._lists.setdefault(second_list, [])
+            if dest == "LEFT":
+                target.insert(0, value)
+            else:
+                target.append(value)
+            return value
+
+    def lrem(self, name: str, count: int, value: str) -> int:
+        with self._changed:
+            self.commands += 1
+            items = self._lists.get(name, [])
+            if value in items:
+                items.remove(value)
+                return 1
+            return 0
+
+    def lrange(self, name: str, start: int, end: int) -> List[str]:
+        with self._changed:
+            self.commands += 1
+            items = self._lists.get(name, [])
+            return list(items[start : None if end == -1 else end + 1])
+
+    def llen(self, name: str) -> int:
+        with self._changed:
+            self.commands += 1
+            return len(self._lists.get(name, []))
+
+    def zadd(
+        self,
+        name: str,
+        mapping: Dict[str, float],
+        nx: bool = False,
+        xx: bool = False,
+        ch: bool = False,
+    ) -> int:
+        with self._changed:
+            self.commands += 1
+            zset = self._zsets.setdefault(name, {})
+            added = changed = 0
+            for member, score in mapping.items():
+                if (nx and member in zset) or (xx and member not in zset):
+                    continue
+                added += member not in zset
+                changed += zset.get(member) != score
+                zset[member] = score
+            return changed if ch else added
+
+    def zrem(self, name: str, *values: str) -> int:
+        with self._changed:
+            self.commands += 1
+            zset = self._zsets.get(name, {})
+            return sum(zset.pop(value, None) is not None for value in values)
+
+    def zscore(self, name: str, value: str):
+        with self._changed:
+            self.commands += 1
+            return self._zsets.get(name, {}).get(value)
+
+    def zcard(self, name: str) -> int:
+        with self._changed:
+            self.commands += 1
+            return len(self._zsets.get(name, {}))
+
+    def zrangebyscore(self, name, min, max, start=None, num=None) -> List[str]:
+        low, high = float(min), float(max)
+        with self._changed:
+            self.commands += 1
+            members = sorted(
+                (score, member)
+                for member, score in self._zsets.get(name, {}).items()
+                if low <= score <= high
+            )
+            members = [member for _, member in members]
+            if start is not None:
+                members = members[start : start + num]
+            return members
+
+
+class FakePipeline:
+    """Queues commands and runs them together on execute(), like MULTI/EXEC."""
+
+    def __init__(self, client: FakeRedis):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        # The condition is re-entrant, so the whole batch runs without interleaving
+        with self._client._changed:
+            return [getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in calls]
@@ -0,0 +1,418 @@
+import asyncio
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from task_processor import LogConfig, LogManager, Task, TaskExecutor, TaskScheduler
+from task_processor.core.executor import AsyncTaskExecutor
+from task_processor.core.history import RunHistory
+from task_processor.plugins.redis.plugin import RedisConfig, RedisQueuePlugin
+from tests.fakes import FakeRedis
+
+
+@pytest.fixture
+def queue():
+    config = RedisConfig(name="redis", queue="test", batch_size=3, visibility_timeout=30)
+    plugin = RedisQueuePlugin(config, client=FakeRedis())
+    plugin.initialize()
+    yield plugin
+    plugin.cleanup()
+
+
+def _task(name, command="true", max_attempts=1, delay=1):
+    return Task(
+        name=name,
+        command=command,
+        schedule={"type": "recurring", "interval": "1m"},
+        retry={"max_attempts": max_attempts, "delay": delay},
+    )
+
+
+def test_batched_enqueue(queue):
+    for i in range(7):
+        queue.enqueue(_task(f"job_{i}"))
+    # Two full batches have been sent; the last job waits for a flush
+    assert queue.stats()["ready"] == 6
+    assert queue.flush() == 1
+    assert queue.enqueue_many(_task(f"bulk_{i}") for i in range(5)) == 5
+    assert queue.stats()["ready"] == 12
+
+    job = queue.pop()
+    assert job.task.name == "job_0" and job.attempt == 1
+    assert queue.stats()["processing"] == 1
+    queue.ack(job)
+    assert queue.stats()["processing"] == 0
+
+
+def test_retries_and_dead_letters(queue):
+    queue.enqueue_many([_task("flaky", command="exit 1", max_attempts=1, delay=1)])
+    executor = TaskExecutor(LogManager(LogConfig()))
+    assert queue.consume(executor, max_jobs=1) == 1
+    assert queue.stats() == {"ready": 0, "processing": 0, "delayed": 1, "dead": 0}
+
+    # Not due yet, then due once the retry delay has passed
+    assert queue.promote_delayed() == 0
+    time.sleep(1.1)
+    assert queue.promote_delayed() == 1
+    job = queue.pop()
+    assert job.attempt == 2
+    queue.fail(job)
+    assert queue.stats() == {"ready": 0, "processing": 0, "delayed": 0, "dead": 1}
+    (dead,) = queue.dead_letters()
+    assert dead["task"]["name"] == "flaky" and dead["status"] == "failed"
+
+
+def test_visibility_timeout_redelivers(queue):
+    queue.enqueue_many([_task("slow", max_attempts=3)])
+    job = queue.pop()
+    assert queue.requeue_expired() == 0
+    # The worker went away and its deadline passed
+    queue.client.zadd(queue.deadlines_key, {job.raw: time.time() - 1})
+    assert queue.requeue_expired() == 1
+    assert queue.promote_delayed() == 1
+    redelivered = queue.pop()
+    assert redelivered.task.name == "slow" and redelivered.attempt == 2
+    # The original worker's late failure report does not requeue it twice
+    queue.fail(job)
+    assert queue.stats()["delayed"] == 0
+
+
+def test_running_jobs_stay_invisible():
+    config = RedisConfig(name="redis", queue="test", visibility_timeout=1)
+    queue = RedisQueuePlugin(config, client=FakeRedis())
+    queue.initialize()
+    queue.enqueue_many([_task("long", command="sleep 2")])
+    executor = TaskExecutor(LogManager(LogConfig()))
+    worker = threading.Thread(target=queue.consume, args=(executor,), kwargs={"max_jobs": 1})
+    worker.start()
+    # Well past the visibility timeout, but the worker keeps extending it
+    time.sleep(1.5)
+    assert queue.requeue_expired() == 0
+    worker.join()
+    assert queue.stats() == {"ready": 0, "processing": 0, "delayed": 0, "dead": 0}
+    queue.cleanup()
+
+
+def test_scheduler_produces_and_workers_consume(queue, tmp_path):
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    queue.attach(scheduler)
+    for i in range(4):
+        scheduler.add_task(_task(f"job_{i}"))
+        scheduler._fire(f"job_{i}", time.time())
+    queue.flush()
+    assert queue.stats()["ready"] == 4
+    # Successes on the workers could never release a dependent task
+    dependent = _task("report").model_copy(update={"dependencies": ["job_0"]})
+    with pytest.raises(ValueError):
+        scheduler.add_task(dependent)
+
+    stop = threading.Event()
+    executor = TaskExecutor(LogManager(LogConfig()))
+    history = RunHistory(str(tmp_path / "history.db"))
+    workers = [
+        threading.Thread(target=queue.consume, args=(executor, stop), kwargs={"history": history})
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    deadline = time.monotonic() + 10
+    while queue.stats() != {"ready": 0, "processing": 0, "delayed": 0, "dead": 0}:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    assert history.count() == 4
+    history.close()
+    scheduler.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.ports.add(self.client_address[1])
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+        code = 500 if self.path.startswith("/fail") else 200
+        body = b"down" if code == 500 else b"ok"
+        with server.lock:
+            server.active -= 1
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.lock = threading.Lock()
+    server.ports, server.active, server.peak = set(), 0, 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http_client():
+    pytest.importorskip("aiohttp")
+    from task_processor.plugins.http.plugin import HttpConfig, HttpPlugin
+
+    plugin = HttpPlugin(HttpConfig(name="http", max_connections_per_host=2, max_in_flight=3))
+    plugin.initialize()
+    yield plugin
+    plugin.cleanup()
+
+
+def _http_task(name, url, **kwargs):
+    return Task(
+        name=name,
+        http={"url": url},
+        schedule={"type": "recurring", "interval": "1m"},
+        retry={"max_attempts": 2, "delay": 1},
+        **kwargs,
+    )
+
+
+def test_http_tasks_reuse_pooled_connections(http_server, http_client):
+    server, base = http_server
+    executor = TaskExecutor(LogManager(LogConfig()), http_client=http_client)
+    for i in range(20):
+        result = executor.execute_task(_http_task("ping", f"{base}/ok?i={i}"))
+        assert result.succeeded and result.exit_code == 200 and result.output_size == 2
+    # Keep-alive: every request went over the same connection
+    assert len(server.ports) == 1
+
+    failed = executor.execute_task(_http_task("down", f"{base}/fail"))
+    assert failed.status == "failed" and failed.exit_code == 500
+    timed_out = executor.execute_task(_http_task("slow", f"{base}/slow", timeout=0.05))
+    assert timed_out.status == "timeout"
+    assert http_client.stats() == {"requests": 22, "in_flight": 0}
+
+
+def test_http_concurrency_is_capped(http_server, http_client):
+    server, base = http_server
+    executor = AsyncTaskExecutor(LogManager(LogConfig()), http_client=http_client)
+
+    async def run_all():
+        tasks = [_http_task(f"slow_{i}", f"{base}/slow") for i in range(9)]
+        return await asyncio.gather(*(executor.execute_task(task) for task in tasks))
+
+    results = asyncio.run(run_all())
+    assert all(result.succeeded for result in results)
+    # Requests wait for one of the two connections allowed per host
+    assert server.peak <= 2 and len(server.ports) <= 2
+
+
+def test_http_task_without_client_fails():
+    executor = TaskExecutor(LogManager(LogConfig()))
+    result = executor.execute_task(_http_task("ping", "http://127.0.0.1:1/"))
+    assert result.status == "failed"
+    with pytest.raises(ValueError):
+        Task(
+            name="both",
+            command="true",
+            http={"url": "http://example.com"},
+            schedule={"type": "recurring", "interval": "1m"},
+            retry={"max_attempts": 1, "delay": 1},
+        )
+
+
+@pytest.fixture
+def postgres():
+    pytest.importorskip("psycopg")
+    from psycopg.conninfo import conninfo_to_dict
+
+    from task_processor.plugins.postgres.plugin import PostgresConfig, PostgresPlugin
+
+    dsn = os.environ.get("TASKOPS_TEST_POSTGRES")
+    if not dsn:
+        pytest.skip("set TASKOPS_TEST_POSTGRES to a libpq connection string")
+    params = conninfo_to_dict(dsn)
+    config = PostgresConfig(
+        name="postgres",
+        host=params.get("host", "localhost"),
+        port=int(params.get("port", 5432)),
+        user=params.get("user", "postgres"),
+        password=params.get("password", ""),
+        database=params.get("dbname", "postgres"),
+        fetch_size=100,
+    )
+    plugin = PostgresPlugin(config)
+    plugin.initialize()
+    plugin.execute_command("DROP TABLE IF EXISTS taskops_events")
+    plugin.execute_command("CREATE TABLE taskops_events (id integer, name text)")
+    yield plugin
+    plugin.execute_command("DROP TABLE taskops_events")
+    plugin.cleanup()
+
+
+def test_postgres_copy_round_trip(postgres):
+    rows = ((i, f"event {i}") for i in range(10000))
+    assert postgres.copy_rows("taskops_events", rows, columns=["id", "name"]) == 10000
+
+    exported = io.BytesIO()
+    assert postgres.copy_to("taskops_events", exported, header=True) > 0
+    assert postgres.execute_command("DELETE FROM taskops_events") == 10000
+    exported.seek(0)
+    assert postgres.copy_from("taskops_events", exported, header=True) == 10000
+
+    query = io.BytesIO()
+    postgres.copy_to("SELECT name FROM taskops_events WHERE id < 2 ORDER BY id", query)
+    assert query.getvalue() == b"event 0\nevent 1\n"
+
+
+def test_postgres_copy_to_tells_queries_from_tables():
+    from task_processor.plugins.postgres.plugin import _QUERY
+
+    assert _QUERY.match("  select 1")
+    assert _QUERY.match("WITH recent AS (SELECT 1) SELECT * FROM recent")
+    assert _QUERY.match("VALUES (1), (2)")
+    for table in ("selected_users", "with_tax", "public.values_daily"):
+        assert not _QUERY.match(table)
+
+
+def test_postgres_stream_query(postgres):
+    postgres.copy_rows("taskops_events", ((i, "x") for i in range(1000)))
+    rows = postgres.stream_query("SELECT id FROM taskops_events ORDER BY id")
+    assert next(rows) == {"id": 0}
+    # The remaining rows arrive in batches of fetch_size from the named cursor
+    assert sum(1 for _ in rows) == 999
+    inserted = postgres.execute_many(
+        "INSERT INTO taskops_events (id, name) VALUES (%s, %s)", [(1, "a"), (2, "b")]
+    )
+    assert inserted == 2
+
+
+def test_postgres_initialize_fails_without_server():
+    pytest.importorskip("psycopg")
+    from task_processor.plugins.postgres.plugin import PostgresConfig, PostgresPlugin
+
+    config = PostgresConfig(
+        name="postgres",
+        host="127.0.0.1",
+        port=1,
+        user="taskops",
+        password="secret",
+        database="taskops",
+        pool_timeout=0.5,
+    )
+    plugin = PostgresPlugin(config)
+    with pytest.raises(RuntimeError):
+        plugin.initialize()
+    assert not plugin.is_initialized
+
+
+class _ExhaustedPool:
+    """Connector pool stand-in that is exhausted for its first ``busy`` requests."""
+
+    pool_size = 1
+
+    def __init__(self, busy):
+        import queue
+
+        self.busy = busy
+        self._cnx_queue = queue.Queue()
+
+    def get_connection(self):
+        from mysql.connector.errors import PoolError
+
+        if self.busy:
+            self.busy -= 1
+            raise PoolError("Failed getting connection; pool exhausted")
+        return object()
+
+
+def _mysql_config(**kwargs):
+    from task_processor.plugins.mysql.plugin import MySQLConfig
+
+    return MySQLConfig(
+        name="mysql",
+        host="127.0.0.1",
+        user="taskops",
+        password="secret",
+        database="taskops",
+        **kwargs,
+    )
+
+
+def test_mysql_pool_waits_for_a_connection():
+    pytest.importorskip("mysql.connector")
+    from mysql.connector.errors import PoolError
+
+    from task_processor.plugins.mysql.plugin import MySQLPlugin
+
+    plugin = MySQLPlugin(_mysql_config(pool_timeout=1))
+    plugin._pool, plugin._initialized = _ExhaustedPool(busy=3), True
+    assert plugin.get_connection() is not None
+    stats = plugin.pool_stats()
+    assert stats["acquired"] == 1 and stats["in_use"] == 1 and stats["wait_max"] > 0
+
+    plugin = MySQLPlugin(_mysql_config(pool_timeout=0.05))
+    plugin._pool, plugin._initialized = _ExhaustedPool(busy=10**6), True
+    with pytest.raises(PoolError):
+        plugin.get_connection()
+    assert plugin.pool_stats()["timeouts"] == 1
+
+
+@pytest.fixture
+def mysql():
+    pytest.importorskip("mysql.connector")
+    from urllib.parse import urlsplit
+
+    from task_processor.plugins.mysql.plugin import MySQLConfig, MySQLPlugin
+
+    url = os.environ.get("TASKOPS_TEST_MYSQL")
+    if not url:
+        pytest.skip("set TASKOPS_TEST_MYSQL to user:password@host:port/database")
+    parts = urlsplit(f"mysql://{url}")
+    config = MySQLConfig(
+        name="mysql",
+        host=parts.hostname,
+        port=parts.port or 3306,
+        user=parts.username,
+        password=parts.password or "",
+        database=parts.path.lstrip("/"),
+        fetch_size=100,
+        chunk_size=250,
+        allow_local_infile=True,
+    )
+    plugin = MySQLPlugin(config)
+    plugin.initialize()
+    plugin.execute_command("DROP TABLE IF EXISTS taskops_events")
+    plugin.execute_command("CREATE TABLE taskops_events (id INT, name VARCHAR(64))")
+    yield plugin
+    plugin.execute_command("DROP TABLE taskops_events")
+    plugin.cleanup()
+
+
+def test_mysql_chunked_writes_and_streaming_reads(mysql, tmp_path):
+    rows = ((i, f"event {i}") for i in range(1000))
+    insert = "INSERT INTO taskops_events (id, name) VALUES (%s, %s)"
+    assert mysql.execute_many(insert, rows) == 1000
+
+    streamed = mysql.stream_query("SELECT id FROM taskops_events ORDER BY id")
+    assert next(streamed) == {"id": 0}
+    # Closing early drains the unbuffered result so the connection is reusable
+    streamed.close()
+    assert sum(1 for _ in mysql.stream_query("SELECT id FROM taskops_events")) == 1000
+
+    data = tmp_path / "events.csv"
+    data.write_text("id,name\n" + "".join(f'{i},"loaded {i}"\n' for i in range(500)))
+    assert mysql.load_file("taskops_events", str(data), ignore_lines=1) == 500
+    assert mysql.execute_query("SELECT COUNT(*) AS n FROM taskops_events") == [{"n": 1500}]
+    assert mysql.pool_stats()["in_use"] == 0
@@ -1,5 +1,10 @@
+import multiprocessing
 import os
+import subprocess
+import sys
+import threading
 import time
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -15,6 +20,20 @@ from task_processor import (
     TaskExecutor,
     TaskScheduler,
 )
+from task_processor.core.cache import ResultCache
+from task_processor.core.coordination import LeaseCoordinator, aligned_fire_time
+from task_processor.core.cron import CronSchedule
+from task_processor.core.dag import DependencyCycleError, TaskGraph
+from task_processor.core.executor import AsyncTaskExecutor, RunResult
+from task_processor.core.history import RunHistory
+from task_processor.core.pool import WorkerPool
+from task_processor.core.priority import ReadyQueue
+from task_processor.core.retention import Compactor, RetentionPolicy
+from task_processor.core.scheduler import TimerQueue
+from task_processor.core.smoothing import DispatchHistogram, spread_offset
+from task_processor.core.workers import PythonWorkerPool
+from task_processor.utils.config_loader import ConfigWatcher
+from task_processor.utils.logging import BatchingLogWriter, parse_rotation
 
 
 @pytest.fixture
@@ -134,3 +153,1154 @@ def test_schedule_types():
     )
     assert one_time_task.schedule.type == "one-time"
     assert isinstance(one_time_task.schedule.start_time, datetime)
+
+
+def test_worker_pool_limits(sample_task_config):
+    pool = WorkerPool(max_workers=2)
+    task = Task(**sample_task_config)
+    release = threading.Event()
+
+    first = pool.submit(task, lambda t: release.wait(5))
+    assert first is not None
+    # A second run of the same task is refused while the first is in flight
+    assert pool.submit(task, lambda t: None) is None
+
+    # Other tasks are not blocked by the slow one
+    other = Task(**{**sample_task_config, "name": "other_task"})
+    started = time.monotonic()
+    pool.submit(other, lambda t: None).result(timeout=5)
+    assert time.monotonic() - started < 1
+
+    release.set()
+    first.result(timeout=5)
+    assert pool.running(task.name) == 0
+    pool.shutdown()
+
+
+def test_ready_queue_weighted_fair_with_aging():
+    now = [0.0]
+    queue = ReadyQueue(max_size=100, aging=30, clock=lambda: now[0])
+    for i in range(26):
+        for priority in ("high", "normal", "low"):
+            queue.put((priority, i), priority)
+    # With every class backlogged, slots are shared 8:4:1
+    served = [queue.pop()[0] for _ in range(26)]
+    assert [served.count(p) for p in ("high", "normal", "low")] == [16, 8, 2]
+    # Once the oldest low-priority run has waited past the aging limit it goes first
+    now[0] = 30
+    queue.put(("high", 99), "high")
+    assert queue.pop() == ("low", 2)
+
+    # A full queue makes room by dropping the newest lowest-priority run
+    full = ReadyQueue(max_size=2, clock=lambda: now[0])
+    assert full.put("report", "low") is None
+    assert full.put("digest", "normal") is None
+    assert full.put("alert", "high") == "report"
+    assert full.put("cleanup", "low") == "cleanup"
+    assert [full.pop(), full.pop(), full.pop()] == ["alert", "digest", None]
+    stats = full.stats()
+    assert stats["low"]["rejected"] == 2 and stats["high"]["served"] == 1
+
+
+def test_worker_pool_serves_priority_first(sample_task_config):
+    pool = WorkerPool(max_workers=1)
+    release = threading.Event()
+    order = []
+    blocker = Task(**{**sample_task_config, "name": "blocker"})
+    futures = [pool.submit(blocker, lambda t: release.wait(5))]
+    for name, priority in [("report", "low"), ("digest", "normal"), ("alert", "high")]:
+        task = Task(**{**sample_task_config, "name": name, "priority": priority})
+        futures.append(pool.submit(task, order.append))
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert [task.name for task in order] == ["alert", "digest", "report"]
+    stats = pool.wait_stats()
+    assert stats["low"]["served"] == 1 and stats["low"]["wait_max"] > 0
+    pool.shutdown()
+
+
+def test_worker_pool_shutdown_races_start(sample_task_config):
+    pool = WorkerPool(max_workers=1)
+    pop = pool.ready.pop
+
+    def pop_then_shut_down():
+        # shutdown() lands right after the run leaves the queue
+        run = pop()
+        pool._closed = True
+        return run
+
+    pool.ready.pop = pop_then_shut_down
+    future = pool.submit(Task(**sample_task_config), lambda t: None)
+    assert future.cancelled()
+    assert pool._in_flight == 0 and pool.active == 0
+    pool.shutdown()
+
+
+def test_timer_queue_order_and_cancel():
+    timers = TimerQueue(clock=lambda: 100.0)
+    fired = []
+    timers.schedule("b", 50.0, lambda: fired.append("b"))
+    timers.schedule("a", 10.0, lambda: fired.append("a"))
+    timers.schedule("c", 200.0, lambda: fired.append("c"))
+    timers.schedule("d", 20.0, lambda: fired.append("d"))
+
+    assert timers.cancel("d")
+    assert not timers.cancel("missing")
+    # Rescheduling replaces the pending entry instead of adding a second one
+    timers.schedule("b", 150.0, lambda: fired.append("b"))
+    assert timers.next_fire_time() == 10.0
+
+    for _, callback in timers.pop_due():
+        callback()
+    assert fired == ["a"]
+    assert len(timers) == 2
+    assert [key for key, _ in timers.pop_due(now=500.0)] == ["b", "c"]
+
+
+def test_scheduler_fires_due_tasks(sample_task_config):
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    dispatched = []
+    scheduler._dispatch = lambda task, fire=None: dispatched.append(task)
+    task = Task(**sample_task_config)
+    one_time = Task(
+        name="one_time",
+        command="echo 'test'",
+        schedule={"type": "one-time", "start_time": datetime.now() + timedelta(seconds=30)},
+        retry={"max_attempts": 1, "delay": 1},
+    )
+    scheduler.add_tasks([task, one_time])
+
+    first_run = scheduler.next_run(task.name)
+    assert first_run == pytest.approx(time.time() + 60, abs=5)
+
+    # Nothing is due yet
+    assert scheduler.run_pending() == 0
+    # Recurring tasks re-arm themselves one interval later, one-time tasks do not
+    scheduler.timers.clock = lambda: first_run
+    assert scheduler.run_pending() == 2
+    assert [t.name for t in dispatched] == ["one_time", "test_task"]
+    assert scheduler.next_run(task.name) == first_run + 60
+    assert scheduler.next_run(one_time.name) is None
+
+    scheduler.remove_task(task.name)
+    assert scheduler.next_run(task.name) is None
+    assert task.name not in scheduler.tasks
+
+
+def test_scheduler_wakes_for_new_tasks():
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    fired = threading.Event()
+    scheduler._dispatch = lambda task, fire=None: fired.set()
+    runner = threading.Thread(target=scheduler.run, daemon=True)
+    runner.start()
+
+    # The loop is idle with an empty queue; adding a task must wake it
+    time.sleep(0.05)
+    scheduler.add_task(
+        Task(
+            name="soon",
+            command="echo 'test'",
+            schedule={"type": "one-time", "start_time": datetime.now() + timedelta(seconds=0.2)},
+            retry={"max_attempts": 1, "delay": 1},
+        )
+    )
+    assert fired.wait(timeout=2)
+    scheduler.stop()
+    runner.join(timeout=2)
+    assert not runner.is_alive()
+
+
+def test_async_executor_streams_output(temp_log_dir, sample_task_config):
+    log_manager = LogManager(LogConfig(log_dir=str(temp_log_dir)))
+    executor = AsyncTaskExecutor(log_manager, buffer_size=16)
+    task = Task(
+        **{
+            **sample_task_config,
+            "command": "echo first; printf 'x%.0s' $(seq 1 40); echo; echo oops >&2",
+        }
+    )
+
+    pool = WorkerPool(max_workers=2)
+    result = pool.submit(task, executor.execute_task).result(timeout=10)
+    pool.shutdown()
+
+    assert result.succeeded
+    assert result.exit_code == 0
+    assert result.output_size == len("first\n") + 41 + len("oops\n")
+    log_text = "".join(p.read_text() for p in temp_log_dir.glob("test_task/*.log"))
+    assert "first" in log_text
+    assert "oops" in log_text
+    # The 40-byte line is forwarded in chunks no larger than the buffer
+    assert "x" * 16 in log_text
+    assert "x" * 17 not in log_text
+
+
+def test_retry_backoff():
+    retry = RetryConfig(max_attempts=5, delay=2, backoff=3, max_delay=30)
+    assert [retry.delay_for(n) for n in range(1, 5)] == [2, 6, 18, 30]
+
+    jittered = RetryConfig(max_attempts=5, delay=10, jitter=0.5)
+    assert all(5 <= jittered.delay_for(1) <= 10 for _ in range(50))
+
+
+def test_failed_run_is_requeued_as_retry(sample_task_config):
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    task = Task(**{**sample_task_config, "command": "exit 3"})
+    scheduler.add_task(task)
+
+    started = time.monotonic()
+    scheduler._dispatch(task)
+    while scheduler.pool.running(task.name) or (task.name, "retry") not in scheduler.timers:
+        assert time.monotonic() - started < 5
+        time.sleep(0.01)
+
+    # No retries yet
+    assert task.attempts == 0
+    assert task.last_status == "failed"
+    # The retry is a timed event; nothing slept and the config is untouched
+    assert scheduler.timers.fire_time((task.name, "retry")) == pytest.approx(
+        time.time() + task.retry.delay, abs=0.5
+    )
+    assert task.retry.max_attempts == 3
+
+    # A fresh scheduled fire cancels the pending retry and restarts the count
+    scheduler._dispatch = lambda t, attempt=1, fire=None: None
+    scheduler._fire(task.name, time.time())
+    assert (task.name, "retry") not in scheduler.timers
+    scheduler.stop()
+
+
+def test_log_router_routes_by_task(temp_log_dir):
+    config = LogConfig(log_dir=str(temp_log_dir), max_open_files=2)
+    log_manager = LogManager(config)
+    loggers = [log_manager.get_logger(f"task_{i}") for i in range(4)]
+
+    for i, task_logger in enumerate(loggers):
+        task_logger.info(f"message from {i}")
+
+    # Handles beyond the LRU bound are closed, and each file only holds its own records
+    assert log_manager.router.open_files == 2
+    for i, task_logger in enumerate(loggers):
+        content = task_logger.log_file.read_text()
+        assert f"message from {i}" in content
+        assert content.count("message from") == 1
+
+    # Writing to an evicted task reopens its file in append mode
+    loggers[0].info("again")
+    assert loggers[0].log_file.read_text().count("message from 0") == 1
+    assert "again" in loggers[0].log_file.read_text()
+
+
+def test_parse_rotation():
+    assert parse_rotation("1 day") == (None, 86400)
+    assert parse_rotation("2 hours") == (None, 7200)
+    assert parse_rotation("500 MB") == (500_000_000, None)
+    assert parse_rotation("whenever") == (None, None)
+
+
+class _Message(str):
+    def __new__(cls, text, task_name, level_no):
+        message = super().__new__(cls, text)
+        message.record = {
+            "extra": {"task_name": task_name},
+            "level": type("L", (), {"no": level_no}),
+        }
+        return message
+
+
+class _BlockingRouter:
+    def __init__(self):
+        self.release = threading.Event()
+        self.records = []
+
+    def write_batch(self, records):
+        self.release.wait(5)
+        self.records.extend(records)
+
+
+def test_batching_writer_backpressure():
+    router = _BlockingRouter()
+    writer = BatchingLogWriter(
+        router, queue_size=2, batch_size=10, flush_interval=0.05, policy="drop_debug"
+    )
+
+    writer.write(_Message("first\n", "t", 20))
+    # Let the writer thread pick up the first record and stall on the router
+    time.sleep(0.3)
+    writer.write(_Message("info\n", "t", 20))
+    writer.write(_Message("debug\n", "t", 10))
+    writer.write(_Message("debug\n", "t", 10))
+    assert writer.stats()["queue_depth"] == 2
+    assert writer.stats()["dropped"] == 1
+
+    router.release.set()
+    writer.close()
+    assert [text for _, text in router.records] == ["first\n", "info\n", "debug\n"]
+    assert writer.stats()["written"] == 3
+
+
+def test_batched_task_logs(temp_log_dir):
+    log_manager = LogManager(LogConfig(log_dir=str(temp_log_dir), batch_writes=True))
+    task_logger = log_manager.get_logger("batched")
+    for i in range(100):
+        task_logger.info(f"line {i}")
+    log_manager.flush()
+    assert task_logger.log_file.read_text().count("line ") == 100
+    assert log_manager.writer.stats()["batches"] < 100
+    log_manager.close()
+
+
+def _dag_task(name, *dependencies):
+    return Task(
+        name=name,
+        command="true",
+        schedule={"type": "recurring", "interval": "1h"},
+        retry={"max_attempts": 1, "delay": 1},
+        dependencies=list(dependencies),
+    )
+
+
+def test_task_graph_cycles_and_order():
+    tasks = [_dag_task("report", "load"), _dag_task("load", "extract"), _dag_task("extract")]
+    graph = TaskGraph.from_tasks(tasks)
+    assert graph.topological_order() == ["extract", "load", "report"]
+
+    with pytest.raises(DependencyCycleError):
+        TaskGraph.from_tasks(tasks + [_dag_task("extract", "report")])
+    with pytest.raises(DependencyCycleError):
+        graph.add("extract", ["report"])
+    with pytest.raises(DependencyCycleError):
+        graph.add("self", ["self"])
+    # A rejected change leaves the graph as it was
+    assert graph.upstream["extract"] == set()
+
+
+def test_scheduler_dependency_fan_out():
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    dispatched = []
+    scheduler._dispatch = lambda task, attempt=1, fire=None: dispatched.append(task.name)
+    scheduler.add_tasks([_dag_task("b", "a"), _dag_task("c", "a"), _dag_task("a")])
+
+    # Downstream tasks that come due before their upstream has succeeded wait
+    scheduler._fire("b", time.time())
+    scheduler._fire("c", time.time())
+    assert dispatched == []
+
+    scheduler._fire("a", time.time())
+    assert dispatched == ["a"]
+    scheduler._release_downstream("a")
+    assert sorted(dispatched[1:]) == ["b", "c"]
+
+    # Each success satisfies one downstream run; b has nothing banked now
+    scheduler._fire("b", time.time())
+    assert dispatched.count("b") == 1
+    scheduler._release_downstream("a")
+    assert dispatched.count("b") == 2
+
+
+def test_run_history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.db"), batch_size=3, flush_interval=60)
+    now = datetime.now()
+    for i in range(5):
+        started = now - timedelta(minutes=90 - i * 30)
+        history.record(
+            RunResult(
+                task_name="etl",
+                status="success" if i % 2 == 0 else "failed",
+                started_at=started,
+                finished_at=started + timedelta(seconds=i),
+                exit_code=0 if i % 2 == 0 else 1,
+                output_size=100 * i,
+                attempt=1,
+            )
+        )
+
+    # Only full batches have been written; queries flush the remainder first
+    assert history.count() == 3
+    runs = history.last_runs("etl", limit=2)
+    assert [run["output_size"] for run in runs] == [400, 300]
+    assert runs[1]["duration"] == 3
+    failures = history.failures_since(now - timedelta(minutes=59))
+    assert [run["exit_code"] for run in failures] == [1]
+    assert history.count("etl") == 5
+
+    journal_mode = history._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+    history.close()
+
+
+def test_compaction(tmp_path, temp_log_dir):
+    history = RunHistory(str(tmp_path / "history.db"), flush_interval=60)
+    old_day = datetime.now().replace(hour=12, minute=0) - timedelta(days=40)
+    for i in range(10):
+        started = old_day + timedelta(minutes=i)
+        history.record(
+            RunResult(
+                task_name="etl",
+                status="failed" if i == 0 else "success",
+                started_at=started,
+                finished_at=started + timedelta(seconds=i + 1),
+            )
+        )
+    for i in range(5):
+        started = datetime.now() - timedelta(minutes=i)
+        history.record(RunResult("etl", "success", started, started + timedelta(seconds=1)))
+
+    log_manager = LogManager(LogConfig(log_dir=str(temp_log_dir), max_files=3, compression="gz"))
+    task_log_dir = temp_log_dir / "etl"
+    task_log_dir.mkdir()
+    for day in range(1, 6):
+        (task_log_dir / f"etl_2024010{day}_000000.log").write_text("old run\n")
+    task_logger = log_manager.get_logger("etl")
+
+    policy = RetentionPolicy(history_days=30, max_runs_per_task=3, batch_size=8)
+    compactor = Compactor(policy, history=history, log_manager=log_manager)
+    first = compactor.run_once()
+    # Work is bounded per pass; the next pass finishes the backlog
+    assert first["runs_compacted"] == 8
+    assert compactor.run_once()["runs_compacted"] == 4
+    assert history.count("etl") == 3
+
+    days = history.daily_stats("etl")
+    assert sum(day["runs"] for day in days) == 12
+    old = next(day for day in days if day["day"] == old_day.date().isoformat())
+    assert old["failures"] == 1
+
+    # Two newest archived files survive (plus the current one), compressed
+    remaining = sorted(path.name for path in task_log_dir.iterdir())
+    assert remaining == sorted(
+        ["etl_20240104_000000.log.gz", "etl_20240105_000000.log.gz", task_logger.log_file.name]
+    )
+    assert first["logs_removed"] == 3
+    history.close()
+
+
+def _write_tasks(path, *tasks):
+    lines = ["tasks:"]
+    for name, interval in tasks:
+        lines += [
+            f"  - name: {name}",
+            "    command: \"echo 'test'\"",
+            f"    schedule: {{type: recurring, interval: {interval}}}",
+            "    retry: {max_attempts: 1, delay: 1}",
+        ]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_config_hot_reload(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    _write_tasks(config_dir / "a.yaml", ("a1", "1m"), ("a2", "1h"))
+    _write_tasks(config_dir / "b.yaml", ("b1", "1d"))
+
+    watcher = ConfigWatcher(ConfigLoader(config_dir=str(config_dir)))
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    scheduler.add_tasks(watcher.load())
+    assert not watcher.poll()
+    a1_next, b1_next = scheduler.next_run("a1"), scheduler.next_run("b1")
+
+    parsed = []
+    original_load_file = watcher.loader.load_file
+    watcher.loader.load_file = lambda path: parsed.append(path.name) or original_load_file(path)
+
+    _write_tasks(config_dir / "a.yaml", ("a1", "1m"), ("a2", "2h"), ("a3", "1m"))
+    (config_dir / "b.yaml").unlink()
+    diff = watcher.poll()
+    # Only the changed file is parsed, and unchanged tasks are not in the diff
+    assert parsed == ["a.yaml"]
+    assert [t.name for t in diff.added] == ["a3"]
+    assert [t.name for t in diff.updated] == ["a2"]
+    assert diff.removed == ["b1"]
+
+    scheduler.apply_config_diff(diff)
+    assert scheduler.next_run("a1") == a1_next
+    assert scheduler.next_run("a2") == pytest.approx(time.time() + 7200, abs=5)
+    assert "a3" in scheduler.tasks
+    assert "b1" not in scheduler.tasks and b1_next is not None
+    assert scheduler.next_run("b1") is None
+
+
+def test_configs_parse_in_spawned_processes(tmp_path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    for i in range(32):
+        _write_tasks(config_dir / f"{i:02}.yaml", (f"task_{i:02}", "1m"))
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    spawned = []
+    get_context = multiprocessing.get_context
+    monkeypatch.setattr(
+        multiprocessing, "get_context", lambda method: spawned.append(method) or get_context(method)
+    )
+    tasks = ConfigLoader(config_dir=str(config_dir)).load_configs()
+    assert [t.name for t in tasks] == [f"task_{i:02}" for i in range(32)]
+    assert spawned == ["spawn"]
+
+
+def test_config_cache(tmp_path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    _write_tasks(config_dir / "a.yaml", ("a1", "1m"))
+    _write_tasks(config_dir / "b.yaml", ("b1", "1h"))
+    cache_path = str(tmp_path / "cache" / "config.pickle")
+
+    cold = ConfigLoader(config_dir=str(config_dir), cache_path=cache_path)
+    assert [t.name for t in cold.load_configs()] == ["a1", "b1"]
+    assert (cold.stats.cached, cold.stats.parsed) == (0, 2)
+
+    warm = ConfigLoader(config_dir=str(config_dir), cache_path=cache_path)
+    tasks = warm.load_configs()
+    assert [t.name for t in tasks] == ["a1", "b1"]
+    assert tasks[1].schedule.interval == "1h"
+    assert (warm.stats.cached, warm.stats.parsed) == (2, 0)
+
+    # A touched file is re-hashed but not re-parsed; an edited one is re-parsed
+    from task_processor.utils.config_loader import _parse_yaml
+
+    parsed = []
+    monkeypatch.setattr(
+        "task_processor.utils.config_loader._parse_yaml",
+        lambda path: parsed.append(path.name) or _parse_yaml(path),
+    )
+    os.utime(config_dir / "a.yaml", ns=(0, 0))
+    _write_tasks(config_dir / "b.yaml", ("b1", "2h"))
+    tasks = warm.load_configs()
+    assert tasks[1].schedule.interval == "2h"
+    assert (warm.stats.cached, warm.stats.parsed) == (1, 1)
+    assert parsed == ["b.yaml"]
+
+    # Deleted files leave the cache
+    (config_dir / "b.yaml").unlink()
+    assert [t.name for t in warm.load_configs()] == ["a1"]
+    assert list(warm._read_cache()["files"]) == [str(config_dir / "a.yaml")]
+
+
+def test_package_import_is_lazy():
+    code = (
+        "import sys, task_processor\n"
+        "heavy = {'pydantic', 'loguru', 'yaml', 'asyncio', 'task_processor.core.models'}\n"
+        "assert not heavy & set(sys.modules), heavy & set(sys.modules)\n"
+        "task_processor.TaskScheduler\n"
+        "assert 'task_processor.core.scheduler' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def _process_alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.parametrize("executor_cls", [TaskExecutor, AsyncTaskExecutor])
+def test_result_cache_replays_until_inputs_change(
+    tmp_path, sample_task_config, executor_cls, monkeypatch
+):
+    source = tmp_path / "input.csv"
+    source.write_text("a,b\n")
+    runs = tmp_path / "runs.log"
+    task = Task(
+        **{
+            **sample_task_config,
+            "command": f"echo run >> {runs}; cat {source}",
+            "cache": {"inputs": [str(tmp_path / "*.csv")], "env": ["REGION"]},
+        }
+    )
+    cache = ResultCache(str(tmp_path / "cache"))
+    executor = executor_cls(result_cache=cache)
+    pool = WorkerPool(max_workers=1)
+
+    def run():
+        return pool.submit(task, executor.execute_task).result(timeout=10)
+
+    first, second = run(), run()
+    # The second run is replayed: same outcome, but the command did not run again
+    assert first.succeeded and second.succeeded
+    assert second.output_size == first.output_size == 4
+    assert runs.read_text().count("run") == 1
+
+    # Changing an input file or a listed environment variable runs it again
+    source.write_text("a,b\n1,2\n")
+    assert run().output_size == 8
+    monkeypatch.setenv("REGION", "eu")
+    run()
+    (tmp_path / "extra.csv").write_text("")
+    run()
+    assert runs.read_text().count("run") == 4
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4
+    pool.shutdown()
+
+
+def test_result_cache_eviction_and_ttl(tmp_path):
+    now = [1000.0]
+    directory = str(tmp_path / "cache")
+    cache = ResultCache(directory, max_entries=2, ttl=60, clock=lambda: now[0])
+    cache.put("a", "success", 0, 10, "output of a")
+    cache.put("b", "success", 0, 10)
+    assert cache.get("a").summary == "output of a"
+    # "b" is the least recently used, so it goes first
+    cache.put("c", "success", 0, 10)
+    assert cache.get("b") is None and len(cache) == 2
+
+    now[0] += 60
+    assert cache.get("a") is None and len(cache) == 1
+    cache.put("d", "success", 0, 10, ttl=3600)
+    now[0] += 120
+    assert cache.get("d") is not None and cache.get("c") is None
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 3,
+        "evictions": 1,
+        "entries": 1,
+        "bytes": os.path.getsize(os.path.join(directory, "d.json")),
+    }
+
+    # Results survive a restart, and a byte cap keeps only what fits
+    cache.put("e", "success", 0, 10, "x" * 100)
+    reopened = ResultCache(directory, max_bytes=300, clock=lambda: now[0])
+    assert len(reopened) == 1 and reopened.get("e") is not None
+    reopened.clear()
+    assert os.listdir(directory) == []
+
+
+@pytest.mark.parametrize("executor_cls", [TaskExecutor, AsyncTaskExecutor])
+def test_timeout_kills_process_tree(tmp_path, sample_task_config, executor_cls):
+    pid_file = tmp_path / "child.pid"
+    task = Task(
+        **{
+            **sample_task_config,
+            "command": f"sleep 30 & echo $! > {pid_file}; wait",
+            "timeout": 0.5,
+        }
+    )
+    pool = WorkerPool(max_workers=1)
+    result = pool.submit(task, executor_cls(kill_grace=0.5).execute_task).result(timeout=10)
+    pool.shutdown()
+
+    assert result.status == "timeout"
+    assert result.duration < 5
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _process_alive(child):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_memory_limit(sample_task_config):
+    task = Task(
+        **{
+            **sample_task_config,
+            "command": f"{sys.executable} -c 'bytearray(512 * 1024 * 1024)'",
+            "max_memory": 256,
+        }
+    )
+    result = TaskExecutor().execute_task(task)
+    assert result.status == "failed"
+    # Limits are set by the shell a command starts in, so other targets cannot take them
+    with pytest.raises(ValueError):
+        Task(**{**sample_task_config, "command": None, "entrypoint": "json:dumps", "cpu_time": 1})
+
+
+@pytest.mark.parametrize("executor_cls", [TaskExecutor, AsyncTaskExecutor])
+@pytest.mark.parametrize("shell", [True, False])
+def test_cpu_time_limit(sample_task_config, executor_cls, shell):
+    task = Task(
+        **{
+            **sample_task_config,
+            "command": f"{sys.executable} -c 'while True: pass'",
+            "shell": shell,
+            "cpu_time": 1,
+            "timeout": 10,
+        }
+    )
+    pool = WorkerPool(max_workers=1)
+    result = pool.submit(task, executor_cls().execute_task).result(timeout=10)
+    pool.shutdown()
+    assert result.status == "failed"
+    assert result.duration < 5
+
+
+def test_kill_is_called_off_once_reaped():
+    from task_processor.core.executor import _ProcessGroups
+
+    groups = _ProcessGroups(kill_grace=30)
+    process = subprocess.Popen(["sleep", "30"], start_new_session=True)
+    groups.add("job", process.pid)
+    assert groups.cancel("job") == 1
+    timer = groups._kill_timers[process.pid]
+    process.wait()
+    # Reaped: the group id may be reused, so the SIGKILL must not go out later
+    assert groups.remove("job", process.pid)
+    timer.join(1)
+    assert not timer.is_alive() and not groups._kill_timers
+    # Killing a run that is no longer tracked does nothing
+    groups.kill(process.pid)
+    assert not groups._kill_timers
+
+
+def test_stragglers_get_the_whole_grace_period(tmp_path):
+    from task_processor.core.executor import _ProcessGroups
+
+    pid_file = tmp_path / "child.pid"
+    groups = _ProcessGroups(kill_grace=1)
+    process = subprocess.Popen(
+        ["sh", "-c", f"(trap '' TERM; sleep 30) & echo $! > {pid_file}; wait"],
+        start_new_session=True,
+    )
+    while not pid_file.exists() or not pid_file.read_text().strip():
+        time.sleep(0.01)
+    child = int(pid_file.read_text())
+    groups.add("job", process.pid)
+    started = time.monotonic()
+    groups.cancel("job")
+    process.wait()
+    groups.remove("job", process.pid)
+    # The child ignores SIGTERM and outlives the shell, but is only killed once the grace is up
+    assert _process_alive(child)
+    while _process_alive(child):
+        assert time.monotonic() - started < 5
+        time.sleep(0.05)
+    assert time.monotonic() - started >= 0.9
+
+
+def test_scheduler_cancel(sample_task_config):
+    scheduler = TaskScheduler(LogManager(LogConfig()), kill_grace=0.5)
+    task = Task(**{**sample_task_config, "command": "sleep 30"})
+    scheduler.add_task(task)
+    completed = []
+    original_on_complete = scheduler._on_complete
+    scheduler._on_complete = lambda t, f, *args: (
+        completed.append(f.result()) or original_on_complete(t, f, *args)
+    )
+
+    scheduler._dispatch(task)
+    deadline = time.monotonic() + 5
+    while not scheduler.cancel(task.name):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    while not completed:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert completed[0].status == "cancelled"
+    # Cancelled runs are not retried, and the task stays scheduled
+    assert (task.name, "retry") not in scheduler.timers
+    assert scheduler.next_run(task.name) is not None
+    scheduler.stop()
+
+
+def test_shell_free_commands(tmp_path, monkeypatch, sample_task_config):
+    from task_processor.core.executor import _command_argv
+
+    def argv(command, **fields):
+        return _command_argv(Task(**{**sample_task_config, "command": command, **fields}))
+
+    assert argv("echo 'a b'")[1:] == ["a b"]
+    assert argv("echo 'a b'")[0].endswith("/echo")
+    assert argv(["echo", "$HOME"]) == ["echo", "$HOME"]
+    for command in ["exit 3", "echo $HOME", "ls | wc -l", "FOO=1 env", "echo *", "a && b"]:
+        assert argv(command) is None
+    assert argv("echo 'a b'", shell=True) is None
+    assert argv("no-such-program x", shell=False) == ["no-such-program", "x"]
+    # A program that appears on PATH later is found by the next run
+    program = tmp_path / "late-program"
+    program.write_text("#!/bin/sh\n")
+    program.chmod(0o755)
+    assert argv("late-program x") is None
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    assert argv("late-program x") == [str(program), "x"]
+    with pytest.raises(ValueError):
+        Task(**{**sample_task_config, "command": ["echo"], "shell": True})
+
+    executor = TaskExecutor()
+    result = executor.execute_task(
+        Task(**{**sample_task_config, "command": ["sh", "-c", "exit 4"]})
+    )
+    assert result.exit_code == 4
+    result = executor.execute_task(Task(**{**sample_task_config, "command": "echo 'quoted text'"}))
+    assert result.succeeded and result.output_size == len("quoted text\n")
+
+
+def test_entrypoint_tasks_run_in_warm_workers(
+    tmp_path, monkeypatch, temp_log_dir, sample_task_config
+):
+    (tmp_path / "sample_jobs.py").write_text(
+        "import os, sys, time\n"
+        "def greet(name='world'):\n"
+        "    print(f'hello {name} from {os.getpid()}')\n"
+        "def fail():\n"
+        "    raise RuntimeError('boom')\n"
+        "def nap():\n"
+        "    time.sleep(30)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    with pytest.raises(ValueError):
+        Task(**{**sample_task_config, "command": None})
+    with pytest.raises(ValueError):
+        Task(**{**sample_task_config, "entrypoint": "sample_jobs:greet"})
+
+    workers = PythonWorkerPool(size=1, preload=["json"], max_runs=2, kill_grace=0.5)
+    log_manager = LogManager(LogConfig(log_dir=str(temp_log_dir)))
+    executor = TaskExecutor(log_manager, python_workers=workers)
+
+    def entrypoint_task(entrypoint, **fields):
+        config = {**sample_task_config, "command": None, "entrypoint": entrypoint}
+        return Task(**config, **fields)
+
+    greet = entrypoint_task("sample_jobs:greet", kwargs={"name": "taskops"})
+    first, second, third = (executor.execute_task(greet) for _ in range(3))
+    assert first.succeeded and first.output_size > 0
+    log_text = "".join(p.read_text() for p in temp_log_dir.glob("test_task/*.log"))
+    pids = set(line.rsplit(" ", 1)[1] for line in log_text.splitlines() if "hello taskops" in line)
+    # Two runs share a warm worker, which is then recycled
+    assert len(pids) == 2
+    assert workers.recycled == 1
+
+    failed = executor.execute_task(entrypoint_task("sample_jobs:fail"))
+    assert failed.status == "failed" and failed.exit_code == 1
+    timed_out = executor.execute_task(entrypoint_task("sample_jobs:nap", timeout=0.5))
+    assert timed_out.status == "timeout"
+    assert executor.execute_task(greet).succeeded
+    workers.close()
+    assert workers.workers() == []
+
+
+def test_lease_coordination(tmp_path, sample_task_config):
+    pytest.importorskip("sqlalchemy")
+    db_path = str(tmp_path / "coordination.db")
+    now = [1000.0]
+    a = LeaseCoordinator(db_path, replica_id="a", lease_ttl=30, clock=lambda: now[0])
+    # A plain path and its SQLAlchemy URL name the same database
+    b = LeaseCoordinator(f"sqlite:///{db_path}", replica_id="b", lease_ttl=30, clock=lambda: now[0])
+
+    assert a.claim("job", 960.0)
+    assert not b.claim("job", 960.0)
+    now[0] += 20
+    assert a.heartbeat() == 1
+    now[0] += 20
+    # Still alive thanks to the heartbeat
+    assert b.reclaim_expired() == []
+    now[0] += 40
+    # An expired lease of one's own may still have its run in flight
+    assert a.reclaim_expired() == []
+    assert b.reclaim_expired() == [("job", 960.0)]
+    assert a.owner("job", 960.0) == "b"
+    b.release("job", 960.0)
+    assert a.reclaim_expired() == [] and not a.claim("job", 960.0)
+    assert aligned_fire_time(60, 1000.0) == 1020.0
+
+    # Two replicas see the same fire; only one dispatches it
+    dispatched = []
+    schedulers = []
+    for replica in (a, b):
+        scheduler = TaskScheduler(LogManager(LogConfig()), coordinator=replica)
+        scheduler._dispatch = lambda task, attempt=1, fire=None, r=replica.replica_id: (
+            dispatched.append((r, fire))
+        )
+        scheduler.add_task(Task(**sample_task_config))
+        schedulers.append(scheduler)
+    # Fire times are aligned, so both replicas agree on the identity of the fire
+    (fire_time,) = {s.next_run("test_task") for s in schedulers}
+    assert fire_time % 60 == 0
+    for scheduler in schedulers:
+        scheduler._fire("test_task", fire_time)
+    assert dispatched == [("a", fire_time)]
+    for scheduler in schedulers:
+        scheduler.stop()
+
+
+def test_dropped_fires_release_their_leases(tmp_path, sample_task_config):
+    pytest.importorskip("sqlalchemy")
+    coordinator = LeaseCoordinator(str(tmp_path / "coordination.db"), replica_id="a")
+    scheduler = TaskScheduler(LogManager(LogConfig()), coordinator=coordinator)
+    scheduler.add_tasks([_dag_task("load", "extract"), _dag_task("extract")])
+    # Parked until extract succeeds, then removed
+    scheduler._fire("load", 960.0)
+    assert coordinator.heartbeat() == 1
+    scheduler.remove_task("load")
+    assert coordinator.heartbeat() == 0
+
+    # A failed run waiting on its retry timer when the scheduler stops
+    task = Task(**sample_task_config)
+    scheduler.add_task(task)
+    assert coordinator.claim(task.name, 1020.0)
+    failed = Future()
+    failed.set_exception(RuntimeError("boom"))
+    scheduler._on_complete(task, failed, 1020.0)
+    assert coordinator.heartbeat() == 1
+    scheduler.stop()
+    assert coordinator.heartbeat() == 0
+    coordinator.close()
+
+
+def test_maintenance_jobs_run_apart_and_skip_busy_ticks():
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    now = [1000.0]
+    scheduler.timers.clock = lambda: now[0]
+    unblock = threading.Event()
+    slow_runs, heartbeats = [], []
+    scheduler.add_maintenance("compact", 1, lambda: slow_runs.append(unblock.wait(5)))
+    scheduler.add_maintenance("leases", 1, lambda: heartbeats.append(now[0]))
+    for _ in range(3):
+        now[0] += 1
+        scheduler.run_pending()
+        time.sleep(0.1)
+    # The stuck compaction holds up neither the heartbeats nor more compactions
+    assert len(heartbeats) == 3
+    unblock.set()
+    time.sleep(0.1)
+    assert slow_runs == [True]
+    scheduler.stop()
+
+
+def _cron_brute_force(cron, after, count):
+    """Fire times found by checking every minute, for comparison."""
+    fires = []
+    minute = int(after // 60 * 60)
+    while len(fires) < count:
+        minute += 60
+        moment = datetime.fromtimestamp(minute, cron.tz)
+        # Repeated wall-clock minutes (the second pass, fold=1) do not fire
+        if minute > after and not moment.fold and cron.matches(moment):
+            fires.append(float(minute))
+    return fires
+
+
+@pytest.mark.parametrize(
+    "expression,timezone",
+    [
+        ("*/15 1-3 * * *", "America/New_York"),
+        ("30 2 * * *", "America/New_York"),
+        ("0 9 1,15 * mon", "Europe/London"),
+        ("5 4 * jan-mar sun-tue", "Asia/Kolkata"),
+        ("@hourly", "UTC"),
+    ],
+)
+def test_cron_next_fire_times(expression, timezone):
+    cron = CronSchedule(expression, timezone)
+    # Around both 2024 DST changes in the US and UK
+    for start in (datetime(2024, 3, 9), datetime(2024, 10, 26), datetime(2024, 11, 2, 23)):
+        after = start.replace(tzinfo=cron.tz).timestamp()
+        expected = _cron_brute_force(cron, after, 30)
+        assert cron.next_fire_times(after, 30) == expected
+        assert cron.next_fire(after) == expected[0]
+        assert cron.next_fire(expected[3]) == expected[4]
+
+
+def test_cron_expressions():
+    # Both day fields restricted: either one matches, as in Vixie cron
+    cron = CronSchedule("0 0 13 * fri")
+    days = [datetime.fromtimestamp(t, cron.tz).date() for t in cron.next_fire_times(0, 6)]
+    assert all(day.day == 13 or day.weekday() == 4 for day in days)
+    assert CronSchedule("0 12 * * 7").weekdays == CronSchedule("0 12 * * sun").weekdays == 1
+    # Feb 29 fires every four years
+    leap = CronSchedule("0 0 29 2 *")
+    fires = leap.next_fire_times(datetime(2025, 1, 1).timestamp(), 2)
+    assert [datetime.fromtimestamp(t, leap.tz).year for t in fires] == [2028, 2032]
+    for invalid in ["* * * *", "60 * * * *", "*/0 * * * *", "0 0 30 2 *", "0 0 * foo *"]:
+        with pytest.raises(ValueError):
+            CronSchedule(invalid)
+    with pytest.raises(ValueError):
+        Schedule(type="cron", cron="@daily", timezone="Nowhere/Special")
+
+
+def test_cron_tasks_and_one_time_cleanup(sample_task_config):
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    cron_task = Task(**{**sample_task_config, "schedule": {"type": "cron", "cron": "*/5 * * * *"}})
+    one_time = Task(
+        **{
+            **sample_task_config,
+            "name": "once",
+            "command": "true",
+            "schedule": {"type": "one-time", "start_time": datetime.now() + timedelta(hours=1)},
+        }
+    )
+    past = Task(
+        **{
+            **sample_task_config,
+            "name": "missed",
+            "schedule": {"type": "one-time", "start_time": datetime.now() - timedelta(hours=1)},
+        }
+    )
+    scheduler.add_tasks([cron_task, one_time, past])
+    # A one-time task whose start time has passed is not registered at all
+    assert sorted(scheduler.tasks) == ["once", "test_task"]
+
+    first = scheduler.next_run(cron_task.name)
+    assert first % 300 == 0 and 0 < first - time.time() <= 300
+    dispatched = []
+    dispatch = scheduler._dispatch
+    scheduler._dispatch = lambda task, attempt=1, fire=None: dispatched.append(fire)
+    scheduler.timers.clock = lambda: first
+    scheduler.run_pending()
+    assert dispatched == [first]
+    assert scheduler.next_run(cron_task.name) == first + 300
+
+    # A one-time task is unregistered once its run has finished
+    scheduler._dispatch = dispatch
+    scheduler.timers.clock = time.time
+    scheduler.timers.cancel("once")
+    scheduler._fire("once", time.time())
+    started = time.monotonic()
+    while "once" in scheduler.tasks:
+        assert time.monotonic() - started < 5
+        time.sleep(0.01)
+    assert one_time.last_status == "success"
+    scheduler.stop()
+
+
+def test_spread_offsets_fire_times(sample_task_config):
+    assert spread_offset("nightly", 3600) == spread_offset("nightly", 3600)
+    assert 0 <= spread_offset("nightly", 3600) < 3600
+
+    scheduler = TaskScheduler(LogManager(LogConfig()), spread=True)
+    for i in range(50):
+        scheduler.add_task(Task(**{**sample_task_config, "name": f"job_{i}"}))
+    pinned = {**sample_task_config["schedule"], "spread": False}
+    scheduler.add_task(Task(**{**sample_task_config, "name": "pinned", "schedule": pinned}))
+    now = time.time()
+    fires = {name: scheduler.next_run(name) for name in scheduler.tasks}
+    # Each task fires at its own stable offset into the minute, within one interval
+    for i in range(50):
+        fire = fires[f"job_{i}"]
+        assert now < fire <= now + 60
+        assert (fire - spread_offset(f"job_{i}", 60)) % 60 == pytest.approx(0, abs=1e-6)
+    assert len({int(fire) for name, fire in fires.items() if name != "pinned"}) > 25
+    assert fires["pinned"] == pytest.approx(now + 60, abs=1)
+    scheduler.stop()
+
+
+def _wait_for(condition, timeout=5):
+    started = time.monotonic()
+    while not condition():
+        assert time.monotonic() - started < timeout
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("overlap,expected", [("skip", 1), ("queue-one", 2), ("allow-3", 3)])
+def test_overlap_policies(sample_task_config, overlap, expected):
+    scheduler = TaskScheduler(LogManager(LogConfig()))
+    task = Task(**{**sample_task_config, "overlap": overlap})
+    scheduler.add_task(task)
+    release = threading.Event()
+    runs = []
+
+    def execute(task, attempt=None):
+        runs.append(attempt)
+        release.wait(5)
+        now = datetime.now()
+        return RunResult(task.name, "success", now, now)
+
+    scheduler.executor.execute_task = execute
+    # Five fires while the first run is stalled cost at most one queued run
+    for fire in range(5):
+        scheduler._dispatch(task, fire=float(fire))
+    _wait_for(lambda: len(runs) == task.max_concurrency)
+    assert scheduler._queued.get(task.name, (None, None))[1] == (
+        4.0 if overlap == "queue-one" else None
+    )
+    release.set()
+    _wait_for(lambda: scheduler.pool.active == 0 and not scheduler._queued)
+    assert len(runs) == expected
+    scheduler.stop()
+
+    assert Task(**{**sample_task_config, "overlap": "allow-4"}).max_concurrency == 4
+    with pytest.raises(ValueError):
+        Task(**{**sample_task_config, "overlap": "allow-2", "max_concurrency": 3})
+    with pytest.raises(ValueError):
+        Task(**{**sample_task_config, "overlap": "queue-two"})
+
+
+def test_overlap_replace_cancels_running_run(sample_task_config):
+    scheduler = TaskScheduler(LogManager(LogConfig()), kill_grace=0.5)
+    task = Task(**{**sample_task_config, "command": "sleep 5", "overlap": "replace"})
+    scheduler.add_task(task)
+    statuses = []
+    scheduler._on_complete = lambda task, future, fire=None: statuses.append(future.result().status)
+    scheduler._dispatch(task)
+    _wait_for(lambda: scheduler.executor._groups._running.get(task.name))
+    scheduler._dispatch(task)
+    _wait_for(lambda: statuses == ["cancelled"])
+    # The held run takes over; cancel it only once its process is up
+    _wait_for(lambda: scheduler.executor._groups._running.get(task.name))
+    assert scheduler.pool.running(task.name) == 1
+    scheduler.cancel(task.name)
+    _wait_for(lambda: len(statuses) == 2)
+    scheduler.stop()
+
+
+def test_catch_up_after_downtime(tmp_path, sample_task_config):
+    history = RunHistory(str(tmp_path / "history.db"), batch_size=1)
+    started = datetime.now() - timedelta(minutes=10)
+    history.record(RunResult("test_task", "success", started, started))
+    scheduler = TaskScheduler(LogManager(LogConfig()), history=history)
+
+    scheduler.add_task(Task(**sample_task_config))
+    assert scheduler.next_run("test_task") > time.time()
+    schedule = {**sample_task_config["schedule"], "catch_up": True}
+    scheduler.add_task(Task(**{**sample_task_config, "schedule": schedule}))
+    missed = scheduler.next_run("test_task")
+    assert missed == pytest.approx(started.timestamp() + 60)
+
+    # The ten missed fires run once, then the schedule resumes from now
+    dispatched = []
+    scheduler._dispatch = lambda task, attempt=1, fire=None: dispatched.append(fire)
+    scheduler.run_pending()
+    assert dispatched == [missed]
+    assert scheduler.next_run("test_task") == pytest.approx(time.time() + 60, abs=1)
+    scheduler.stop()
+    history.close()
+
+
+def test_runs_that_raise_are_recorded_as_failed(tmp_path, sample_task_config):
+    history = RunHistory(str(tmp_path / "history.db"), batch_size=1)
+    scheduler = TaskScheduler(LogManager(LogConfig()), history=history)
+    task = Task(**{**sample_task_config, "retry": {"max_attempts": 1, "delay": 1}})
+    scheduler.add_task(task)
+    task.last_run = datetime.now()
+    failed = Future()
+    failed.set_exception(RuntimeError("boom"))
+    scheduler._on_complete(task, failed)
+
+    (run,) = history.last_runs("test_task")
+    assert run["status"] == "failed"
+    assert run["attempt"] == 1
+    assert run["started_at"] == pytest.approx(task.last_run.timestamp())
+    scheduler.stop()
+    history.close()
+
+
+def test_dispatch_rate_cap_and_histogram(sample_task_config):
+    now = [1000.0]
+    scheduler = TaskScheduler(LogManager(LogConfig()), max_dispatch_rate=10)
+    scheduler.timers.clock = lambda: now[0]
+    submitted = []
+
+    def submit(task, attempt, fire):
+        submitted.append(now[0])
+        scheduler.dispatch_histogram.record()
+
+    scheduler._submit = submit
+    for i in range(25):
+        task = Task(**{**sample_task_config, "name": f"job_{i}"})
+        scheduler.tasks[task.name] = task
+        scheduler._dispatch(task)
+    # The first run goes out now; the rest are deferred, none dropped
+    assert len(submitted) == 1 and scheduler.dispatch_stats()["deferred"] == 24
+    while len(submitted) < 25:
+        now[0] = scheduler.timers.next_fire_time()
+        scheduler.run_pending()
+    assert submitted[-1] == pytest.approx(1002.4)
+    stats = scheduler.dispatch_stats()
+    assert stats["peak"] == 10 and stats["histogram"] == {5: 1, 10: 2}
+    scheduler.stop()
+    # A zero cap is an error, not "unlimited"
+    with pytest.raises(ValueError):
+        TaskScheduler(LogManager(LogConfig()), max_dispatch_rate=0)
+
+    histogram = DispatchHistogram(window=60, clock=lambda: now[0])
+    histogram.record(now[0] - 120)
+    histogram.record()
+    assert histogram.histogram() == {1: 1}